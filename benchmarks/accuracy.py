@@ -0,0 +1,315 @@
+"""
+accuracy package
+Copyright (c) 2013 Federico Cerutti <federico.cerutti@acm.org>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+
+DESCRIPTION:
+
+Differential accuracy harness: the operators of subjective_logic.operators (the 
+mpmath reference) are compared with fast backends working on float arrays, on 
+random pairs of opinions, on pairs close to the edges and vertices of the opinion 
+triangle, and, for the graphical operators, on pairs whose angle alpha' falls on 
+(or next to) the special cases of family_graphical_combination. For each backend, 
+operator and kind of pairs the report gives the maximum and some percentiles of 
+the error (largest difference on belief, disbelief or uncertainty) and how many 
+results violate the constraints of an opinion.
+
+Usage (from the root of the repository):
+
+    python -m benchmarks.accuracy --output accuracy.json
+    python -m benchmarks.accuracy --backend chains --max-error 1e-12
+
+The process exits with status 1 if a maximum error exceeds --max-error or if a 
+backend gives invalid opinions. The raw float64 backend, which is known to fail on 
+dogmatic opinions, is evaluated only when selected with --backend float64.
+"""
+
+import argparse
+import json
+import platform
+import sys
+
+import numpy
+
+import subjective_logic.operators as operators
+import subjective_logic.adaptive as adaptive
+from subjective_logic.Opinion import Opinion
+from subjective_logic.config import epsilon
+
+## Seed used for generating the pairs of opinions
+default_seed = 20131024
+
+## Operators taking two opinions, which the backends can implement
+pair_operators = ["discount", "consensus", "graphical_combination", "graphical_combination2", 
+                  "graphical_combination3", "discount_UAI_referee"]
+
+## Graphical operators, for which the pairs with special angles are generated
+graphical_operators = ["graphical_combination", "graphical_combination2", "graphical_combination3"]
+
+## Angles alpha' handled as special cases by family_graphical_combination
+special_angles = [-numpy.pi / 3, 2 * numpy.pi / 3, numpy.pi / 2]
+
+## Offsets from the special angles of the generated pairs (around the epsilon of the almosteq tests)
+special_offsets = [0, 1e-13, -1e-13, 1e-9, -1e-9, 1e-6, -1e-6]
+
+## Distances from the edges of the triangle of the near-boundary opinions
+boundary_distances = [0, 1e-15, 1e-12, 1e-9, 1e-6]
+
+## Tolerance on the constraints of an opinion (components in [0, 1], summing to 1)
+constraint_tolerance = 1e-9
+
+## Percentiles of the error in the report
+percentiles = [50, 90, 99, 99.9]
+
+## Backends: name -> dictionary operator name -> function (t, c) on arrays (n, 4) returning an array (n, 4)
+backends = {}
+
+## Names of the backends evaluated only when explicitly selected
+explicit_backends = set()
+
+def register_backend(name, functions, explicit=False):
+    """
+    @param functions: dictionary from the name of an operator (see pair_operators) to its fast version, 
+                      a function of two arrays (n, 4) of opinions returning the array (n, 4) of the results
+    @param explicit: if True, the backend is evaluated only when selected by name (see run_accuracy)
+    """
+    for operator in functions:
+        if operator not in pair_operators:
+            raise Exception("Unknown operator: %s" % operator)
+    backends[name] = dict(functions)
+    if explicit:
+        explicit_backends.add(name)
+    else:
+        explicit_backends.discard(name)
+
+def _chain(name):
+    return lambda t, c: operators.discount_chains(numpy.stack((t, c), axis=1), getattr(operators, name))
+
+register_backend("chains", dict([(name, _chain(name)) for name in ["discount", "discount_UAI_referee", "graphical_combination", 
+                                                                    "graphical_combination2", "graphical_combination3"]]))
+
+def _float64(name):
+    return lambda t, c: adaptive.evaluate_float(name, t, c)[0]
+
+def _adaptive(name):
+    return lambda t, c: adaptive.evaluate(name, t, c)
+
+# not guarded against ill-conditioned pairs: useful to see what the adaptive backend fixes
+register_backend("float64", dict([(name, _float64(name)) for name in adaptive.float_operators]), explicit=True)
+register_backend("adaptive", dict([(name, _adaptive(name)) for name in adaptive.float_operators]))
+
+def random_opinions(random, size):
+    """
+    @return: array (size, 4) of opinions uniformly distributed on the triangle, with base 1/2
+    """
+    return numpy.column_stack((random.dirichlet([1, 1, 1], size), 0.5 * numpy.ones(size)))
+
+def boundary_opinions(random, size):
+    """
+    @return: array (size, 4) of opinions on, or within boundary_distances of, an edge or a vertex of the triangle
+    """
+    opinions = random_opinions(random, size)
+    for i in range(size):
+        # one or two components (an edge or a vertex) become tiny, the others share the rest
+        small = random.choice(3, random.randint(1, 3), replace=False)
+        opinions[i, small] = random.choice(boundary_distances, len(small))
+        others = [k for k in range(3) if k not in small]
+        opinions[i, others] *= (1 - numpy.sum(opinions[i, small])) / numpy.sum(opinions[i, others])
+    return opinions
+
+def _angles(t):
+    """
+    @return: [beta, epsilon] angles of the opinion t (see Opinion)
+    """
+    w = Opinion(*t)
+    return [float(w.get_angle_beta()), float(w.get_angle_epsilon())]
+
+def _alpha_for(operator, t, angle):
+    """
+    @return: the angle alpha of c for which alpha' (see the graphical operators) equals angle, None if there is none
+    """
+    [beta, eps] = _angles(t)
+    third = numpy.pi / 3
+    if operator == "graphical_combination" and eps != 0:
+        return (angle + beta) * third / eps
+    if operator == "graphical_combination2" and eps != beta:
+        return angle * third / (eps - beta)
+    if operator == "graphical_combination3" and eps != 0:
+        return (angle - eps / 2 + beta) * third / (eps / 2)
+    return None
+
+def _opinion_at_angle(alpha, fraction):
+    """
+    @return: the opinion at the given fraction of the segment from the belief vertex to the opposite edge, 
+             in the direction alpha (the angle alpha of an Opinion)
+    """
+    r = fraction / numpy.sin(numpy.pi / 3 + alpha)
+    u = r * numpy.sin(alpha)
+    d = r * numpy.cos(alpha) * numpy.sin(numpy.pi / 3) - u * numpy.cos(numpy.pi / 3)
+    return [1 - d - u, d, u, 0.5]
+
+def special_angle_pairs(operator, random, size):
+    """
+    @return: arrays (n, 4) t and c, with n <= size, of pairs whose alpha' is within special_offsets of a special angle
+    """
+    t = []
+    c = []
+    attempts = 0
+    while len(t) < size and attempts < 20 * size:
+        attempts += 1
+        trust = random_opinions(random, 1)[0]
+        angle = special_angles[random.randint(len(special_angles))] + special_offsets[random.randint(len(special_offsets))]
+        alpha = _alpha_for(operator, trust, angle)
+        if alpha is None or alpha < 0 or alpha > numpy.pi / 3:
+            continue
+        t.append(trust)
+        c.append(_opinion_at_angle(alpha, random.uniform(0.05, 1)))
+    return [numpy.array(t).reshape((-1, 4)), numpy.array(c).reshape((-1, 4))]
+
+def sample_pairs(operator, kind, size, seed=default_seed):
+    """
+    @param kind: "random", "boundary" or "special_angle" (graphical operators only)
+    @return: arrays (n, 4) t and c of the pairs of opinions
+    """
+    random = numpy.random.RandomState(seed)
+    if kind == "random":
+        return [random_opinions(random, size), random_opinions(random, size)]
+    if kind == "boundary":
+        # the first half has both opinions on the boundary, the others one of the two
+        t = boundary_opinions(random, size)
+        c = boundary_opinions(random, size)
+        half = size // 2
+        t[half + (size - half) // 2:] = random_opinions(random, size - half - (size - half) // 2)
+        c[half:half + (size - half) // 2] = random_opinions(random, (size - half) // 2)
+        return [t, c]
+    if kind == "special_angle":
+        if operator not in graphical_operators:
+            return [numpy.zeros((0, 4)), numpy.zeros((0, 4))]
+        return special_angle_pairs(operator, random, size)
+    raise Exception("Unknown kind of pairs: %s" % kind)
+
+## Kinds of pairs generated by sample_pairs
+kinds = ["random", "boundary", "special_angle"]
+
+def reference(operator, t, c):
+    """
+    @return: array (n, 4) of the results of the mpmath operator, NaN where it raises an exception
+    """
+    function = getattr(operators, operator)
+    results = numpy.nan * numpy.ones((len(t), 4))
+    for i in range(len(t)):
+        try:
+            w = function(Opinion(*t[i]), Opinion(*c[i]))
+            results[i] = [float(w.getBelief()), float(w.getDisbelief()), float(w.getUncertainty()), float(w.getBase())]
+        except (Exception, ZeroDivisionError):
+            pass
+    return results
+
+def violations(results):
+    """
+    @return: boolean array (n,) of the results which are not opinions (NaN, components out of [0, 1], 
+             or belief, disbelief and uncertainty not summing to 1)
+    """
+    with numpy.errstate(invalid="ignore"):
+        outside = numpy.any((results < -constraint_tolerance) | (results > 1 + constraint_tolerance), axis=1)
+        total = numpy.abs(numpy.sum(results[:, :3], axis=1) - 1) > constraint_tolerance
+    return numpy.any(numpy.isnan(results), axis=1) | outside | total
+
+def compare(expected, actual):
+    """
+    @return: dictionary with the statistics of the error of actual with respect to expected, on the pairs 
+             for which the reference is defined
+    """
+    defined = ~numpy.any(numpy.isnan(expected), axis=1)
+    error = numpy.max(numpy.abs(actual[defined, :3] - expected[defined, :3]), axis=1)
+    report = {"pairs": len(expected), "reference_failures": int(numpy.sum(~defined)),
+              "violations": int(numpy.sum(violations(actual[defined]))),
+              "nan": int(numpy.sum(numpy.any(numpy.isnan(actual[defined]), axis=1)))}
+    error = error[~numpy.isnan(error)]
+    report["max_error"] = float(numpy.max(error)) if len(error) > 0 else None
+    for p in percentiles:
+        report["p" + repr(p)] = float(numpy.percentile(error, p)) if len(error) > 0 else None
+    return report
+
+def run_accuracy(size=1000, seed=default_seed, selection=None):
+    """
+    @param selection: if not None, only the backends whose name contains this string are evaluated, 
+                      otherwise all but the explicit ones
+    @return: dictionary "backend.operator[kind]" -> statistics (see compare)
+    """
+    results = {}
+    for name in sorted(backends):
+        if selection != None and selection not in name:
+            continue
+        if selection == None and name in explicit_backends:
+            continue
+        for operator in sorted(backends[name]):
+            for kind in kinds:
+                [t, c] = sample_pairs(operator, kind, size, seed)
+                if len(t) == 0:
+                    continue
+                expected = reference(operator, t, c)
+                with numpy.errstate(all="ignore"):
+                    actual = numpy.asarray(backends[name][operator](t, c), dtype=float)
+                results[name + "." + operator + "[" + kind + "]"] = compare(expected, actual)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Accuracy of the fast backends of the subjective logic operators")
+    parser.add_argument("--output", help="file where the report is written as JSON (default: standard output)")
+    parser.add_argument("--size", type=int, default=1000, help="number of pairs of opinions of each kind")
+    parser.add_argument("--seed", type=int, default=default_seed)
+    parser.add_argument("--backend", help="evaluate only the backends whose name contains this string "
+                        "(default: all but float64)")
+    parser.add_argument("--interpolation-size", type=int, 
+                        help="also evaluate the interpolation tables (see subjective_logic.interpolation) of this size")
+    parser.add_argument("--max-error", type=float, help="accepted maximum error (default: any)")
+    args = parser.parse_args(argv)
+    
+    if args.interpolation_size:
+        from subjective_logic.interpolation import build_table
+        tables = dict([(name, build_table(name, args.interpolation_size)) for name in graphical_operators])
+        register_backend("interpolation", dict([(name, tables[name].interpolate) for name in graphical_operators]))
+    
+    results = run_accuracy(args.size, args.seed, args.backend)
+    report = {"python": platform.python_version(), "seed": args.seed, "epsilon": epsilon, "accuracy": results}
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=1, sort_keys=True)
+    else:
+        json.dump(report, sys.stdout, indent=1, sort_keys=True)
+        sys.stdout.write("\n")
+    
+    failed = False
+    for name in sorted(results):
+        r = results[name]
+        exceeded = args.max_error != None and r["max_error"] != None and r["max_error"] > args.max_error
+        print >> sys.stderr, "%-55s max %10.3g  p99 %10.3g  violations %5d %s" % \
+            (name, r["max_error"] if r["max_error"] != None else float("nan"), 
+             r["p99"] if r["p99"] != None else float("nan"), r["violations"], "FAILED" if exceeded or r["violations"] > 0 else "")
+        failed = failed or exceeded or r["violations"] > 0
+    if failed:
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+"""
+benchmark package
+Copyright (c) 2013 Federico Cerutti <federico.cerutti@acm.org>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+DESCRIPTION:
+
+Benchmarks measuring the throughput of the operators, of the bootstrap, of the
+network exploration, of the cloning and of the saving of an experiment.
+
+Usage (from the root of the repository):
+
+    python -m benchmarks.benchmark --output current.json
+    python -m benchmarks.benchmark --baseline current.json --tolerance 0.2
+
+The results are written as JSON (seconds per call, best of the repetitions).
+When a baseline is given, each benchmark is compared against it and the
+process exits with status 1 if any of them is slower than the tolerance allows.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import timeit
+
+import mpmath
+
+import subjective_logic.operators as operators
+from subjective_logic.Opinion import get_random_opinion
+from experimental_framework.Network import Agent, AgentNetwork
+import experimental_framework.Network as Network
+
+## Seed used for generating the inputs of every benchmark
+default_seed = 20131024
+
+## Sizes (number of agents) of the synthetic networks 
+network_sizes = [10, 20, 40]
+
+## Densities (probability of a link between two agents) of the synthetic networks
+network_densities = [0.1, 0.2]
+
+## Bootstrap time used when building the synthetic networks
+bootstrap_time = 10
+
+## Operators couple used when exploring the networks
+exploration_operators = [[Network.discount_type_aberdeen, Network.consensus_type_aberdeen],
+                         [Network.discount_type_josang, Network.consensus_type_josang]]
+
+
+def measure(function, number=1, repeat=3, setup=None):
+    """
+    @param function: the function to be measured, called without arguments
+    @param number: how many times function is called in a single measure
+    @param repeat: how many measures are made
+    @param setup: if not None, a function called (and not measured) before each measure
+    @return: a dictionary with the best and the mean time per call (in seconds)
+    """
+    times = []
+    for r in range(repeat):
+        if setup != None:
+            setup()
+        start = timeit.default_timer()
+        for n in range(number):
+            function()
+        times.append((timeit.default_timer() - start) / number)
+    return {"seconds": min(times), "mean": sum(times) / len(times), "number": number, "repeat": repeat}
+
+def random_pairs(size):
+    return [[get_random_opinion(), get_random_opinion()] for i in range(size)]
+
+def make_network(numagents, density, name="original"):
+    """
+    @return: a (not persisted) network of numagents agents where each directed link exists with 
+             probability density, built the same way as in experiment_at2013_extended
+    """
+    network = AgentNetwork(name)
+    agents = [Agent("Agent"+repr(i), mpmath.rand()) for i in range(numagents)]
+    for ag1 in agents:
+        for ag2 in agents:
+            if ag1 != ag2 and mpmath.rand() < density:
+                ag1.addNeighbour(ag2)
+    for ag in agents:
+        network.add_agent(ag)
+    return network
+
+def make_bootstrapped_network(numagents, density):
+    network = make_network(numagents, density)
+    for ag in network.get_agents():
+        ag.knowYourNeighbours(bootstrap_time)
+    return network
+
+def wanted(name, selection):
+    return selection == None or selection in name
+
+def operator_benchmarks(results, number, repeat, selection=None):
+    pairs = random_pairs(number)
+    
+    binary = [["discount", operators.discount],
+              ["consensus", operators.consensus],
+              ["graphical_combination", operators.graphical_combination],
+              ["graphical_combination2", operators.graphical_combination2],
+              ["graphical_combination3", operators.graphical_combination3],
+              ["discount_UAI_referee", operators.discount_UAI_referee]]
+    for [name, op] in binary:
+        if not wanted("operators." + name, selection):
+            continue
+        def run(op=op):
+            for [t, c] in pairs:
+                op(t, c)
+        res = measure(run, 1, repeat)
+        res["seconds"] /= len(pairs)
+        res["mean"] /= len(pairs)
+        results["operators." + name] = res
+    
+    lists = random_pairs(5 * number)
+    for [name, op] in [["consensus_on_a_list", operators.consensus_on_a_list],
+                       ["graphical_discount_merge", operators.graphical_discount_merge]]:
+        if not wanted("operators." + name + "[5]", selection):
+            continue
+        def run(op=op):
+            for i in range(0, len(lists), 5):
+                # consensus_on_a_list consumes its argument
+                op(list(lists[i:i+5]))
+        res = measure(run, 1, repeat)
+        res["seconds"] /= number
+        res["mean"] /= number
+        results["operators." + name + "[5]"] = res
+
+def network_benchmarks(results, repeat, selection=None):
+    for numagents in network_sizes:
+        for density in network_densities:
+            suffix = "[" + repr(numagents) + "," + repr(density) + "]"
+            
+            if wanted("knowYourNeighbours" + suffix, selection):
+                agents = make_network(numagents, density).get_agents()
+                def bootstrap():
+                    for ag in agents:
+                        del ag.trusts[:]
+                        ag.knowYourNeighbours(bootstrap_time)
+                results["knowYourNeighbours" + suffix] = measure(bootstrap, 1, repeat)
+            
+            bootstrapped = make_bootstrapped_network(numagents, density)
+            if wanted("clone" + suffix, selection):
+                results["clone" + suffix] = measure(lambda: bootstrapped.clone(AgentNetwork("cloned")), 1, repeat)
+            
+            if wanted("explore_network_general" + suffix, selection):
+                clones = []
+                def prepare():
+                    cloned = AgentNetwork("cloned")
+                    bootstrapped.clone(cloned)
+                    clones.append(cloned.get_agent_by_name("Agent0"))
+                def explore():
+                    clones[-1].explore_network_general(exploration_operators)
+                results["explore_network_general" + suffix] = measure(explore, 1, repeat, prepare)
+
+def save_benchmarks(results, repeat, selection=None):
+    names = ["GenericExperiment.save[" + repr(numagents) + "]" for numagents in network_sizes]
+    if not any([wanted(name, selection) for name in names]):
+        return
+    
+    # imported here so that the other benchmarks do not depend on the experiment packages
+    from experimental_framework.Experiment import BootstrapExperiment
+    
+    for numagents in network_sizes:
+        suffix = "[" + repr(numagents) + "]"
+        if not wanted("GenericExperiment.save" + suffix, selection):
+            continue
+        directory = tempfile.mkdtemp()
+        experiments = []
+        try:
+            def prepare():
+                # the experiment measured last is closed (and its engine disposed) outside of the measure
+                if experiments:
+                    experiments[-1].close()
+                e = BootstrapExperiment(os.path.join(directory, "exp-" + repr(len(experiments))), "Agent0")
+                experiments.append(e)
+                for ag in make_network(numagents, network_densities[-1]).get_agents():
+                    e.add_agent(ag)
+            results["GenericExperiment.save" + suffix] = measure(lambda: experiments[-1].save(), 1, repeat, prepare)
+        finally:
+            if experiments:
+                experiments[-1].close()
+            shutil.rmtree(directory)
+
+def run_benchmarks(number=50, repeat=3, seed=default_seed, selection=None):
+    """
+    @param selection: if not None, only the benchmarks whose name contains this string are kept
+    @return: dictionary benchmark name -> measures
+    """
+    random.seed(seed)
+    results = {}
+    operator_benchmarks(results, number, repeat, selection)
+    network_benchmarks(results, repeat, selection)
+    save_benchmarks(results, repeat, selection)
+    return results
+
+def compare(results, baseline, tolerance):
+    """
+    @return: a list of [name, baseline seconds, current seconds, ratio, regressed] for each benchmark
+             present in both the results and the baseline
+    """
+    comparison = []
+    for name in sorted(results):
+        if name in baseline:
+            ratio = results[name]["seconds"] / baseline[name]["seconds"]
+            comparison.append([name, baseline[name]["seconds"], results[name]["seconds"], ratio, ratio > 1 + tolerance])
+    return comparison
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks of the subjective logic experimental framework")
+    parser.add_argument("--output", help="file where the results are written as JSON (default: standard output)")
+    parser.add_argument("--baseline", help="JSON file produced by a previous run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="accepted slowdown with respect to the baseline (default: 0.2)")
+    parser.add_argument("--number", type=int, default=50, help="number of opinions pairs for the operator benchmarks")
+    parser.add_argument("--repeat", type=int, default=3, help="number of repetitions of each measure")
+    parser.add_argument("--seed", type=int, default=default_seed)
+    parser.add_argument("--filter", help="run only the benchmarks whose name contains this string")
+    args = parser.parse_args(argv)
+    
+    results = run_benchmarks(args.number, args.repeat, args.seed, args.filter)
+    report = {"python": platform.python_version(), "seed": args.seed, "benchmarks": results}
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=1, sort_keys=True)
+    else:
+        json.dump(report, sys.stdout, indent=1, sort_keys=True)
+        sys.stdout.write("\n")
+    
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["benchmarks"]
+        regressed = False
+        for [name, before, after, ratio, slower] in compare(results, baseline, args.tolerance):
+            print >> sys.stderr, "%-45s %12.6f %12.6f %7.2fx %s" % (name, before, after, ratio, "REGRESSION" if slower else "")
+            regressed = regressed or slower
+        if regressed:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
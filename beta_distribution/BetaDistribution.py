@@ -27,10 +27,46 @@ Package for creating a beta distribution
 
 import math
 from NotABetaDistributionException import *
+from subjective_logic.Opinion import Opinion
+from mpmath import mpf
 
 import scipy.special
 import numpy
-import pylab
+
+def check_points(p, message="Distributions are computed between 0 and 1..."):
+    """
+    @return: p as a float array, after having checked that all its elements are between 0 and 1
+    """
+    p = numpy.asarray(p, dtype=numpy.float64)
+    if not numpy.all((p >= 0) & (p <= 1)):
+        raise Exception(message)
+    return p
+
+def log_density(alpha, beta, log_beta, p):
+    """
+    Logarithm of the density of the beta distributions with parameters alpha and beta 
+    (log_beta = scipy.special.betaln(alpha, beta)) in the points p (all arguments are broadcast).
+    
+    As in BetaDistribution.distribution, the density in 0 (resp. 1) is 0 when alpha (resp. beta) is
+    less than 1.
+    """
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        res = scipy.special.xlogy(alpha - 1, p) + scipy.special.xlog1py(beta - 1, -p) - log_beta
+    return numpy.where(((p == 0) & (alpha < 1)) | ((p == 1) & (beta < 1)), -numpy.inf, res)
+
+def from_Opinion(o):
+    """
+    @param o: a non dogmatic Opinion (uncertainty greater than 0) with base 1/2
+    @return: the BetaDistribution with alpha = r + 1 and beta = s + 1, where r = 2 * belief / uncertainty and 
+             s = 2 * disbelief / uncertainty are the amounts of positive and negative evidence. 
+             It is the inverse of BetaDistribution.to_Opinion
+    """
+    if not (isinstance(o, Opinion) and o.getUncertainty() > 0):
+        raise Exception("A non dogmatic Opinion is required!")
+    if o.getBase() != mpf("1/2"):
+        raise Exception("An Opinion with base 1/2 is required!")
+    
+    return BetaDistribution(2 * o.getBelief() / o.getUncertainty() + 1, 2 * o.getDisbelief() / o.getUncertainty() + 1)
 
 class BetaDistribution():
 
@@ -45,6 +81,7 @@ class BetaDistribution():
         self._alpha = alpha
         self._beta = beta
         self.check()
+        self._log_beta = scipy.special.betaln(float(self._alpha), float(self._beta))
 
 
     def check(self):
@@ -64,15 +101,75 @@ class BetaDistribution():
         if (p == 1 and self._beta < 1):
             return 0
 
-        return 1 / scipy.special.beta(self._alpha, self._beta)* \
+        return math.exp(-self._log_beta) * \
                 math.pow(p, (self._alpha - 1)) * math.pow((1 - p), (self._beta - 1))
 
+    def get_positive_evidence(self):
+        return self._alpha - 1
+    
+    def get_negative_evidence(self):
+        return self._beta - 1
+    
+    def fuse(self, another):
+        """
+        Cumulative fusion in the evidence space: the amounts of evidence are summed up. 
+        It corresponds to the Josang consensus operator on the associated opinions.
+        """
+        if not isinstance(another, BetaDistribution):
+            raise Exception("BetaDistribution expected")
+        return BetaDistribution(self._alpha + another.getAlpha() - 1, self._beta + another.getBeta() - 1)
+    
+    def discount(self, weight):
+        """
+        Discount in the evidence space: the amounts of evidence are scaled by weight
+        
+        @param weight: a number between 0 (the evidence is ignored) and 1 (the evidence is fully trusted)
+        """
+        if not (weight >= 0 and weight <= 1):
+            raise Exception("The weight must be between 0 and 1")
+        return BetaDistribution(weight * (self._alpha - 1) + 1, weight * (self._beta - 1) + 1)
+    
+    def to_Opinion(self):
+        """
+        @return: the Opinion (with base 1/2) associated to this distribution. It requires alpha and beta 
+                 to be at least 1 (i.e. not negative evidence)
+        """
+        if not (self._alpha >= 1 and self._beta >= 1):
+            raise Exception("Negative evidence cannot be mapped into an Opinion")
+        
+        r = mpf(self.get_positive_evidence())
+        s = mpf(self.get_negative_evidence())
+        return Opinion(r / (r + s + 2), s / (r + s + 2), 2 / (r + s + 2), "1/2")
+
+    def logpdf(self, p):
+        """
+        @param p: a point or an array of points between 0 and 1
+        @return: the logarithm of the density in p (same shape of p)
+        """
+        return log_density(self._alpha, self._beta, self._log_beta, check_points(p))
+    
+    def pdf(self, p):
+        """
+        @param p: a point or an array of points between 0 and 1
+        @return: the density in p (same shape of p). It is the vectorised version of distribution
+        """
+        return numpy.exp(self.logpdf(p))
+    
+    def cdf(self, p):
+        """
+        @param p: a point or an array of points between 0 and 1
+        @return: the cumulative distribution function in p (same shape of p)
+        """
+        return scipy.special.betainc(self._alpha, self._beta, check_points(p))
+    
+    def quantile(self, q):
+        """
+        @param q: a probability or an array of probabilities
+        @return: the points where the cumulative distribution function is q (same shape of q)
+        """
+        return scipy.special.betaincinv(self._alpha, self._beta, check_points(q, "Quantiles are computed between 0 and 1..."))
 
     def plotdistribution(self):
-        p = numpy.arange(0.0, 1.0, 0.01)
-        r = []
-        for a in numpy.nditer(p):
-            r.append(self.distribution(a))
-
-        pylab.plot(p, r)
-        pylab.show()
\ No newline at end of file
+        # imported here, so that the distributions do not depend on matplotlib
+        import plotting
+        plotting.plot_distribution(self)
\ No newline at end of file
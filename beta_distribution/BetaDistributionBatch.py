@@ -0,0 +1,111 @@
+"""
+BetaDistributionBatch package
+Copyright (c) 2013 Federico Cerutti <federico.cerutti@acm.org>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+DESCRIPTION:
+
+Package for handling many beta distributions at once (e.g. the reputation of
+every edge of a network)
+"""
+
+from NotABetaDistributionException import *
+from BetaDistribution import BetaDistribution, check_points, log_density
+
+import scipy.special
+import numpy
+
+def from_histories(positives, negatives):
+    """
+    @return: the BetaDistributionBatch associated to the histories with the given numbers of positive
+             and negative interactions (see History.to_BetaDistribution)
+    """
+    positives, negatives = numpy.broadcast_arrays(numpy.asarray(positives), numpy.asarray(negatives))
+    return BetaDistributionBatch(positives.ravel() + 1, negatives.ravel() + 1)
+
+class BetaDistributionBatch():
+    """
+    A vector of n beta distributions. Evaluating it over m points returns n x m arrays, 
+    one row for each distribution.
+    """
+    
+    def getAlphas(self):
+        return self._alphas
+    
+    def getBetas(self):
+        return self._betas
+    
+    def __init__(self, alphas, betas):
+        self._alphas = numpy.asarray(alphas, dtype=numpy.float64).ravel()
+        self._betas = numpy.asarray(betas, dtype=numpy.float64).ravel()
+        self.check()
+        self._log_betas = scipy.special.betaln(self._alphas, self._betas)
+        
+    def check(self):
+        if not(len(self._alphas) == len(self._betas) and numpy.all(self._alphas > 0) and numpy.all(self._betas > 0)):
+            raise NotABetaDistributionException(self)
+    
+    def __len__(self):
+        return len(self._alphas)
+    
+    def __getitem__(self, i):
+        return BetaDistribution(self._alphas[i], self._betas[i])
+    
+    def __repr__(self):
+        return "BetaDistributionBatch("+repr(self._alphas)+","+repr(self._betas)+")"
+    
+    def _grid(self, p, message="Distributions are computed between 0 and 1..."):
+        return check_points(p, message).ravel()[numpy.newaxis, :]
+    
+    def logpdf(self, p):
+        """
+        @param p: array of m points between 0 and 1
+        @return: n x m array with the logarithm of the densities
+        """
+        return log_density(self._alphas[:, numpy.newaxis], self._betas[:, numpy.newaxis], 
+                           self._log_betas[:, numpy.newaxis], self._grid(p))
+    
+    def pdf(self, p):
+        """
+        @param p: array of m points between 0 and 1
+        @return: n x m array with the densities
+        """
+        return numpy.exp(self.logpdf(p))
+    
+    def cdf(self, p):
+        """
+        @param p: array of m points between 0 and 1
+        @return: n x m array with the cumulative distribution functions
+        """
+        return scipy.special.betainc(self._alphas[:, numpy.newaxis], self._betas[:, numpy.newaxis], self._grid(p))
+    
+    def quantile(self, q):
+        """
+        @param q: array of m probabilities
+        @return: n x m array with the quantiles
+        """
+        return scipy.special.betaincinv(self._alphas[:, numpy.newaxis], self._betas[:, numpy.newaxis], 
+                                        self._grid(q, "Quantiles are computed between 0 and 1..."))
+    
+    def mean(self):
+        """
+        @return: the expected values of the distributions
+        """
+        return self._alphas / (self._alphas + self._betas)
@@ -26,9 +26,99 @@ Package for deriving a subjective logic opinion from an history of interaction
 """
 
 from subjective_logic.Opinion import *
-from BetaDistribution import *
+from subjective_logic.LRUCache import LRUCache
 
 from mpmath import *
+import numpy
+
+## Maximum number of histories whose Opinion and BetaDistribution are kept in history_pool
+history_pool_size = 10000
+
+## Pool of the values derived from histories, indexed by (positive, negative) interactions: 
+#  [Opinion, BetaDistribution], each one built (and validated) the first time it is needed. 
+#  It is bounded (the least recently used histories are evicted) and shared by the whole 
+#  process, until emptied by clear_history_pool.
+history_pool = LRUCache(history_pool_size)
+
+def clear_history_pool():
+    """
+    Forgets all the opinions and beta distributions derived from histories
+    """
+    history_pool.clear()
+
+def _pool_entry(key):
+    entry = history_pool.get(key)
+    if entry is None:
+        entry = [None, None]
+        history_pool.put(key, entry)
+    return entry
+    
+def histories_to_opinions(positives, negatives):
+    """
+    Vectorised version of History(x, notx).to_Opinion() 
+    
+    @param positives: array (or anything numpy can convert into an array) of numbers of positive interactions
+    @param negatives: array of numbers of negative interactions (broadcastable against positives)
+    @return: float array whose last dimension contains belief, disbelief, uncertainty and base
+    """
+    positives = numpy.asarray(positives)
+    negatives = numpy.asarray(negatives)
+    if not (numpy.issubdtype(positives.dtype, numpy.integer) and numpy.issubdtype(negatives.dtype, numpy.integer)):
+        raise Exception("History is made by integers/long only!")
+    
+    if numpy.any(positives < 0) or numpy.any(negatives < 0):
+        raise Exception("History requires an history!")
+    
+    return evidence_to_opinions(positives, negatives)
+
+def evidence_to_opinions(positives, negatives):
+    """
+    Same as histories_to_opinions, but the (non negative) amounts of evidence can be real numbers
+    (e.g. after discount_evidence)
+    """
+    positives, negatives = numpy.broadcast_arrays(numpy.asarray(positives), numpy.asarray(negatives))
+    total = (positives + negatives + 2).astype(numpy.float64)
+    
+    res = numpy.empty(positives.shape + (4,), dtype=numpy.float64)
+    res[..., 0] = positives / total
+    res[..., 1] = negatives / total
+    res[..., 2] = 2 / total
+    res[..., 3] = 0.5
+    return res
+
+def opinions_to_evidence(opinions):
+    """
+    Inverse of evidence_to_opinions
+    
+    @param opinions: float array whose last dimension contains belief, disbelief, uncertainty (and base).
+                     The uncertainty must be greater than 0
+    @return: [positives, negatives], the float arrays of the amounts of evidence
+    """
+    opinions = numpy.asarray(opinions, dtype=numpy.float64)
+    if numpy.any(opinions[..., 2] <= 0):
+        raise Exception("Non dogmatic opinions are required!")
+    return [2 * opinions[..., 0] / opinions[..., 2], 2 * opinions[..., 1] / opinions[..., 2]]
+
+def fuse_evidence(positives, negatives, axis=0):
+    """
+    Cumulative fusion in the evidence space (equivalent to the Josang consensus): the amounts of evidence
+    along axis are summed up. Integer counts stay integer.
+    
+    @return: [positives, negatives] 
+    """
+    return [numpy.sum(positives, axis=axis), numpy.sum(negatives, axis=axis)]
+
+def discount_evidence(positives, negatives, weights):
+    """
+    Discount in the evidence space: each amount of evidence is scaled by the corresponding weight 
+    (between 0 and 1, broadcast against the evidence)
+    
+    @return: [positives, negatives] as float arrays
+    """
+    weights = numpy.asarray(weights, dtype=numpy.float64)
+    if numpy.any(weights < 0) or numpy.any(weights > 1):
+        raise Exception("The weight must be between 0 and 1")
+    return [weights * positives, weights * negatives]
 
 class History():
     """
@@ -63,15 +153,41 @@ class History():
 
         return True
     
+    def fuse(self, another):
+        """
+        Cumulative fusion of two histories: the interactions are summed up, hence the Opinion of the result
+        is the Josang consensus of the two opinions, computed with two integer additions only
+        """
+        if not isinstance(another, History):
+            raise Exception("History expected")
+        return History(self._number_of_x + another.get_number_of_X(), self._number_of_notx + another.get_number_of_NotX())
+    
     def to_BetaDistribution(self):
-        return BetaDistribution(self._number_of_x + 1, self._number_of_notx + 1)
+        """
+        @return: the BetaDistribution associated to this history (shared with other histories having the
+                 same numbers of interactions, see history_pool)
+        """
+        entry = _pool_entry((self._number_of_x, self._number_of_notx))
+        if entry[1] is None:
+            # imported here, so that the opinions derived from histories do not depend on scipy
+            from BetaDistribution import BetaDistribution
+            entry[1] = BetaDistribution(self._number_of_x + 1, self._number_of_notx + 1)
+        return entry[1]
+    
+    def _build_opinion(self):
+        return Opinion(mpf(self._number_of_x) / mpf(self._number_of_x + self._number_of_notx + 2),
+                       mpf(self._number_of_notx) / mpf(self._number_of_x + self._number_of_notx + 2),
+                       mpf(2) / mpf(self._number_of_x + self._number_of_notx + 2),
+                       0.5)
 
     def to_Opinion(self):
         """
         @return: Subjective Logic Opinion built given the numbers of positive and negative interactions
+        
+        The returned Opinion may be shared with other histories having the same numbers of interactions 
+        (see history_pool)
         """
-        return Opinion(mpf(self._number_of_x) / mpf(self._number_of_x + self._number_of_notx + 2),
-                        mpf(self._number_of_notx) / mpf(self._number_of_x + self._number_of_notx + 2),
-                        mpf(2) / mpf(self._number_of_x + self._number_of_notx + 2),
-                        0.5)
-    
\ No newline at end of file
+        entry = _pool_entry((self._number_of_x, self._number_of_notx))
+        if entry[0] is None:
+            entry[0] = self._build_opinion()
+        return entry[0]
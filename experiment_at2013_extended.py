@@ -33,148 +33,367 @@ ISF Journal, 2014
 
 
 import os
+import argparse
+import random
 
 import experimental_framework.Experiment
-from experimental_framework.Network import Agent
+from experimental_framework.Experiment import dispose_shared_engines
+from experimental_framework.Export import export_results, export_summary
+from experimental_framework.Generator import Generator, agent_name
+from experimental_framework.Sweep import Manifest, Summary, SweepSpecification, AdaptiveStopping, \
+    shard_filename, merge_shards
+from subjective_logic.Profiler import profiler
+from subjective_logic.interpolation import graphical_operators, load_or_build, install, uninstall
+import subjective_logic.adaptive
 import mpmath
+import json
 import sys
 
+## The comparisons made by the experiment: each discount operator (with the Aberdeen consensus) is compared 
+#  against the Josang discount and consensus operators. The i-th comparison fills the i-th list of networks
+#  of ExperimentBetweenTwoSameExploration, the name is used for the explored networks.
+comparisons = [[experimental_framework.Network.discount_type_aberdeen, "aberdeen"],  # operator AT2013 - conference
+               [experimental_framework.Network.discount_type_aberdeen2, "aberdeen2"], # operator AT2013 extended parallel
+               [experimental_framework.Network.discount_type_aberdeen3, "aberdeen3"], # operator AT2013 extended half
+               [experimental_framework.Network.discount_type_uai, "uai1"]            # operator UAI referee
+               ]
+
+## Name of the database (in the directory of the results) where all the configurations are saved, 
+#  when they share one database
+shared_database_name = "experiments"
+
+## The columns of summary.csv (and summary.npz)
+summary_columns = ["perclink", "bootstrap", "chosen_agent"] + [prefix + "_" + c[1] + suffix
+                                                               for suffix in ["", "_expected_value"] 
+                                                               for c in comparisons 
+                                                               for prefix in ["mean", "std"]]
+
 class AberdeenExperimentBothOperatorsSameExploration(experimental_framework.Experiment.BootstrapExperiment,experimental_framework.Experiment.ExperimentBetweenTwoSameExploration):
     """
     Class describing the experiment. It inherits both from BootstrapExperiment and ExperimentBetweenTwoSameExploration
     """
     
-    def __init__(self, name, chosen_agent):
-        super(AberdeenExperimentBothOperatorsSameExploration,self).__init__(name,chosen_agent)
+    def __init__(self, name, chosen_agent, resume=False, database=None):
+        super(AberdeenExperimentBothOperatorsSameExploration,self).__init__(name,chosen_agent,resume,database)
+        
         
+    def select_operators(self, discount_types):
+        """
+        @param discount_types: the discount operators (among the ones in comparisons) to be compared 
+                               against the Josang one, None for all of them
+        """
+        if discount_types == None:
+            self.select_experiment_sets(None)
+            return
+        
+        indexes = []
+        for discount_type in discount_types:
+            found = [i for i in range(len(comparisons)) if comparisons[i][0] == discount_type]
+            if len(found) == 0:
+                raise Exception("Error: unknown discount operator")
+            indexes.append(found[0])
+        self.select_experiment_sets(indexes)
         
     def run_experiment(self):
         josang_network_name = "josang"
-        aberdeen_network_name = "aberdeen"
-        aberdeen_network_name2 = "aberdeen2"
-        aberdeen_network_name3 = "aberdeen3"
-        uai_network_name1 = "uai1"
-        uai_network_name2 = "uai2"
         
-        self._experiment_set.add_network(self._network_exploration_general(aberdeen_network_name + " AND " + josang_network_name, 
-                                                                           self._bootstrapped_network, 
-                                                                           [[experimental_framework.Network.discount_type_aberdeen,experimental_framework.Network.consensus_type_aberdeen],
-                                                                            [experimental_framework.Network.discount_type_josang,experimental_framework.Network.consensus_type_josang]
-                                                                            ]))
-        self._experiment_set2.add_network(self._network_exploration_general(aberdeen_network_name2 + " AND " + josang_network_name, 
-                                                                           self._bootstrapped_network, 
-                                                                           [[experimental_framework.Network.discount_type_aberdeen2,experimental_framework.Network.consensus_type_aberdeen],
-                                                                            [experimental_framework.Network.discount_type_josang,experimental_framework.Network.consensus_type_josang]
-                                                                            ]))
-        self._experiment_set3.add_network(self._network_exploration_general(aberdeen_network_name3 + " AND " + josang_network_name, 
-                                                                           self._bootstrapped_network, 
-                                                                           [[experimental_framework.Network.discount_type_aberdeen3,experimental_framework.Network.consensus_type_aberdeen],
-                                                                            [experimental_framework.Network.discount_type_josang,experimental_framework.Network.consensus_type_josang]
-                                                                            ]))
-        self._experiment_set4.add_network(self._network_exploration_general(uai_network_name1 + " AND " + josang_network_name, 
-                                                                           self._bootstrapped_network, 
-                                                                           [[experimental_framework.Network.discount_type_uai,experimental_framework.Network.consensus_type_aberdeen],
-                                                                            [experimental_framework.Network.discount_type_josang,experimental_framework.Network.consensus_type_josang]
-                                                                            ]))
+        self._start_iteration()
+        profiler.count("iterations")
+        
+        sets = self._experiment_sets()
+        for i in range(len(comparisons)):
+            if self.is_experiment_set_selected(i):
+                [discount_type, network_name] = comparisons[i]
+                sets[i].add_network(self._network_exploration_general(network_name + " AND " + josang_network_name, 
+                                                                      self._bootstrapped_network, 
+                                                                      [[discount_type,experimental_framework.Network.consensus_type_aberdeen],
+                                                                       [experimental_framework.Network.discount_type_josang,experimental_framework.Network.consensus_type_josang]
+                                                                       ]))
         
 
 
-def experiment(path):
-    csv = open(path+'/summary.csv','w')
-    numagents = 50
-    for perclink in range(5, 26, 5):
-        #for num_b in range(25,251,25):
-        for num_b in range(2,30,3):
-            agents = []
-            for i in range(numagents):
-                agents.append(Agent("Agent"+repr(i), mpmath.rand()))
-            
-            for ag1 in agents:
-                for ag2 in agents:
-                    if ag1 != ag2 and int(mpmath.floor(mpmath.rand()*100)) < perclink:
-                        ag1.addNeighbour(ag2)
-            
-            chosen_agent = int(mpmath.floor(mpmath.rand()*numagents))
-            
-            t = AberdeenExperimentBothOperatorsSameExploration(path+'/exp-'+repr(numagents)+'-'+repr(perclink)+'-'+repr(num_b)+'-'+repr(chosen_agent),
-                                                                     "Agent"+repr(chosen_agent))
-            
-            print >> sys.stderr, 'exp-'+repr(numagents)+'-'+repr(perclink)+'-'+repr(num_b)+'-'+repr(chosen_agent) + "\n"
-            
-            for ag in agents:
-                t.add_agent(ag)
-                
-            t.save()
-            
-            t.bootstrap(num_b)
+def _new_experiment(path, dbname, chosen_agent, shared_database):
+    if shared_database:
+        return AberdeenExperimentBothOperatorsSameExploration(dbname, chosen_agent, resume=True, 
+                                                              database=path+'/'+shared_database_name)
+    return AberdeenExperimentBothOperatorsSameExploration(path+'/'+dbname, chosen_agent, resume=True)
+
+def _open_configuration(path, manifest, key, numagents, perclink, shared_database=False):
+    """
+    @return: the experiment of the configuration identified by key: it is resumed from its database 
+             if the manifest says it has been started, otherwise a new random network is created
+    """
+    dbname = manifest.get_dbname(key)
+    if dbname != None:
+        t = _new_experiment(path, dbname, None, shared_database)
+        if t.is_loaded() and t.get_original_network() != None and len(t.get_original_network().get_agents()) > 0:
+            print >> sys.stderr, dbname + " resumed\n"
+            return t
+        
+        # interrupted before the network has been committed: nothing to be saved
+        if shared_database and t.is_loaded():
+            # otherwise a new attempt with the same name would load its record
+            t.discard()
+        else:
+            t.close()
+        if not shared_database and os.path.exists(path+'/'+dbname+'.db'):
+            os.remove(path+'/'+dbname+'.db')
+        
+    generated = Generator(random.randint(0, 2**31 - 1)).erdos_renyi(numagents, perclink / 100.0)
+    
+    chosen_agent = int(mpmath.floor(mpmath.rand()*numagents))
+    
+    dbname = 'exp-'+key+'-'+repr(chosen_agent)
+    manifest.start(key, dbname)
+    t = _new_experiment(path, dbname, agent_name(chosen_agent), shared_database)
+    
+    print >> sys.stderr, dbname + "\n"
+    
+    # in a shared database, an experiment with the same name may have been interrupted before
+    if len(t.get_original_network().get_agents()) == 0:
+        t.add_generated_network(generated)
+        
+    t.save()
+    return t
+
+def run_configuration(path, manifest, summary, numagents, perclink, num_b, iterations, 
+                      frozen_answers=False, operators=None, profile_file=None, shared_database=False, stopping=None):
+    """
+    Runs (or resumes, see _open_configuration) a single configuration, unless the manifest says it 
+    has been already completed, and appends its results to the summary
+    
+    @param operators: the discount operators to be compared against the Josang one (see comparisons), 
+                      None for all of them
+    @param profile_file: if not None, the file where the profile record of the configuration is appended
+    @param shared_database: if True, the experiment is saved in the database shared_database_name in path, 
+                            together with the other configurations, instead of its own database
+    @param stopping: if not None, an instance of AdaptiveStopping deciding the number of iterations 
+                     (iterations is then ignored)
+    """
+    key = repr(numagents)+'-'+repr(perclink)+'-'+repr(num_b)
+    if manifest.is_done(key):
+        return
+    
+    profiler.reset()
+    t = _open_configuration(path, manifest, key, numagents, perclink, shared_database)
+    chosen_agent = int(t.get_chosen_agent()[len("Agent"):])
+    
+    t.set_frozen_answers(frozen_answers)
+    t.select_operators(operators)
+    
+    t.bootstrap(num_b)
+    t.save()
+    
+    print "bootstrapped"
+    
+    completed = t.discard_incomplete_iterations()
+    if stopping != None:
+        iterations = stopping.get_max_iterations()
+        for i in range(completed):
+            stopping.add(t.iteration_ratios(i))
+    
+    for i in range(completed, iterations):
+        if stopping != None and stopping.is_done():
+            break
+        print "iteration num: " + repr(i)
+        with profiler.phase("iteration"):
+            t.run_experiment()
             t.save()
+        if stopping != None:
+            stopping.add(t.iteration_ratios(i))
+
+    results = t.distance_ratio_results()
+    export_results(path+'/'+manifest.get_dbname(key)+'-results.npz', results, [c[1] for c in comparisons],
+                   {"numagents": numagents, "perclink": perclink, "bootstrap": num_b})
+    [r1, r2, r3, r4, r1b, r2b, r3b, r4b] = results
+    mean1 = "" # operator AT2013 - conference
+    std1 = ""
+    mean2 = "" # operator AT2013 extended parallel
+    std2 = ""
+    mean3 = "" # operator AT2013 extended half
+    std3 = ""
+    mean4 = "" # operator UAI referee
+    std4 = ""
+    
+    #distance between expected values as suggested by Lance
+    mean1b = "" # operator AT2013 - conference
+    std1b = ""
+    mean2b = "" # operator AT2013 extended parallel
+    std2b = ""
+    mean3b = "" # operator AT2013 extended half
+    std3b = ""
+    mean4b = "" # operator UAI referee
+    std4b = ""
+    
+    if r1.get_mean_std() != None:
+        mean1 = r1.get_mean_std()[0]
+        std1 = r1.get_mean_std()[1]
+    if r2.get_mean_std() != None:
+        mean2 = r2.get_mean_std()[0]
+        std2 = r2.get_mean_std()[1]
+    if r3.get_mean_std() != None:
+        mean3 = r3.get_mean_std()[0]
+        std3 = r3.get_mean_std()[1]
+    if r4.get_mean_std() != None:
+        mean4 = r4.get_mean_std()[0]
+        std4 = r4.get_mean_std()[1]
+        
+    
+    if r1b.get_mean_std() != None:
+        mean1b = r1b.get_mean_std()[0]
+        std1b = r1b.get_mean_std()[1]
+    if r2b.get_mean_std() != None:
+        mean2b = r2b.get_mean_std()[0]
+        std2b = r2b.get_mean_std()[1]
+    if r3b.get_mean_std() != None:
+        mean3b = r3b.get_mean_std()[0]
+        std3b = r3b.get_mean_std()[1]
+    if r4b.get_mean_std() != None:
+        mean4b = r4b.get_mean_std()[0]
+        std4b = r4b.get_mean_std()[1]    
+    
+    summary.append([perclink,num_b,chosen_agent,mean1,std1,mean2,std2,mean3,std3,mean4,std4,mean1b,std1b,mean2b,std2b,mean3b,std3b,mean4b,std4b])
+    t.close()
+    manifest.done(key)
+    
+    if profile_file != None:
+        record = profiler.get_record()
+        record.update({"numagents": numagents, "perclink": perclink, "num_b": num_b, "chosen_agent": chosen_agent})
+        profile_file.write(json.dumps(record, sort_keys=True) + "\n")
+        profile_file.flush()
+
+def experiment(path, frozen_answers=False, profile=False, numagents=50, perclinks=range(5, 26, 5), 
+               bootstraps=range(2, 30, 3), iterations=25, operators=None, shared_database=False, adaptive=None):
+    """
+    @param frozen_answers: if True, in each iteration all the operators are evaluated on the same
+                           answers (see GenericExperiment.set_frozen_answers)
+    @param profile: if True, a profile record (time spent in each phase and counters) for each configuration 
+                    is appended to profile.json (one JSON object per line) next to summary.csv
+    @param adaptive: if not None, the parameters of AdaptiveStopping (max_iterations defaults to iterations):
+                     each configuration stops when its results are precise enough
+    
+    The distances of each configuration are exported in <database>-results.npz, the summary 
+    in summary.npz (see experimental_framework.Export).
+    
+    The configurations completed are recorded in manifest.csv: if the sweep is interrupted, calling 
+    this function again skips them and resumes the others from their last completed iteration.
+    """
+    manifest = Manifest(path+'/manifest.csv')
+    summary = Summary(path+'/summary.csv', 2)
+    profile_file = None
+    if profile:
+        profiler.enable()
+        profile_file = open(path+'/profile.json','a')
+    
+    for perclink in perclinks:
+        for num_b in bootstraps:
+            stopping = None
+            if adaptive != None:
+                stopping = AdaptiveStopping(**dict([("max_iterations", iterations)] + adaptive.items()))
+            run_configuration(path, manifest, summary, numagents, perclink, num_b, iterations, 
+                              frozen_answers, operators, profile_file, shared_database, stopping)
+    export_summary(path+'/summary.csv', path+'/summary.npz', summary_columns)
             
-            print "bootstrapped"
-            
-            for i in range(25):
-            #for i in range(5):
-                print "iteration num: " + repr(i)
-                t.run_experiment()
-                t.save()
-
-            [r1, r2, r3, r4, r1b, r2b, r3b, r4b] = t.distance_ratio_results()
-            mean1 = "" # operator AT2013 - conference
-            std1 = ""
-            mean2 = "" # operator AT2013 extended parallel
-            std2 = ""
-            mean3 = "" # operator AT2013 extended half
-            std3 = ""
-            mean4 = "" # operator UAI referee
-            std4 = ""
-            
-            #distance between expected values as suggested by Lance
-            mean1b = "" # operator AT2013 - conference
-            std1b = ""
-            mean2b = "" # operator AT2013 extended parallel
-            std2b = ""
-            mean3b = "" # operator AT2013 extended half
-            std3b = ""
-            mean4b = "" # operator UAI referee
-            std4b = ""
-            
-            if r1.get_mean_std() != None:
-                mean1 = r1.get_mean_std()[0]
-                std1 = r1.get_mean_std()[1]
-            if r2.get_mean_std() != None:
-                mean2 = r2.get_mean_std()[0]
-                std2 = r2.get_mean_std()[1]
-            if r3.get_mean_std() != None:
-                mean3 = r3.get_mean_std()[0]
-                std3 = r3.get_mean_std()[1]
-            if r4.get_mean_std() != None:
-                mean4 = r4.get_mean_std()[0]
-                std4 = r4.get_mean_std()[1]
-                
-            
-            if r1b.get_mean_std() != None:
-                mean1b = r1b.get_mean_std()[0]
-                std1b = r1b.get_mean_std()[1]
-            if r2b.get_mean_std() != None:
-                mean2b = r2b.get_mean_std()[0]
-                std2b = r2b.get_mean_std()[1]
-            if r3b.get_mean_std() != None:
-                mean3b = r3b.get_mean_std()[0]
-                std3b = r3b.get_mean_std()[1]
-            if r4b.get_mean_std() != None:
-                mean4b = r4b.get_mean_std()[0]
-                std4b = r4b.get_mean_std()[1]    
-            
-            csv.write('"{0}","{1}","{2}","{3}","{4}","{5}","{6}","{7}","{8}","{9}","{10}","{11}","{12}","{13}","{14}","{15}","{16}","{17}","{18}"\n'.format(perclink,num_b,chosen_agent,mean1,std1,mean2,std2,mean3,std3,mean4,std4,mean1b,std1b,mean2b,std2b,mean3b,std3b,mean4b,std4b))
-            csv.flush()
+    if profile:
+        profile_file.close()
+        profiler.disable()
+    dispose_shared_engines()
+
+def run_sweep(specification, shard=0, shards=1):
+    """
+    Runs the cells of the sweep (instance of SweepSpecification) belonging to the given shard. 
+    Different shards can be run at the same time by different processes sharing the output directory: 
+    each one writes its own manifest, summary and profile (see Sweep.shard_filename), to be merged 
+    by merge_sweep once all of them have finished.
+    
+    If the specification has a seed, the random numbers of each cell are generated starting from 
+    seed + the index of the cell, hence a cell gives the same network whatever shard runs it.
+    """
+    files = {}
+    if specification.get("profile"):
+        profiler.enable()
+    if specification.get_interpolation() != None:
+        [directory, size, max_jump, max_error] = specification.get_interpolation()
+        tables = [load_or_build(directory, name, size, max_jump) for name in sorted(graphical_operators)]
+        for table in tables:
+            print >> sys.stderr, "Interpolation of %s: estimated error %g" % (table.get_operator_name(), 
+                                                                              table.get_error_estimate())
+            if max_error != None and table.get_error_estimate() > max_error:
+                raise Exception("The estimated error of the interpolation table of %s exceeds the maximum error: %g > %g" % 
+                                (table.get_operator_name(), table.get_error_estimate(), max_error))
+        install(tables)
+    if specification.get("precision") == "adaptive":
+        subjective_logic.adaptive.install()
+    operator_cache = specification.get_operator_cache()
+    if operator_cache != None:
+        operator_cache.install()
+        
+    for [index, [repetition, numagents, perclink, num_b]] in specification.get_cells(shard, shards):
+        path = specification.get_path(repetition, numagents)
+        if path not in files:
+            if not os.path.isdir(path):
+                os.makedirs(path)
+            # the merged files of a previous run tell which configurations have been completed
+            files[path] = [Manifest(shard_filename(path+'/manifest.csv', shard, shards), path+'/manifest.csv'), 
+                           Summary(shard_filename(path+'/summary.csv', shard, shards), 2, path+'/summary.csv'), None]
+            if specification.get("profile"):
+                files[path][2] = open(shard_filename(path+'/profile.json', shard, shards),'a')
+        [manifest, summary, profile_file] = files[path]
+        
+        if specification.get("seed") != None:
+            random.seed(specification.get("seed") + index)
             
-    csv.close()
+        run_configuration(path, manifest, summary, numagents, perclink, num_b, specification.get("iterations"), 
+                          specification.get("frozen_answers"), specification.get("operators"), profile_file, 
+                          specification.get("shared_database"), specification.get_stopping())
+    
+    for path in files:
+        [manifest, summary, profile_file] = files[path]
+        if profile_file != None:
+            profile_file.close()
+        if shards == 1:
+            export_summary(path+'/summary.csv', path+'/summary.npz', summary_columns)
+    if shards > 1:
+        print >> sys.stderr, "When all the shards have finished, merge them with --merge %d" % shards
+    profiler.disable()
+    if operator_cache != None:
+        operator_cache.uninstall()
+        print >> sys.stderr, "Operator cache: %d hits, %d misses" % (operator_cache.get_hits(), operator_cache.get_misses())
+    subjective_logic.adaptive.uninstall()
+    uninstall()
+    dispose_shared_engines()
+
+def merge_sweep(specification, shards):
+    """
+    Merges the manifests and summaries written by the shards of the sweep (see run_sweep), 
+    and exports the merged summaries
+    """
+    for path in specification.get_paths():
+        if os.path.isdir(path):
+            merge_shards(path+'/manifest.csv', path+'/summary.csv', 2, shards)
+            if os.path.exists(path+'/summary.csv'):
+                export_summary(path+'/summary.csv', path+'/summary.npz', summary_columns)
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep of the experiments comparing subjective logic operators")
+    parser.add_argument("specification", nargs="?", help="JSON file with the specification of the sweep (see experimental_framework.Sweep)")
+    parser.add_argument("--output", help="directory where the results are saved (overrides the specification)")
+    parser.add_argument("--shard", default="0/1", help="i/n: run only the i-th of n shards of the grid (default: 0/1)")
+    parser.add_argument("--merge", type=int, metavar="N", 
+                        help="instead of running, merge the results of the N shards of the sweep")
+    args = parser.parse_args()
     
-    for i in range(10):
-    #for i in range(1):
-        path = "/home/geryo/experiments/test-20131024/test-"+repr(i)
-        os.mkdir(path)
-        experiment(path)
-
+    values = {}
+    if args.specification:
+        with open(args.specification) as f:
+            values = json.load(f)
+    if args.output:
+        values["output"] = args.output
+    specification = SweepSpecification(values)
+        
+    if args.merge:
+        merge_sweep(specification, args.merge)
+    else:
+        [shard, shards] = [int(x) for x in args.shard.split("/")]
+        run_sweep(specification, shard, shards)
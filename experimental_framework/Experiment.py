@@ -28,9 +28,10 @@ trust networks
 
 
 from sqlalchemy import Column, Integer, String, Boolean, Table, ForeignKey
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from baseSQL import Base
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker, deferred
+from sqlalchemy.pool import QueuePool
+from baseSQL import Base, upgrade_schema, read_older_schema
 from Network import Agent
 from Network import AgentNetwork
 from Network import ListNetworks
@@ -38,11 +39,10 @@ import Network
 from beta_distribution.History import History
 from mpmath import mpf
 from subjective_logic.Opinion import Opinion
-import pydot
+from subjective_logic.Profiler import profiler
+from subjective_logic import distances
 import mpmath
-import Gnuplot
 import numpy
-import tempfile
 import os
 import sys
 
@@ -58,6 +58,29 @@ def abort_ro(*args,**kwargs):
     print >> sys.stderr, "No writing allowed, tsk!  We're telling mom!"
     return 
 
+## Engines of the databases shared by many experiments, by name of the database
+_shared_engines = {}
+
+def get_shared_engine(database):
+    """
+    @param database: name of the database (without the .db extension)
+    @return: the engine (with a pool of connections) of a database shared by many experiments: 
+             it is created, and its schema upgraded, only the first time
+    """
+    if database not in _shared_engines:
+        engine = create_engine("sqlite:///"+database+".db", poolclass=QueuePool, connect_args={"timeout": 60})
+        upgrade_schema(engine)
+        _shared_engines[database] = engine
+    return _shared_engines[database]
+
+def dispose_shared_engines():
+    """
+    Closes all the connections to the shared databases
+    """
+    for engine in _shared_engines.values():
+        engine.dispose()
+    _shared_engines.clear()
+
 class ExperimentData(Base):
     """
     Class defining element typical of the experiment
@@ -65,15 +88,18 @@ class ExperimentData(Base):
     It should never directly called.
     
     @var chosen_agent: is the name of the agent chosen for exploring the network
+    @var name: the name of the experiment, when the database is shared by many experiments
     """
     __tablename__ = 'experimentdata'
     id = Column(Integer, primary_key=True)
     chosen_agent = Column(String(500))
+    name = deferred(Column(String(500), index=True))
     
     
-    def __init__(self, agent_name=None):
+    def __init__(self, agent_name=None, name=None):
         if agent_name!=None:
             self.chosen_agent = agent_name
+        self.name = name
         
         
 
@@ -90,56 +116,185 @@ class GenericExperiment(object):
                     and then operate on the cloned version
     """
     _dbname = ''
+    _database = None
     _original = None
     _data = None
+    _frozen_answers = None
+    _copy_on_write = True
+    _record_evidence = True
     
-    def __init__(self, name, chosen_agent):
-        try:
-            with open(name+'.db'): self._protection = True
-        except IOError:
-            self._protection = False
-        
+    def __init__(self, name, chosen_agent, resume=False, database=None):
+        """
+        @param name: name of the database (without the .db extension). If it already exists, the
+                     experiment is loaded from it
+        @param chosen_agent: name of the agent exploring the network (ignored when loading)
+        @param resume: if False, a loaded experiment is protected (nothing can be written), 
+                       otherwise it can be continued
+        @param database: if not None, name of a database (without the .db extension) shared by many 
+                         experiments: name identifies the experiment within it
+        """
         self._dbname = name
+        self._database = database
+        
+        if database == None:
+            try:
+                with open(name+'.db'): self._loaded = True
+            except IOError:
+                self._loaded = False
+        else:
+            engine = None
+            if resume or database in _shared_engines or not os.path.exists(database+".db"):
+                engine = get_shared_engine(database)
+            else:
+                # it may be protected: the schema is not upgraded
+                engine = create_engine("sqlite:///"+database+".db")
+            self._loaded = engine.execute(select([ExperimentData.__table__.c.id]).
+                                          where(ExperimentData.__table__.c.name == name)).first() != None
+            if engine not in _shared_engines.values():
+                engine.dispose()
+        self._protection = self._loaded and not resume
        
         self._create_session()
 
-        if not self._protection:        
-            self._original = AgentNetwork(original_network_name)
-            self._session.add(self._original)
-            
-            self._data = ExperimentData(chosen_agent)
+        if not self._loaded:
+            self._data = ExperimentData(chosen_agent, name if database != None else None)
             self._session.add(self._data)
+                    
+            self._original = AgentNetwork(original_network_name)
+            self._add_network(self._original)
             
             self.save()
             
         else:
             print >> sys.stderr, "The loading begins..."
             
-            self._original = self._session.query(AgentNetwork).filter_by(name = 'original').first()
-            self._data = self._session.query(ExperimentData).first()
+            if database == None:
+                self._data = self._session.query(ExperimentData).first()
+            else:
+                self._data = self._session.query(ExperimentData).filter(ExperimentData.name == name).first()
+            self._original = self._query(AgentNetwork).options(*Network.with_relationships()).filter_by(name = 'original').first()
        
     def is_protected(self):
         return self._protection
     
+    def is_loaded(self):
+        return self._loaded
+    
+    def get_chosen_agent(self):
+        return self._data.chosen_agent
+    
+    def get_original_network(self):
+        return self._original
+    
+    def close(self):
+        self._session.close()
+        if self._engine not in _shared_engines.values():
+            self._engine.dispose()
+    
+    def discard(self):
+        """
+        Deletes from the shared database an experiment interrupted before its network has been committed 
+        (its record and its empty networks), so that its name can be used again, and closes it
+        """
+        if self._database == None or self._protection:
+            raise Exception("Only an experiment in a shared database, not protected, can be discarded")
+        if self._original != None and len(self._original.get_agents()) > 0:
+            raise Exception("An experiment whose network has been committed cannot be discarded")
+        self._session.rollback()
+        for table in [AgentNetwork.__table__, ListNetworks.__table__]:
+            self._session.execute(table.delete().where(table.c.experiment_id == self._data.id))
+        self._session.execute(ExperimentData.__table__.delete().where(ExperimentData.__table__.c.id == self._data.id))
+        self._session.commit()
+        self.close()
+    
     def _create_session(self):
-        self._engine = create_engine("sqlite:///"+self._dbname+".db")
-        Base.metadata.create_all(self._engine)
+        if self._database != None and (not self._protection or self._database in _shared_engines):
+            self._engine = get_shared_engine(self._database)
+        else:
+            database = self._dbname if self._database == None else self._database
+            self._engine = create_engine("sqlite:///"+database+".db")
+            if self._protection:
+                # nothing is written, not even the schema of the current version
+                read_older_schema(self._engine)
+            else:
+                upgrade_schema(self._engine)
         Session = sessionmaker(bind=self._engine)
         self._session = Session()
         
         if self._protection:
             self._session.flush = abort_ro   # now it won't flush!
         
+    def _add_network(self, network):
+        """
+        Adds to the session a new instance of AgentNetwork or ListNetworks belonging to this experiment
+        """
+        if self._database != None:
+            if self._data.id == None:
+                self._session.flush()
+            network.experiment_id = self._data.id
+        self._session.add(network)
+        
+    def _query(self, cls):
+        """
+        @return: the query of the instances of cls (AgentNetwork or ListNetworks) belonging to this experiment
+        """
+        if self._database != None:
+            return self._session.query(cls).filter(cls.experiment_id == self._data.id)
+        return self._session.query(cls)
+        
     def _refresh_session(self):
-        self._close_session()
-        self._create_session
+        self.close()
+        self._create_session()
 
     def save(self):
-        self._session.commit()
+        with profiler.phase("save"):
+            if profiler.enabled:
+                profiler.count("rows flushed", len(self._session.new) + len(self._session.dirty) + len(self._session.deleted))
+            self._session.commit()
         
     def add_agent(self, x):
         if isinstance(x, Agent):
             self._original.add_agent(x)
+            
+    def add_generated_network(self, generated):
+        """
+        @param generated: an instance of Generator.GeneratedNetwork, whose agents and links are 
+                          inserted in bulk into the (empty) original network
+        """
+        generated.insert(self._session, self._original)
+                        
+    def set_frozen_answers(self, frozen):
+        """
+        @param frozen: if True, the answers the agents give during the explorations are sampled
+                       once per iteration (see _start_iteration) and reused by all the explorations
+                       of that iteration, so that different operators are compared on the same evidence
+        """
+        if frozen:
+            self._frozen_answers = {}
+        else:
+            self._frozen_answers = None
+    
+    def set_copy_on_write(self, copy_on_write):
+        """
+        @param copy_on_write: if True (default), each exploration saves only a snapshot of the network 
+                              explored, with a copy of the chosen agent (see AgentNetwork.snapshot), 
+                              otherwise the whole network is cloned
+        """
+        self._copy_on_write = copy_on_write
+    
+    def set_record_evidence(self, record):
+        """
+        @param record: if True (default), the evidence gathered by each exploration is saved with the 
+                       network explored, so that other operators can be evaluated on it (see Replay)
+        """
+        self._record_evidence = record
+    
+    def _start_iteration(self):
+        """
+        To be called at the beginning of each iteration: it forgets the frozen answers (if any)
+        """
+        if self._frozen_answers != None:
+            self._frozen_answers.clear()
                         
     def _network_exploration(self, name_new_network, to_clone, discount, consensus):
         self._network_exploration_general(name_new_network, to_clone, [discount, consensus])
@@ -147,11 +302,22 @@ class GenericExperiment(object):
     def _network_exploration_general(self, name_new_network, to_clone, list_operators):
         self.save()
         n = AgentNetwork(name_new_network)
-        self._session.add(n)
-        to_clone.clone(n)
+        self._add_network(n)
+        with profiler.phase("clone"):
+            if self._copy_on_write:
+                to_clone.snapshot(n, [self._data.chosen_agent])
+            else:
+                to_clone.clone(n)
         self.save()
         
-        n.get_agent_by_name(self._data.chosen_agent).explore_network_general(list_operators)
+        evidence = None
+        if self._record_evidence:
+            evidence = []
+        with profiler.phase("exploration"):
+            n.get_agent_by_name(self._data.chosen_agent).explore_network_general(list_operators, self._frozen_answers, evidence)
+        if evidence != None:
+            for [layer, recommender, trustee, opinion] in evidence:
+                n.evidence.append(Network.ExplorationEvidence(layer, recommender, trustee, opinion))
         return n
 
 class BootstrapExperiment(GenericExperiment):
@@ -166,19 +332,37 @@ class BootstrapExperiment(GenericExperiment):
     
     _bootstrapped_network = None
     
-    def __init__(self,name,chosen_agent):
-        super(BootstrapExperiment,self).__init__(name,chosen_agent)
-        if self._protection:
+    def __init__(self,name,chosen_agent,resume=False,database=None):
+        super(BootstrapExperiment,self).__init__(name,chosen_agent,resume,database)
+        if self._loaded:
             print >> sys.stderr, "...the loading continues with the bootstrap data..."
-            self._bootstrapped_network = self._session.query(AgentNetwork).filter(AgentNetwork.name==bootstrapped_network_name).first()
+            # cloned for each exploration: all its relationships will be traversed
+            self._bootstrapped_network = self._query(AgentNetwork).options(*Network.with_relationships()).filter(AgentNetwork.name==bootstrapped_network_name).first()
     
     def bootstrap(self, bootstraptime):
-        if not self._protection:
-            self.save()
-            self._bootstrapped_network = AgentNetwork(bootstrapped_network_name)
-            self._session.add(self._bootstrapped_network) 
-            self._original.clone(self._bootstrapped_network)
-            self.save()
+        with profiler.phase("bootstrap"):
+            self._bootstrap(bootstraptime)
+    
+    def is_bootstrapped(self):
+        """
+        @return: True if the bootstrapped network has been committed with its trust relationships
+                 (they are committed all together, see _bootstrap)
+        """
+        if self._bootstrapped_network == None:
+            return False
+        for ag in self._bootstrapped_network.get_agents():
+            if len(ag.neighbours) > 0:
+                return len(ag.trusts) > 0
+        return True
+    
+    def _bootstrap(self, bootstraptime):
+        if not self._protection and not self.is_bootstrapped():
+            if self._bootstrapped_network == None:
+                self.save()
+                self._bootstrapped_network = AgentNetwork(bootstrapped_network_name)
+                self._add_network(self._bootstrapped_network)
+                self._original.clone(self._bootstrapped_network)
+                self.save()
             
             for ag in self._bootstrapped_network.get_agents():
                 ag.knowYourNeighbours(bootstraptime)
@@ -215,18 +399,32 @@ class DistancesBetweenTwo(object):
         
     def add_second_distance(self, value):
         self._second_distances.append(value)
+        
+    def get_first_distances(self):
+        """
+        @return: the list of the distances (one for each network, None if the agent has not been reached)
+        """
+        return self._first_distances
+    
+    def get_second_distances(self):
+        return self._second_distances
     
     def check(self):
         if len(self._first_distances) != len(self._second_distances):
             raise Exception("Error")
     
     def get_ratios(self):
+        """
+        @return: the list of the log ratios of the distances, for the networks where both the distances exist 
+                 and are not zero (as in distances.log_ratios)
+        """
         if self._ratio == None:
             self.check()
             self._ratio = []
     
             for i in range(len(self._second_distances)):
-                if self._first_distances[i] != None and self._second_distances[i] != None:
+                if self._first_distances[i] != None and self._second_distances[i] != None and \
+                        self._first_distances[i] > 0 and self._second_distances[i] > 0:
                     if self._second_distances[i] >= self._first_distances[i]:
                         self._ratio.append(mpmath.log10(self._second_distances[i]/self._first_distances[i]))
                     else:
@@ -262,6 +460,12 @@ class ResultsExperimentBetweenTwo(object):
         for ag in list_agents:
             self._list_results.append(DistancesBetweenTwo(ag))
     
+    def get_results(self):
+        """
+        @return: the list of the instances of DistancesBetweenTwo, one for each agent
+        """
+        return self._list_results
+    
     def _result_from_agent(self, ag):
         for res in self._list_results:
             if ag == res.get_agent():
@@ -318,21 +522,21 @@ class ExperimentBetweenTwo(GenericExperiment):
     _second_set = None
     _result = None
      
-    def __init__(self,name,chosen_agent):
-        super(ExperimentBetweenTwo,self).__init__(name,chosen_agent)
+    def __init__(self,name,chosen_agent,resume=False,database=None):
+        super(ExperimentBetweenTwo,self).__init__(name,chosen_agent,resume,database)
          
-        if self._protection:
+        if self._loaded:
             print >> sys.stderr, "...loading continues with experiment between two..."
-            self._first_set = self._session.query(ListNetworks).filter(ListNetworks.name=="First").first()
-            self._second_set = self._session.query(ListNetworks).filter(ListNetworks.name=="Second").first()
+            self._first_set = self._query(ListNetworks).filter(ListNetworks.name=="First").first()
+            self._second_set = self._query(ListNetworks).filter(ListNetworks.name=="Second").first()
             self._result = None
             #self._result = ResultsExperimentBetweenTwo(self._original.get_agents())
              
         else:
             self._first_set = ListNetworks("First")
-            self._session.add(self._first_set)
+            self._add_network(self._first_set)
             self._second_set = ListNetworks("Second")
-            self._session.add(self._second_set)
+            self._add_network(self._second_set)
             self._result = None
      
     def distance_ratio_results(self):
@@ -392,15 +596,17 @@ class ExperimentBetweenTwoSameExploration(GenericExperiment):
     _result3_b = None
     _result4_b = None
     
-    def __init__(self,name,chosen_agent):
-        super(ExperimentBetweenTwoSameExploration,self).__init__(name,chosen_agent)
+    _selected_sets = None
+    
+    def __init__(self,name,chosen_agent,resume=False,database=None):
+        super(ExperimentBetweenTwoSameExploration,self).__init__(name,chosen_agent,resume,database)
         
-        if self._protection:
+        if self._loaded:
             print >> sys.stderr, "...loading continues with experiment between two..."
-            self._experiment_set = self._session.query(ListNetworks).filter(ListNetworks.name=="Experiment2").first()
-            self._experiment_set2 = self._session.query(ListNetworks).filter(ListNetworks.name=="Experiment2-2").first()
-            self._experiment_set3 = self._session.query(ListNetworks).filter(ListNetworks.name=="Experiment2-3").first()
-            self._experiment_set4 = self._session.query(ListNetworks).filter(ListNetworks.name=="Experiment2-4").first()
+            self._experiment_set = self._load_list_networks("Experiment2")
+            self._experiment_set2 = self._load_list_networks("Experiment2-2")
+            self._experiment_set3 = self._load_list_networks("Experiment2-3")
+            self._experiment_set4 = self._load_list_networks("Experiment2-4")
             self._result = None
             self._result2 = None
             self._result3 = None
@@ -418,10 +624,10 @@ class ExperimentBetweenTwoSameExploration(GenericExperiment):
             self._experiment_set2 = ListNetworks("Experiment2-2")
             self._experiment_set3 = ListNetworks("Experiment2-3")
             self._experiment_set4 = ListNetworks("Experiment2-4")
-            self._session.add(self._experiment_set)
-            self._session.add(self._experiment_set2)
-            self._session.add(self._experiment_set3)
-            self._session.add(self._experiment_set4)
+            self._add_network(self._experiment_set)
+            self._add_network(self._experiment_set2)
+            self._add_network(self._experiment_set3)
+            self._add_network(self._experiment_set4)
             self._result = None
             self._result2 = None
             self._result3 = None
@@ -432,11 +638,106 @@ class ExperimentBetweenTwoSameExploration(GenericExperiment):
             self._result3_b = None
             self._result4_b = None
     
+    def _load_list_networks(self, name):
+        """
+        @return: the list of networks with the given name. When resuming, the list is created if it 
+                 has not been committed before the experiment has been interrupted
+        """
+        l = self._query(ListNetworks).filter(ListNetworks.name==name).first()
+        if l == None and not self._protection:
+            l = ListNetworks(name)
+            self._add_network(l)
+        return l
+    
+    def _experiment_sets(self):
+        return [self._experiment_set, self._experiment_set2, self._experiment_set3, self._experiment_set4]
+    
+    def select_experiment_sets(self, indexes):
+        """
+        @param indexes: positions (0 to 3) of the lists of networks that will be filled by the experiment,
+                        None for all of them. The others stay empty and give no results.
+        """
+        self._selected_sets = indexes
+        
+    def is_experiment_set_selected(self, index):
+        return self._selected_sets == None or index in self._selected_sets
+    
+    def completed_iterations(self):
+        """
+        @return: the number of iterations whose networks have been added to every (selected) list of networks
+        """
+        return min([len(self._experiment_sets()[i].get_networks()) for i in range(len(self._experiment_sets())) 
+                    if self.is_experiment_set_selected(i)])
+    
+    def discard_incomplete_iterations(self):
+        """
+        Removes from the lists of networks the explorations belonging to an iteration that has
+        not been completed (e.g. because the experiment has been interrupted), so that the
+        experiment can be resumed from the last completed iteration
+        """
+        completed = self.completed_iterations()
+        for i in range(len(self._experiment_sets())):
+            l = self._experiment_sets()[i]
+            while self.is_experiment_set_selected(i) and len(l.get_networks()) > completed:
+                l.get_networks().pop()
+        self.save()
+        return completed
+    
+    def iteration_ratios(self, iteration):
+        """
+        @return: dictionary from the index of each (selected) list of networks to the average, across the agents,
+                 of the log ratio of the distances (as in distance_ratio_results) in the network of the given 
+                 iteration; None if no agent has been reached in it
+        """
+        ratios = {}
+        sets = self._experiment_sets()
+        agents, correct = self._correct_opinions()
+        for i in range(len(sets)):
+            if not self.is_experiment_set_selected(i) or iteration >= len(sets[i].get_networks()):
+                continue
+            [first, second] = self._network_opinions(sets[i].get_networks()[iteration], agents)
+            log_ratios = distances.log_ratios(distances.euclidean(correct, first), distances.euclidean(correct, second))
+            valid = ~numpy.isnan(log_ratios)
+            ratios[i] = None
+            if numpy.any(valid):
+                ratios[i] = numpy.average(log_ratios[valid])
+        return ratios
+    
+    def _correct_opinions(self):
+        """
+        @return: [agents, array (agents, 4) of their real opinions] for the agents other than the chosen one
+        """
+        agents = [ag for ag in self._original.get_agents() if ag.name != self._data.chosen_agent]
+        correct = [Opinion(eval(ag.probability), mpf("1") - eval(ag.probability), "0", "1/2") for ag in agents]
+        return [agents, distances.to_array(correct)]
+    
+    def _network_opinions(self, network, agents):
+        """
+        @return: the two arrays (agents, 4) of the opinions the chosen agent has derived of the given agents
+                 in the network, NaN for the agents it has not reached
+        """
+        trusts = {}
+        for tr in network.get_agent_by_name(self._data.chosen_agent).trusts:
+            trusts.setdefault(tr.trustee.name, tr)
+        first = numpy.nan * numpy.ones((len(agents), 4))
+        second = numpy.nan * numpy.ones((len(agents), 4))
+        for j in range(len(agents)):
+            if agents[j].name in trusts:
+                first[j] = distances.to_array(trusts[agents[j].name].get_first_opinion())
+                second[j] = distances.to_array(trusts[agents[j].name].get_second_opinion())
+        return [first, second]
+    
     def distance_ratio_results(self):
         """
+        The distances are computed in float64 on arrays of opinions (see subjective_logic.distances), not 
+        with Opinion.distance in mpmath: they agree with the mpmath ones up to rounding (about 1e-15)
+        
         @return result (instance of ResultsExperimentBetweenTwo)
         """
-        
+        with profiler.phase("distance_ratio_results"):
+            return self._distance_ratio_results()
+    
+    def _distance_ratio_results(self):
         if self._result == None:
             self._result = ResultsExperimentBetweenTwo(self._original.get_agents())
             
@@ -463,69 +764,23 @@ class ExperimentBetweenTwoSameExploration(GenericExperiment):
             self._result4_b = ResultsExperimentBetweenTwo(self._original.get_agents())    
         
         
-        for ag in self._original.get_agents():
-            if ag.name != self._data.chosen_agent:
-                correct_opinion = Opinion(eval(ag.probability), mpf("1") - eval(ag.probability), "0", "1/2")
-
-                for network in self._experiment_set.get_networks():
-                    if network.get_agent_by_name(self._data.chosen_agent).get_opinion_agent(ag) != None:
-                        opinions = network.get_agent_by_name(self._data.chosen_agent).get_opinion_agent(ag)
-                        self._result.add_first_distance(ag, correct_opinion.distance(opinions[0]))
-                        self._result.add_second_distance(ag, correct_opinion.distance(opinions[1]))
-                        
-                        self._result_b.add_first_distance(ag, correct_opinion.distance_expected_value(opinions[0]))
-                        self._result_b.add_second_distance(ag, correct_opinion.distance_expected_value(opinions[1]))
-                    else:
-                        self._result.add_first_distance(ag, None)
-                        self._result.add_second_distance(ag, None)
-                        
-                        self._result_b.add_first_distance(ag, None)
-                        self._result_b.add_second_distance(ag, None)
-                        
-                for network in self._experiment_set2.get_networks():
-                    if network.get_agent_by_name(self._data.chosen_agent).get_opinion_agent(ag) != None:
-                        opinions = network.get_agent_by_name(self._data.chosen_agent).get_opinion_agent(ag)
-                        self._result2.add_first_distance(ag, correct_opinion.distance(opinions[0]))
-                        self._result2.add_second_distance(ag, correct_opinion.distance(opinions[1]))
-                        
-                        self._result2_b.add_first_distance(ag, correct_opinion.distance_expected_value(opinions[0]))
-                        self._result2_b.add_second_distance(ag, correct_opinion.distance_expected_value(opinions[1]))
-                    else:
-                        self._result2.add_first_distance(ag, None)
-                        self._result2.add_second_distance(ag, None)
-                        
-                        self._result2_b.add_first_distance(ag, None)
-                        self._result2_b.add_second_distance(ag, None)
-    
-                for network in self._experiment_set3.get_networks():
-                    if network.get_agent_by_name(self._data.chosen_agent).get_opinion_agent(ag) != None:
-                        opinions = network.get_agent_by_name(self._data.chosen_agent).get_opinion_agent(ag)
-                        self._result3.add_first_distance(ag, correct_opinion.distance(opinions[0]))
-                        self._result3.add_second_distance(ag, correct_opinion.distance(opinions[1]))
-                        
-                        self._result3_b.add_first_distance(ag, correct_opinion.distance_expected_value(opinions[0]))
-                        self._result3_b.add_second_distance(ag, correct_opinion.distance_expected_value(opinions[1]))
-                    else:
-                        self._result3.add_first_distance(ag, None)
-                        self._result3.add_second_distance(ag, None)
-                        
-                        self._result3_b.add_first_distance(ag, None)
-                        self._result3_b.add_second_distance(ag, None)
-                        
-                for network in self._experiment_set4.get_networks():
-                    if network.get_agent_by_name(self._data.chosen_agent).get_opinion_agent(ag) != None:
-                        opinions = network.get_agent_by_name(self._data.chosen_agent).get_opinion_agent(ag)
-                        self._result4.add_first_distance(ag, correct_opinion.distance(opinions[0]))
-                        self._result4.add_second_distance(ag, correct_opinion.distance(opinions[1]))
-                        
-                        self._result4_b.add_first_distance(ag, correct_opinion.distance_expected_value(opinions[0]))
-                        self._result4_b.add_second_distance(ag, correct_opinion.distance_expected_value(opinions[1]))
-                    else:
-                        self._result4.add_first_distance(ag, None)
-                        self._result4.add_second_distance(ag, None)
-                        
-                        self._result4_b.add_first_distance(ag, None)
-                        self._result4_b.add_second_distance(ag, None)
+        agents, correct = self._correct_opinions()
+        results = [[self._result, self._result_b], [self._result2, self._result2_b],
+                   [self._result3, self._result3_b], [self._result4, self._result4_b]]
+        sets = self._experiment_sets()
+        for i in range(len(sets)):
+            [result, result_b] = results[i]
+            for network in sets[i].get_networks():
+                [first, second] = self._network_opinions(network, agents)
+                reached = ~numpy.isnan(first[:, 0])
+                values = [distances.euclidean(correct, first), distances.euclidean(correct, second),
+                          distances.expected_value(correct, first), distances.expected_value(correct, second)]
+                for j in range(len(agents)):
+                    [d1, d2, e1, e2] = [float(v[j]) if reached[j] else None for v in values]
+                    result.add_first_distance(agents[j], d1)
+                    result.add_second_distance(agents[j], d2)
+                    result_b.add_first_distance(agents[j], e1)
+                    result_b.add_second_distance(agents[j], e2)
         
         return [self._result, self._result2, self._result3, self._result4, self._result_b, self._result2_b, self._result3_b, self._result4_b]
         
@@ -0,0 +1,176 @@
+"""
+Export package
+Copyright (c) 2013 Federico Cerutti <federico.cerutti@acm.org>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+DESCRIPTION:
+
+Package encompassing the export of the results of the experiments in a 
+columnar format: a compressed NPZ file (numpy.savez_compressed) with one 
+array for each column, which can be loaded without opening the databases.
+"""
+
+import numpy
+import csv
+import os
+
+## Measures of the distances: between the opinions and between their expected values
+measures = ["distance", "expected_value"]
+
+def _to_float(value):
+    if value == None or value == "":
+        return numpy.nan
+    return float(value)
+
+def read_rows(csvfilename):
+    """
+    @return: the rows of a CSV file whose fields are all quoted, skipping the lines torn by a crash 
+             (a complete line ends with a quote and a newline)
+    """
+    with open(csvfilename, 'rb') as f:
+        return list(csv.reader([line for line in f if line.rstrip('\r\n').endswith('"') and line.endswith('\n')]))
+
+def append_line(filename, line):
+    """
+    Appends the line to the file and forces it on disk. If the file ends with a line torn by a crash, 
+    that line is terminated first, so that the new one is not written onto it.
+    """
+    with open(filename, 'ab+') as f:
+        f.seek(0, 2)
+        if f.tell() > 0:
+            f.seek(-1, 2)
+            if f.read(1) != '\n':
+                line = '\n' + line
+            f.seek(0, 2)
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+
+def results_to_columns(results, names, configuration=None):
+    """
+    @param results: the list returned by distance_ratio_results of ExperimentBetweenTwoSameExploration,
+                    the distances between opinions of each comparison followed by the ones between 
+                    expected values
+    @param names: the name of each comparison
+    @param configuration: dictionary of values (e.g. the number of agents) to be repeated in every row
+    @return: a dictionary of arrays, one row for each comparison, measure, agent and iteration: 
+             "first" and "second" are the distances obtained by the two operators (NaN if the 
+             agent has not been reached), "ratio" is log10(second / first). "comparison", "measure"
+             and "agent" are indexes in the arrays "comparisons", "measures" and "agents".
+    """
+    if len(results) != 2 * len(names):
+        raise Exception("Two results (distance and expected value) are required for each comparison")
+    
+    agents = []
+    columns = {"comparison": [], "measure": [], "agent": [], "iteration": [], "first": [], "second": []}
+    for i in range(len(results)):
+        for res in results[i].get_results():
+            name = res.get_agent().name
+            if name not in agents:
+                agents.append(name)
+            first = res.get_first_distances()
+            second = res.get_second_distances()
+            columns["comparison"] += [i % len(names)] * len(first)
+            columns["measure"] += [i // len(names)] * len(first)
+            columns["agent"] += [agents.index(name)] * len(first)
+            columns["iteration"] += range(len(first))
+            columns["first"] += [_to_float(d) for d in first]
+            columns["second"] += [_to_float(d) for d in second]
+    
+    for k in ["comparison", "measure", "agent", "iteration"]:
+        columns[k] = numpy.array(columns[k], dtype=numpy.int32)
+    for k in ["first", "second"]:
+        columns[k] = numpy.array(columns[k], dtype=float)
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        columns["ratio"] = numpy.log10(columns["second"] / columns["first"])
+    
+    if configuration != None:
+        for k in configuration:
+            columns[k] = numpy.repeat(numpy.array([configuration[k]]), len(columns["first"]))
+        
+    columns["comparisons"] = numpy.array(names)
+    columns["measures"] = numpy.array(measures)
+    columns["agents"] = numpy.array(agents)
+    return columns
+
+def export_results(filename, results, names, configuration=None):
+    """
+    Writes the columns (see results_to_columns) into a compressed NPZ file
+    """
+    numpy.savez_compressed(filename, **results_to_columns(results, names, configuration))
+
+def export_summary(csvfilename, filename, columns):
+    """
+    Writes the summary of a sweep (see Sweep.Summary) into a compressed NPZ file, with 
+    an array of floats for each column (NaN for the missing values)
+    
+    @param columns: the names of the columns of the summary
+    """
+    rows = []
+    for row in read_rows(csvfilename):
+        if len(row) != len(columns):
+            raise Exception("The number of columns of the summary does not match")
+        rows.append([_to_float(v) for v in row])
+    array = numpy.array(rows, dtype=float).reshape((len(rows), len(columns)))
+    numpy.savez_compressed(filename, **dict([(columns[j], array[:, j]) for j in range(len(columns))]))
+
+def load(filename):
+    """
+    @return: a dictionary with the arrays saved in the NPZ file
+    """
+    with numpy.load(filename) as data:
+        return dict([(k, data[k]) for k in data.files])
+
+def merge_results(filenames, filename):
+    """
+    Concatenates the results exported by export_results in a single NPZ file: the indexes of the
+    comparisons, measures and agents are translated so that they refer to the merged arrays. 
+    All the files must have the same configuration columns.
+    """
+    merged = None
+    for f in filenames:
+        columns = load(f)
+        if merged == None:
+            merged = dict([(k, []) for k in columns])
+            merged["comparisons"] = []
+            merged["measures"] = list(measures)
+            merged["agents"] = []
+        elif set(columns.keys()) != set(merged.keys()):
+            raise Exception("The results to be merged must have the same columns")
+        
+        for [k, names] in [["comparison", "comparisons"], ["measure", "measures"], ["agent", "agents"]]:
+            for n in columns[names].tolist():
+                if n not in merged[names]:
+                    merged[names].append(n)
+            translation = numpy.array([merged[names].index(n) for n in columns[names].tolist()], dtype=numpy.int32)
+            merged[k].append(translation[columns[k]] if len(translation) > 0 else columns[k])
+        
+        for k in columns:
+            if k not in ["comparison", "measure", "agent", "comparisons", "measures", "agents"]:
+                merged[k].append(columns[k])
+    
+    if merged == None:
+        raise Exception("Nothing to be merged")
+    for k in merged:
+        if k in ["comparisons", "measures", "agents"]:
+            merged[k] = numpy.array(merged[k])
+        else:
+            merged[k] = numpy.concatenate(merged[k])
+    numpy.savez_compressed(filename, **merged)
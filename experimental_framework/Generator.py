@@ -0,0 +1,271 @@
+"""
+Generator package
+Copyright (c) 2013 Federico Cerutti <federico.cerutti@acm.org>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+DESCRIPTION:
+
+Package encompassing the generators of random networks of agents (Erdos-Renyi, 
+Barabasi-Albert, small world and stochastic block models). Networks are 
+generated as arrays (the probability of telling the truth of each agent and 
+the links between them), which can be turned into instances of Agent or 
+inserted in bulk into the database.
+"""
+
+from sqlalchemy import select
+from Network import Agent, links, omega_value
+from mpmath import mpf
+import numpy
+import math
+
+## Number of rows inserted into the database with a single statement
+insert_batch_size = 10000
+
+def agent_name(index):
+    """
+    @return: the name of the index-th agent of a generated network
+    """
+    return "Agent"+repr(index)
+
+def _sample_slots(rng, numslots, p):
+    """
+    @return: the sorted array of the indexes in [0, numslots) each one chosen independently 
+             with probability p. The gaps between chosen indexes are geometric, hence only 
+             the chosen ones are sampled.
+    """
+    if p <= 0 or numslots <= 0:
+        return numpy.zeros(0, dtype=numpy.int64)
+    if p >= 1:
+        return numpy.arange(numslots, dtype=numpy.int64)
+    
+    expected = numslots * p
+    batch = int(expected + 4 * math.sqrt(expected)) + 16
+    chunks = []
+    last = -1
+    while last < numslots:
+        chunk = numpy.cumsum(rng.geometric(p, size=batch).astype(numpy.int64)) + last
+        chunks.append(chunk)
+        last = chunk[-1]
+    slots = numpy.concatenate(chunks)
+    return slots[slots < numslots]
+
+def _sample_pairs(rng, rows, columns, p, no_loops):
+    """
+    @param no_loops: if True, rows and columns are the same agents and the pairs (i, i) are excluded
+    @return: [starts, ends], the pairs of indexes (0 <= start < rows, 0 <= end < columns) each one 
+             chosen independently with probability p
+    """
+    if no_loops and columns <= 1:
+        return [numpy.zeros(0, dtype=numpy.int64), numpy.zeros(0, dtype=numpy.int64)]
+    if no_loops:
+        slots = _sample_slots(rng, rows * (columns - 1), p)
+        starts = slots // (columns - 1)
+        ends = slots % (columns - 1)
+        ends += (ends >= starts)
+    else:
+        slots = _sample_slots(rng, rows * columns, p)
+        starts = slots // columns
+        ends = slots % columns
+    return [starts, ends]
+
+def _bulk_insert(connection, table, columns, rows):
+    """
+    Inserts the rows (tuples of values of the columns) directly with the cursor of the database, 
+    in batches of insert_batch_size rows
+    """
+    compiled = table.insert().compile(dialect=connection.dialect, column_keys=columns)
+    if compiled.positional:
+        order = [columns.index(k) for k in compiled.positiontup]
+        rows = [tuple([row[i] for i in order]) for row in rows]
+    else:
+        rows = [dict(zip(columns, row)) for row in rows]
+    cursor = connection.connection.cursor()
+    for b in range(0, len(rows), insert_batch_size):
+        cursor.executemany(str(compiled), rows[b:b+insert_batch_size])
+    cursor.close()
+
+def _both_directions(starts, ends):
+    return [numpy.concatenate((starts, ends)), numpy.concatenate((ends, starts))]
+
+class GeneratedNetwork(object):
+    """
+    Network of agents described by arrays: the i-th agent is named agent_name(i) and tells 
+    the truth with probability probabilities[i]; there is a link from the agent starts[k] 
+    to the agent ends[k] for each k.
+    """
+    
+    def __init__(self, probabilities, starts, ends):
+        self._probabilities = numpy.asarray(probabilities, dtype=float)
+        self._starts = numpy.asarray(starts, dtype=numpy.int64)
+        self._ends = numpy.asarray(ends, dtype=numpy.int64)
+        
+    def get_numagents(self):
+        return len(self._probabilities)
+    
+    def get_probabilities(self):
+        return self._probabilities
+    
+    def get_links(self):
+        """
+        @return: [starts, ends], the arrays of the indexes of the linked agents
+        """
+        return [self._starts, self._ends]
+    
+    def get_numlinks(self):
+        return len(self._starts)
+    
+    def to_agents(self):
+        """
+        @return: the list of the instances of Agent of the network (not yet in any database)
+        """
+        agents = [Agent(agent_name(i), self._probabilities[i]) for i in range(self.get_numagents())]
+        for k in range(self.get_numlinks()):
+            agents[self._starts[k]].addNeighbour(agents[self._ends[k]])
+        return agents
+    
+    def insert(self, session, network):
+        """
+        Inserts the agents and the links into the (empty) network with bulk statements, 
+        bypassing the creation of an instance of Agent for each of them
+        
+        @param session: the session of the database the network belongs to
+        @param network: an instance of AgentNetwork, already added to the session
+        """
+        session.flush()
+        if network.id == None:
+            raise Exception("The network must be added to the session before inserting the agents")
+        if len(network.agents) > 0:
+            raise Exception("Agents can be inserted only into an empty network")
+        
+        connection = session.connection()
+        agents_table = Agent.__table__
+        # the probability is written in the same format of Agent (an mpf evaluating to the float)
+        probabilities = ["mpf('" + repr(float(x)) + "')" for x in self._probabilities]
+        _bulk_insert(connection, agents_table, ["network_id", "name", "probability", "omega"],
+                     [(network.id, agent_name(i), probabilities[i], omega_value) for i in range(self.get_numagents())])
+        
+        # the agents have been inserted in order, hence the ids are increasing with the index
+        ids = numpy.array([r[0] for r in connection.execute(select([agents_table.c.id]).
+                                                            where(agents_table.c.network_id == network.id).
+                                                            order_by(agents_table.c.id))], 
+                          dtype=numpy.int64)
+        _bulk_insert(connection, links, ["start", "end"], 
+                     zip(ids[self._starts].tolist(), ids[self._ends].tolist()))
+        
+        session.expire(network, ["agents"])
+        
+
+class Generator(object):
+    """
+    Generator of random networks. Every network has the truth probabilities of its agents 
+    drawn uniformly between low_probability and high_probability.
+    
+    All the random numbers are drawn from a numpy generator: the same seed gives the same networks.
+    """
+    
+    def __init__(self, seed=None, low_probability=0.0, high_probability=1.0):
+        if not (0 <= low_probability <= high_probability <= 1):
+            raise Exception("The probabilities of telling the truth must be between 0 and 1")
+        self._rng = numpy.random.RandomState(seed)
+        self._low = low_probability
+        self._high = high_probability
+        
+    def _probabilities(self, numagents):
+        return self._rng.uniform(self._low, self._high, size=numagents)
+    
+    def erdos_renyi(self, numagents, p):
+        """
+        @param p: probability that an agent is linked to another (each direction is independent)
+        """
+        probabilities = self._probabilities(numagents)
+        [starts, ends] = _sample_pairs(self._rng, numagents, numagents, p, True)
+        return GeneratedNetwork(probabilities, starts, ends)
+    
+    def barabasi_albert(self, numagents, m):
+        """
+        Preferential attachment: each new agent is linked to m distinct existing agents chosen 
+        with probability proportional to their degree. Links are in both directions.
+        """
+        if not (1 <= m < numagents):
+            raise Exception("The number of links of each new agent must be between 1 and the number of agents - 1")
+        probabilities = self._probabilities(numagents)
+        
+        numnew = numagents - m
+        starts = numpy.repeat(numpy.arange(m, numagents, dtype=numpy.int64), m)
+        ends = numpy.empty(numnew * m, dtype=numpy.int64)
+        # each agent appears once for each of its links
+        repeated = numpy.empty(2 * numnew * m, dtype=numpy.int64)
+        count = 0
+        targets = numpy.arange(m, dtype=numpy.int64)
+        for source in range(m, numagents):
+            k = (source - m) * m
+            ends[k:k+m] = targets
+            repeated[count:count+m] = targets
+            repeated[count+m:count+2*m] = source
+            count += 2 * m
+            
+            chosen = set()
+            while len(chosen) < m:
+                chosen.update(repeated[self._rng.randint(0, count, size=m-len(chosen))].tolist())
+            targets = numpy.array(sorted(chosen), dtype=numpy.int64)
+        
+        [starts, ends] = _both_directions(starts, ends)
+        return GeneratedNetwork(probabilities, starts, ends)
+    
+    def small_world(self, numagents, k, beta):
+        """
+        Watts-Strogatz: each agent is linked to its k nearest agents in a ring (k / 2 for each side), 
+        then each link is rewired to a random agent with probability beta. Duplicate links produced 
+        by the rewiring are merged. Links are in both directions.
+        """
+        if k % 2 != 0 or not (0 < k < numagents):
+            raise Exception("The number of neighbours in the ring must be even and lower than the number of agents")
+        probabilities = self._probabilities(numagents)
+        
+        starts = numpy.repeat(numpy.arange(numagents, dtype=numpy.int64), k // 2)
+        ends = (starts + numpy.tile(numpy.arange(1, k // 2 + 1, dtype=numpy.int64), numagents)) % numagents
+        
+        rewired = self._rng.random_sample(len(starts)) < beta
+        newends = self._rng.randint(0, numagents - 1, size=numpy.count_nonzero(rewired)).astype(numpy.int64)
+        newends += (newends >= starts[rewired])
+        ends[rewired] = newends
+        
+        keys = numpy.unique(numpy.minimum(starts, ends) * numagents + numpy.maximum(starts, ends))
+        [starts, ends] = _both_directions(keys // numagents, keys % numagents)
+        return GeneratedNetwork(probabilities, starts, ends)
+    
+    def stochastic_block(self, sizes, p):
+        """
+        @param sizes: the number of agents in each block (agents are numbered block after block)
+        @param p: p[a][b] is the probability that an agent of the block a is linked to an agent of the block b
+        """
+        if len(p) != len(sizes) or any([len(row) != len(sizes) for row in p]):
+            raise Exception("A probability is required for each pair of blocks")
+        probabilities = self._probabilities(sum(sizes))
+        
+        offsets = numpy.cumsum([0] + list(sizes))
+        allstarts = []
+        allends = []
+        for a in range(len(sizes)):
+            for b in range(len(sizes)):
+                [starts, ends] = _sample_pairs(self._rng, sizes[a], sizes[b], p[a][b], a == b)
+                allstarts.append(starts + offsets[a])
+                allends.append(ends + offsets[b])
+        return GeneratedNetwork(probabilities, numpy.concatenate(allstarts), numpy.concatenate(allends))
@@ -0,0 +1,258 @@
+"""
+Loader package
+Copyright (c) 2013 Federico Cerutti <federico.cerutti@acm.org>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+DESCRIPTION:
+
+Package encompassing a read-only loader of the databases of finished 
+experiments (ExperimentBetweenTwoSameExploration): agents, trust relationships 
+and lists of networks are read with a few queries into arrays, and the 
+distance and ratio results are recomputed on them, without instantiating 
+the classes mapped by the database.
+"""
+
+import sqlite3
+import sys
+import os
+import numpy
+import mpmath
+from Replay import replay, decode_opinion
+from subjective_logic import distances
+
+## Names of the lists of networks of ExperimentBetweenTwoSameExploration, in order
+experiment_set_names = ["Experiment2", "Experiment2-2", "Experiment2-3", "Experiment2-4"]
+
+## Name of the network of the agents whose truth probabilities are the real opinions
+original_network_name = "original"
+
+def connect_read_only(filename):
+    """
+    @return: a sqlite3 connection which cannot write into the database. The database is opened with 
+             mode=ro when the URI filenames are supported, otherwise writes are forbidden by query_only
+    """
+    if not os.path.isfile(filename):
+        raise Exception("The database " + filename + " does not exist")
+    
+    if sys.version_info[0] >= 3:
+        return sqlite3.connect("file:" + filename + "?mode=ro", uri=True)
+    
+    connection = sqlite3.connect(filename)
+    connection.execute("PRAGMA query_only = ON")
+    return connection
+
+def parse_number(value):
+    """
+    @param value: a number saved in the database, as the repr of an mpf (e.g. "mpf('0.5')")
+    """
+    if value.startswith("mpf('") and value.endswith("')"):
+        return float(value[5:-2])
+    return float(eval(value, {"mpf": mpmath.mpf}))
+
+def _opinion_columns(prefix):
+    return ", ".join(["t." + prefix + "_" + c for c in ["belief", "disbelief", "uncertainty", "base"]])
+
+class ArrayResults(object):
+    """
+    The same results of ResultsExperimentBetweenTwo, computed on arrays of distances with one row 
+    for each agent and one column for each iteration (NaN if the agent has not been reached)
+    """
+    
+    def __init__(self, agents, first, second):
+        self._agents = agents
+        self._first = first
+        self._second = second
+        self._ratios = distances.log_ratios(first, second)
+        
+    def get_agents(self):
+        return self._agents
+    
+    def get_first_distances(self):
+        return self._first
+    
+    def get_second_distances(self):
+        return self._second
+    
+    def get_ratios(self, name):
+        """
+        @return: the array of the ratios of the agent, for the iterations where both the distances exist
+                 and are not zero (see distances.log_ratios)
+        """
+        ratios = self._ratios[self._agents.index(name)]
+        return ratios[~numpy.isnan(ratios)]
+    
+    def get_mean_std_ratio(self, name):
+        ratios = self.get_ratios(name)
+        if len(ratios) == 0:
+            return None
+        return [numpy.average(ratios), numpy.std(ratios)]
+    
+    def get_mean_std(self):
+        """
+        @return [mean, std]:    mean is the average across all the ratios (averaged for each agent)
+                                std is the standard deviation across all the ratios
+        """
+        means = [m[0] for m in [self.get_mean_std_ratio(name) for name in self._agents] if m != None]
+        if len(means) == 0:
+            return None
+        return [numpy.average(numpy.array(means)), numpy.std(numpy.array(means))]
+
+class ExperimentDatabase(object):
+    """
+    Read-only view of the database of an experiment.
+    
+    @var agents: names of the agents of the original network (but the chosen one)
+    @var probabilities: array of the probabilities of telling the truth of the agents
+    @var opinions: dictionary from the name of each list of networks to an array with shape 
+                   (iterations, agents, 2, 4): the two opinions (belief, disbelief, uncertainty, base)
+                   the chosen agent has of each agent in each network of the list (NaN if none)
+    @var evidence: dictionary from the name of each list of networks to the list (one for each iteration) 
+                   of the evidence recorded by the explorations, as saved in the database (see Replay)
+    """
+    
+    def __init__(self, name, database=None):
+        """
+        @param name: name of the database (without the .db extension)
+        @param database: if not None, name of the database shared by many experiments (without the 
+                         .db extension) and name is the name of the experiment within it
+        """
+        connection = connect_read_only((name if database == None else database) + ".db")
+        try:
+            self._load(connection, name if database != None else None)
+        finally:
+            connection.close()
+            
+    def _load(self, connection, name):
+        if name == None:
+            # a database with a single experiment, whose tables might have no experiment id
+            self.chosen_agent = connection.execute("SELECT chosen_agent FROM experimentdata ORDER BY id LIMIT 1").fetchone()[0]
+            [belongs, parameters] = ["", ()]
+        else:
+            row = connection.execute("SELECT id, chosen_agent FROM experimentdata WHERE name = ?", (name,)).fetchone()
+            if row == None:
+                raise Exception("The experiment " + name + " does not exist")
+            self.chosen_agent = row[1]
+            [belongs, parameters] = [" AND experiment_id = ?", (row[0],)]
+        
+        rows = connection.execute("SELECT a.name, a.probability FROM agents a JOIN networks n ON a.network_id = n.id "
+                                  "WHERE n.id = (SELECT MIN(id) FROM networks WHERE name = ?" + belongs + ") "
+                                  "AND a.name != ? ORDER BY a.id", 
+                                  (original_network_name,) + parameters + (self.chosen_agent,)).fetchall()
+        self.agents = [r[0] for r in rows]
+        self.probabilities = numpy.array([parse_number(r[1]) for r in rows], dtype=float)
+        index = dict([(self.agents[i], i) for i in range(len(self.agents))])
+        
+        # the position of each network in its list is the iteration
+        position = {}
+        counts = dict([(n, 0) for n in experiment_set_names])
+        for [listname, network] in connection.execute("SELECT l.name, a.right_id FROM listnetworks l "
+                                                      "JOIN ass_listnetworks_networks a ON a.left_id = l.id "
+                                                      "WHERE 1 = 1" + belongs.replace("experiment_id", "l.experiment_id") + 
+                                                      " ORDER BY l.id, a.rowid", parameters):
+            if listname in counts and network not in position:
+                position[network] = [listname, counts[listname]]
+                counts[listname] += 1
+        
+        self.opinions = dict([(n, numpy.nan * numpy.ones((counts[n], len(self.agents), 2, 4))) for n in experiment_set_names])
+        query = ("SELECT trustor.network_id, trustee.name, " + _opinion_columns("first") + ", " + _opinion_columns("second") + 
+                 " FROM trustsbetweentwo t JOIN agents trustor ON t.trustor_id = trustor.id "
+                 "JOIN agents trustee ON t.trustee_id = trustee.id WHERE trustor.name = ? ORDER BY t.rowid")
+        found = set()
+        for row in connection.execute(query, (self.chosen_agent,)):
+            if row[0] in position and row[1] in index and (row[0], row[1]) not in found:
+                # as in get_opinion_agent, only the first trust for each trustee is considered
+                found.add((row[0], row[1]))
+                [listname, iteration] = position[row[0]]
+                values = [parse_number(v) for v in row[2:]]
+                self.opinions[listname][iteration, index[row[1]]] = numpy.array(values).reshape((2, 4))
+        
+        self.evidence = dict([(n, [[] for i in range(counts[n])]) for n in experiment_set_names])
+        if connection.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'explorationevidence'").fetchone() != None:
+            # in a shared database, only the evidence of the networks of this experiment is read
+            networks = ""
+            if name != None:
+                networks = (" WHERE network_id IN (SELECT a.right_id FROM listnetworks l "
+                            "JOIN ass_listnetworks_networks a ON a.left_id = l.id WHERE l.experiment_id = ?)")
+            for row in connection.execute("SELECT network_id, layer, recommender, trustee, belief, disbelief, uncertainty, base "
+                                          "FROM explorationevidence" + networks + " ORDER BY id", parameters):
+                if row[0] in position:
+                    [listname, iteration] = position[row[0]]
+                    self.evidence[listname][iteration].append([row[1], row[2], row[3], tuple(row[4:])])
+    
+    def get_correct_opinions(self):
+        """
+        @return: the array (agents, 4) of the real opinions, as in distance_ratio_results
+        """
+        return numpy.column_stack((self.probabilities, 1 - self.probabilities, 
+                                   numpy.zeros(len(self.agents)), 0.5 * numpy.ones(len(self.agents))))
+    
+    def _distances(self, opinions):
+        """
+        @param opinions: array (agents, ..., 4) of opinions
+        @return: [distances, expected value distances] between the real opinions and the given ones
+        """
+        correct = self.get_correct_opinions().reshape((len(self.agents),) + (1,) * (opinions.ndim - 2) + (4,))
+        return [distances.euclidean(correct, opinions), distances.expected_value(correct, opinions)]
+    
+    def distances(self, listname):
+        """
+        @return: [distances, expected value distances], two arrays (agents, iterations, 2) of the 
+                 distances between the real opinions and the two ones computed in each network of the list
+        """
+        return self._distances(numpy.transpose(self.opinions[listname], (1, 0, 2, 3)))
+    
+    def replay(self, listname, discount_type, consensus_type):
+        """
+        @return: array (iterations, agents, 4) of the opinions the chosen agent would have derived in each network 
+                 of the list with the given operators (see Replay.replay), NaN if the agent has not been reached
+        """
+        evidence = self.evidence[listname]
+        index = dict([(self.agents[i], i) for i in range(len(self.agents))])
+        opinions = numpy.nan * numpy.ones((len(evidence), len(self.agents), 4))
+        for iteration in range(len(evidence)):
+            if len(evidence[iteration]) == 0 and len(self.opinions[listname]) > 0 and \
+                    not numpy.all(numpy.isnan(self.opinions[listname][iteration])):
+                raise Exception("The exploration has not been recorded: it cannot be replayed")
+            decoded = [[l, r, t, decode_opinion(o)] for [l, r, t, o] in evidence[iteration]]
+            for [name, o] in replay(decoded, discount_type, consensus_type).items():
+                if name in index:
+                    opinions[iteration, index[name]] = [float(o.getBelief()), float(o.getDisbelief()), 
+                                                        float(o.getUncertainty()), float(o.getBase())]
+        return opinions
+    
+    def replay_results(self, listname, discount_type, consensus_type, against=1):
+        """
+        @param against: which of the two opinions recorded in the networks of the list the replayed ones are 
+                        compared with (0 or 1; in the sweep, 1 is the Josang discount and consensus)
+        @return: [distances, expected value distances], two instances of ArrayResults where the first 
+                 distances are the ones of the replayed opinions and the second ones of the recorded opinions
+        """
+        replayed = self._distances(numpy.transpose(self.replay(listname, discount_type, consensus_type), (1, 0, 2)))
+        recorded = self.distances(listname)
+        return [ArrayResults(self.agents, replayed[i], recorded[i][..., against]) for i in range(2)]
+    
+    def distance_ratio_results(self):
+        """
+        @return: the list of ArrayResults in the same order of ExperimentBetweenTwoSameExploration.distance_ratio_results:
+                 the distances between opinions for each list of networks, then the ones between expected values
+        """
+        results = [self.distances(n) for n in experiment_set_names]
+        return ([ArrayResults(self.agents, r[0][..., 0], r[0][..., 1]) for r in results] + 
+                [ArrayResults(self.agents, r[1][..., 0], r[1][..., 1]) for r in results])
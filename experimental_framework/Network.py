@@ -28,7 +28,7 @@ saving it into the database
 
 from sqlalchemy import Column, Integer, String, Boolean, Table, ForeignKey
 from baseSQL import Base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, selectinload, deferred
 from sqlalchemy.ext.declarative import declarative_base
 from subjective_logic.Opinion import Opinion
 import subjective_logic.Opinion
@@ -36,20 +36,21 @@ import subjective_logic.operators
 from mpmath import mpf
 import mpmath
 from beta_distribution.History import History
+from subjective_logic.Profiler import profiler
 import sys
 
 ## Table in the database for the many-to-many relationship between agents 
 #  for describing when they are linked (neighbours)
 links = Table("links", Base.metadata,
     Column("start", Integer, ForeignKey("agents.id"), primary_key=True),
-    Column("end", Integer, ForeignKey("agents.id"), primary_key=True)
+    Column("end", Integer, ForeignKey("agents.id"), primary_key=True, index=True)
 )
 
 ## Table in the database for the many-to-many relationship between a list of networks
 #  and networks 
 association_list_networks = Table("ass_listnetworks_networks", Base.metadata,
-                                  Column('left_id', Integer, ForeignKey('listnetworks.id')),
-                                  Column('right_id', Integer, ForeignKey('networks.id'))
+                                  Column('left_id', Integer, ForeignKey('listnetworks.id'), index=True),
+                                  Column('right_id', Integer, ForeignKey('networks.id'), index=True)
 )
 
 ## If you want to question about 'omega', you should ask this variable
@@ -85,6 +86,36 @@ consensus_type_josang = 'josang_consensus'
 ## Variable identifying the Aberdeen consensus operator
 consensus_type_aberdeen = 'aberdeen_consensus'
 
+## The name (in subjective_logic.operators) of the function implementing each discount operator: 
+#  it takes the opinion about the recommender and the recommended opinion
+discount_operator_names = {discount_type_josang: "discount",
+                           discount_type_aberdeen: "graphical_combination",
+                           discount_type_aberdeen2: "graphical_combination2",
+                           discount_type_aberdeen3: "graphical_combination3",
+                           discount_type_uai: "discount_UAI_referee"}
+
+## The name (in subjective_logic.operators) of the function implementing each consensus operator: 
+#  it takes a list of pairs [opinion about the recommender, discounted opinion]
+consensus_operator_names = {consensus_type_josang: "consensus_on_a_list",
+                            consensus_type_aberdeen: "graphical_discount_merge"}
+
+def get_discount_operator(discount_type):
+    """
+    @return: the function currently implementing the discount operator in subjective_logic.operators 
+             (looked up at each call, so that the replacements installed there are used)
+    """
+    if discount_type not in discount_operator_names:
+        raise Exception("Error: unknown discount operator")
+    return getattr(subjective_logic.operators, discount_operator_names[discount_type])
+
+def get_consensus_operator(consensus_type):
+    """
+    @return: the function currently implementing the consensus operator (see get_discount_operator)
+    """
+    if consensus_type not in consensus_operator_names:
+        raise Exception("Error: unknown consensus operator")
+    return getattr(subjective_logic.operators, consensus_operator_names[consensus_type])
+
 
 class ListNetworks(Base):
     """
@@ -93,6 +124,7 @@ class ListNetworks(Base):
     __tablename__ = 'listnetworks'
     id = Column(Integer, primary_key=True)
     name = Column(String(500))
+    experiment_id = deferred(Column(Integer, index=True))
     networks = relationship("AgentNetwork",
                             secondary=association_list_networks)
     
@@ -109,11 +141,25 @@ class ListNetworks(Base):
 class AgentNetwork(Base):
     """
     Data structure for a single network of agents.
+    
+    Whenever networks are loaded, their agents are loaded as well with a single query. 
+    Use with_relationships when the neighbours and trust relationships of all of them will be
+    traversed (e.g. for cloning the network).
+    
+    @var experiment_id: the experiment the network belongs to, when the database is shared by many
+                        experiments (see GenericExperiment)
+    @var base: if not None, the network this one is a snapshot of (see snapshot): the agents not in 
+               this network are the ones of the base
+    @var evidence: the evidence gathered by the exploration of the network, if recorded (see ExplorationEvidence)
     """
     __tablename__ = 'networks'
     id = Column(Integer, primary_key=True)
     name = Column(String(500))
-    agents = relationship("Agent")
+    experiment_id = deferred(Column(Integer, index=True))
+    base_id = Column(Integer, ForeignKey('networks.id'))
+    agents = relationship("Agent", lazy="selectin")
+    base = relationship("AgentNetwork", remote_side=[id])
+    evidence = relationship("ExplorationEvidence", order_by="ExplorationEvidence.id")
     
     def __init__(self, _name="original"):
         self.name = _name;
@@ -131,11 +177,16 @@ class AgentNetwork(Base):
         for ag in self.agents:
             if ag.name == name:
                 return ag
+        if self.base != None:
+            return self.base.get_agent_by_name(name)
             
     def get_agents(self):
         """
         @return a list containing all the agents in the network
         """
+        if self.base != None:
+            names = set([ag.name for ag in self.agents])
+            return self.agents + [ag for ag in self.base.get_agents() if ag.name not in names]
         return self.agents
             
     def clone(self, cloned):
@@ -161,9 +212,43 @@ class AgentNetwork(Base):
                 newag.trusts.append(TrustworthinessBetweenTwo(cloned.get_agent_by_name(trust.trustee.name),
                                                     trust.get_first_opinion(),
                                                     trust.get_second_opinion()))
+                
+    def snapshot(self, snapshot, names):
+        """
+        @param snapshot: OUT parameter (see clone)
+        @param names: names of the agents to be copied into the snapshot
+        
+        Copy-on-write alternative to clone: only the agents in names are copied (with their neighbours 
+        and trust relationships), the others are shared with this network, which becomes the base of the 
+        snapshot. The shared agents must not be modified through the snapshot: this is the case for the 
+        exploration of the network, which changes only the exploring agent.
+        """
+        snapshot.base = self
+        for name in names:
+            ag = self.get_agent_by_name(name)
+            snapshot.add_agent(Agent(ag.name, eval(ag.probability)))
+            
+        for name in names:
+            ag = self.get_agent_by_name(name)
+            newag = snapshot.get_agent_by_name(name)
+            for neigh in ag.neighbours:
+                newag.addNeighbour(snapshot.get_agent_by_name(neigh.name))
+            
+            for trust in ag.trusts:
+                newag.trusts.append(TrustworthinessBetweenTwo(snapshot.get_agent_by_name(trust.trustee.name),
+                                                    trust.get_first_opinion(),
+                                                    trust.get_second_opinion()))
             
 
 
+def with_relationships():
+    """
+    @return: the loader options (for querying AgentNetwork) loading the neighbours and the trust 
+             relationships of all the agents with a query for each relationship, instead of one for each agent
+    """
+    return [selectinload(AgentNetwork.agents).selectinload(Agent.neighbours),
+            selectinload(AgentNetwork.agents).selectinload(Agent.trusts)]
+
 class TrustworthinessBetweenTwo(Base):
     """
     Class representing the trustworthiness relationship between two agents
@@ -180,7 +265,7 @@ class TrustworthinessBetweenTwo(Base):
     __tablename__ = 'trustsbetweentwo'
       
     trustor_id = Column(Integer, ForeignKey('agents.id'), primary_key=True)
-    trustee_id = Column(Integer, ForeignKey('agents.id'), primary_key=True)
+    trustee_id = Column(Integer, ForeignKey('agents.id'), primary_key=True, index=True)
     
     
     trustee = relationship("Agent",
@@ -222,11 +307,28 @@ class TrustworthinessBetweenTwo(Base):
         """
         return self.trustee
             
+    def _decode_opinion(self, cache_name, columns):
+        """
+        Decodes the opinion stored in columns, reusing the Opinion decoded the last time
+        if the columns did not change since then.
+        
+        Instances loaded from the database do not pass through __init__, hence the cache
+        attributes might not exist yet.
+        """
+        cached = getattr(self, cache_name, None)
+        if cached is not None and cached[0] == columns:
+            return cached[1]
+        
+        op = Opinion(eval(columns[0]), eval(columns[1]), eval(columns[2]), eval(columns[3]))
+        setattr(self, cache_name, (columns, op))
+        return op
+            
     def get_first_opinion(self):
         """
         @return: an instance of the subjective logic opinion representing the degree of trustworthiness of the trustee in the first case
         """
-        return Opinion(eval(self.first_belief), eval(self.first_disbelief), eval(self.first_uncertainty), eval(self.first_base))
+        return self._decode_opinion('_first_opinion_cache', 
+                                    (self.first_belief, self.first_disbelief, self.first_uncertainty, self.first_base))
     
     def get_opinion(self):
         return self.get_first_opinion()
@@ -235,8 +337,42 @@ class TrustworthinessBetweenTwo(Base):
         """
         @return: an instance of the subjective logic opinion representing the degree of trustworthiness of the trustee in the second case
         """
-        return Opinion(eval(self.second_belief), eval(self.second_disbelief), eval(self.second_uncertainty), eval(self.second_base))
+        return self._decode_opinion('_second_opinion_cache', 
+                                    (self.second_belief, self.second_disbelief, self.second_uncertainty, self.second_base))
+
 
+class ExplorationEvidence(Base):
+    """
+    Class representing an opinion used by an exploration of the network (see explore_network_general): 
+    at layer 0, the opinions the exploring agent has of its neighbours; at layer n > 0, the opinion 
+    the recommender (known at layer n - 1) gave about the trustee, discovered at layer n.
+    
+    Agents are identified by name, so that the evidence can be replayed without loading them.
+    """
+    __tablename__ = 'explorationevidence'
+    
+    id = Column(Integer, primary_key = True)
+    network_id = Column(Integer, ForeignKey('networks.id'), index=True)
+    layer = Column(Integer)
+    recommender = Column(String(500))
+    trustee = Column(String(500))
+    
+    belief = Column(String(500))
+    disbelief = Column(String(500))
+    uncertainty = Column(String(500))
+    base = Column(String(500))
+    
+    def __init__(self, layer, recommender, trustee, opinion):
+        self.layer = layer
+        self.recommender = recommender
+        self.trustee = trustee
+        self.belief = opinion.getBelief().__repr__()
+        self.disbelief = opinion.getDisbelief().__repr__()
+        self.uncertainty = opinion.getUncertainty().__repr__()
+        self.base = opinion.getBase().__repr__()
+        
+    def get_opinion(self):
+        return Opinion(eval(self.belief), eval(self.disbelief), eval(self.uncertainty), eval(self.base))
 
 class InteractionHistory(Base):
     """
@@ -250,7 +386,7 @@ class InteractionHistory(Base):
     
     id = Column(Integer, primary_key = True)
     
-    agent_asked_id = Column(Integer, ForeignKey('agents.id'))
+    agent_asked_id = Column(Integer, ForeignKey('agents.id'), index=True)
     agent_asked = relationship("Agent",
                            primaryjoin="Agent.id==InteractionHistory.agent_asked_id")
     
@@ -275,12 +411,16 @@ class Agent(Base):
     @var omega: each agent does not know that omega is a shared belief, so it will always refer to its own copy of the
                 omega value
     @var interaction_history: the history of the interaction of this Agent with other agents 
+    
+    Agents are compared and hashed by name: the copies of an agent in different networks (e.g. in a 
+    snapshot and in its base) are the same member of a set or key of a dictionary. Sets of agents of 
+    different networks must not be mixed when the copies have to be told apart.
     """
     __tablename__ = 'agents'
 
     id = Column(Integer, primary_key = True)
-    network_id = Column(Integer, ForeignKey('networks.id'))
-    name = Column(String(500))
+    network_id = Column(Integer, ForeignKey('networks.id'), index=True)
+    name = Column(String(500), index=True)
     probability = Column(String(500))
     
     neighbours = relationship("Agent",
@@ -317,6 +457,10 @@ class Agent(Base):
         else:
             return NotImplemented
 
+    def __hash__(self):
+        # consistent with __eq__ (see the class documentation)
+        return hash(self.name)
+
     def __ne__(self, another):
         result = self.__eq__(another)
         if result is NotImplemented:
@@ -390,9 +534,31 @@ class Agent(Base):
         return self.query(ag_to_ask,ag_to_be_asked)
     
     def query(self, other, question):
+        profiler.count("queries")
         answer = other.answer(question)
         self.interaction_history.append(InteractionHistory(other, repr(question), repr(answer)))
         return answer
+    
+    def query_frozen(self, other, frozen_answers):
+        """
+        Same as query(other, question_everything), but the answer of other is sampled only once and
+        then reused until frozen_answers is emptied.
+        
+        @param frozen_answers: dictionary (agent name -> list of [trustee name, opinion]) shared among
+                               all the explorations of the same iteration. Since each exploration works
+                               on its own clone of the network, the answers are stored by name and
+                               translated back into the agents of the network other belongs to.
+        """
+        profiler.count("queries")
+        if other.name not in frozen_answers:
+            frozen_answers[other.name] = [[trustee.name, opinion] for [trustee, opinion] in other.answer(question_everything)]
+        else:
+            profiler.count("frozen answers reused")
+        
+        trustees = dict([(rel.trustee.name, rel.trustee) for rel in other.trusts])
+        answer = [[trustees[name], opinion] for [name, opinion] in frozen_answers[other.name]]
+        self.interaction_history.append(InteractionHistory(other, repr(question_everything), repr(answer)))
+        return answer
         
     def answer(self, question):
         """
@@ -417,12 +583,14 @@ class Agent(Base):
                     if self._truth():
                         return rel.get_opinion()
                     else:
+                        profiler.count("lies")
                         return subjective_logic.Opinion.get_random_opinion_different(rel.get_opinion())
         else:
             if question == question_omega:
                 if self._truth():
                     return self.omega
                 else:   
+                    profiler.count("lies")
                     return not self.omega
             elif question == question_everything:
                 ret = []
@@ -431,7 +599,10 @@ class Agent(Base):
                         if self._truth():
                             ret.append([rel.trustee, rel.get_opinion()])
                         else:
+                            profiler.count("lies")
                             ret.append([rel.trustee, subjective_logic.Opinion.get_random_opinion_different(rel.get_opinion())])
+                    else:
+                        profiler.count("omissions")
                 return ret
         
             
@@ -447,7 +618,7 @@ class Agent(Base):
         """
         return self.explore_network_general([discount_type, consensus_type])
     
-    def explore_network_general(self, list_operators):
+    def explore_network_general(self, list_operators, frozen_answers=None, evidence=None):
         """
         Method implementing the discovery of other agents in the network computing the derived trustworthiness degree according to
         the parameters.
@@ -455,6 +626,10 @@ class Agent(Base):
         @param list_operators: a list (at most two elements) of element like [discount_type, consensus_type] 
                                 where discount_type: "discount_type_josang" or "discount_type_aberdeen"
                                 and consensus_type: "consensus_type_josang" or "consensus_type_aberdeen" or "consensus_type_none"
+        @param frozen_answers: if not None, a dictionary used for caching the answers of the other agents
+                                (see query_frozen), so that several explorations can share the same evidence
+        @param evidence: if not None, a list where [layer, recommender name, trustee name, opinion] is appended
+                         for each opinion used (see ExplorationEvidence)
         """
         
         if len(list_operators) == 0 or len(list_operators) > 2:
@@ -475,13 +650,20 @@ class Agent(Base):
         
         for rel in self.trusts:
             agent_known.append(rel.trustee)
+            if evidence is not None:
+                evidence.append([0, self.name, rel.trustee.name, rel.get_opinion()])
         
+        layer = 0
         while set(agent_known) != set(agent_asked):
             
+            layer += 1
             new_trusts = []
             for ag in (set(agent_known)).difference(set(agent_asked)):
             
-                answ = self.query(ag,question_everything)
+                if frozen_answers is None:
+                    answ = self.query(ag,question_everything)
+                else:
+                    answ = self.query_frozen(ag,frozen_answers)
                 agent_asked.append(ag)
                 
                 #print >> sys.stderr, repr(ag) + "\n" + repr(answ)
@@ -508,6 +690,8 @@ class Agent(Base):
                 
                 agent_known.append(newagent)
                 #print >> sys.stderr, "Computing " + repr(newagent)
+                if evidence is not None:
+                    evidence.extend([[layer, recommender.name, newagent.name, opinion] for [recommender, opinion] in listtrusts])
                 
                 if len(listtrusts) >= 2:
                     list_t_w_first = []
@@ -0,0 +1,223 @@
+"""
+Propagation package
+Copyright (c) 2013 Federico Cerutti <federico.cerutti@acm.org>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+
+DESCRIPTION:
+
+Package encompassing the analytic propagation of trust for the discount operators 
+that are products in belief (Josang and UAI referee). The first-hand trust of a 
+network is held as sparse matrices of belief, disbelief, uncertainty and base, and 
+the opinions an exploration among honest agents (see explore_network_general) 
+derives are computed layer by layer over the breadth-first levels from the 
+exploring agent: the discount is a sparse product, the consensus a vectorized 
+reduction over the columns. The operators are computed here in closed form, not 
+through subjective_logic.operators, hence the replacements installed there (cache, 
+interpolation tables, adaptive precision) do not apply.
+"""
+
+from Network import discount_type_josang, discount_type_uai, consensus_type_josang, consensus_type_aberdeen
+from subjective_logic import distances
+from beta_distribution.History import evidence_to_opinions, fuse_evidence
+import numpy
+import scipy.sparse
+
+## Discount operators that can be propagated analytically
+propagated_discounts = [discount_type_josang, discount_type_uai]
+
+## Consensus operators that can be propagated analytically
+propagated_consensus = [consensus_type_josang, consensus_type_aberdeen]
+
+class TrustMatrices(object):
+    """
+    First-hand trust of a network: the entry (i, j) of each matrix is a component
+    of the opinion agent i has about its neighbour j
+    """
+    def __init__(self, names, starts, ends, opinions):
+        """
+        @param names: the names of the agents
+        @param starts, ends: the trusting and the trusted agent (indexes in names) of each link
+        @param opinions: array (links, 4) of the opinions of the links
+        """
+        self._names = list(names)
+        self._index = dict([(self._names[i], i) for i in range(len(self._names))])
+        n = len(self._names)
+        starts = numpy.asarray(starts, dtype=int)
+        ends = numpy.asarray(ends, dtype=int)
+        opinions = numpy.asarray(opinions, dtype=float).reshape((len(starts), 4))
+        
+        self._pattern = scipy.sparse.csr_matrix((numpy.ones(len(starts)), (starts, ends)), shape=(n, n))
+        if self._pattern.nnz != len(starts) or numpy.any(starts == ends):
+            raise Exception("Each link must be given once and join two different agents")
+        [self._belief, self._disbelief, self._uncertainty, self._base] = \
+            [scipy.sparse.csr_matrix((opinions[:, k], (starts, ends)), shape=(n, n)) for k in range(4)]
+        
+    def get_names(self):
+        return self._names
+    
+    def get_numagents(self):
+        return len(self._names)
+    
+    def get_numlinks(self):
+        return self._pattern.nnz
+    
+    def get_index(self, agent):
+        """
+        @param agent: the name or the index of an agent
+        """
+        if isinstance(agent, (int, long, numpy.integer)):
+            return int(agent)
+        if agent not in self._index:
+            raise Exception("Unknown agent: %s" % agent)
+        return self._index[agent]
+    
+    def get_opinions(self, agent):
+        """
+        @return: [indexes of the neighbours of the agent, array (neighbours, 4) of its opinions about them]
+        """
+        i = self.get_index(agent)
+        neighbours = self._pattern[i].indices
+        return [neighbours, numpy.column_stack([m[i].toarray()[0][neighbours] for m in 
+                                                [self._belief, self._disbelief, self._uncertainty, self._base]])]
+    
+    def _discount(self, discount_type, frontier, trust, new):
+        """
+        @param frontier: indexes of the recommenders
+        @param trust: array (recommenders, 4) of the opinions about them
+        @param new: diagonal matrix selecting the agents not known yet
+        @return: the sparse matrices (recommenders, agents) of the discounted opinions
+        """
+        diagonal = lambda v: scipy.sparse.diags(v)
+        pattern = self._pattern[frontier].dot(new)
+        belief = self._belief[frontier].dot(new)
+        if discount_type == discount_type_josang:
+            return [pattern, 
+                    diagonal(trust[:, 0]).dot(belief),
+                    diagonal(trust[:, 0]).dot(self._disbelief[frontier].dot(new)),
+                    diagonal(trust[:, 1] + trust[:, 2]).dot(pattern) + 
+                        diagonal(trust[:, 0]).dot(self._uncertainty[frontier].dot(new)),
+                    self._base[frontier].dot(new)]
+        return [pattern,
+                diagonal(trust[:, 0]).dot(belief),
+                diagonal(trust[:, 1]).dot(belief) + self._disbelief[frontier].dot(new),
+                diagonal(trust[:, 2]).dot(belief) + self._uncertainty[frontier].dot(new),
+                0.5 * pattern]
+    
+def _column_sums(matrix):
+    return numpy.asarray(matrix.sum(axis=0)).ravel()
+
+def _consensus(consensus_type, trust, count, pattern, belief, disbelief, uncertainty, base):
+    """
+    @return: array (agents, 4) of the consensus, for each column, of the discounted opinions in it
+             (the discounted opinion itself if it is the only one)
+    """
+    single = numpy.column_stack([_column_sums(m) for m in [belief, disbelief, uncertainty, base]])
+    several = count >= 2
+    if not numpy.any(several):
+        return single
+    
+    if consensus_type == consensus_type_josang:
+        # the consensus is the cumulative fusion in the evidence space: the evidence 2 b / u and 2 d / u
+        # of the opinions (see History.opinions_to_evidence) is summed up in each column
+        if numpy.any(_column_sums(uncertainty > 0)[several] != count[several]):
+            raise Exception("Dogmatic opinions cannot be propagated with the Josang consensus")
+        inverse = uncertainty.copy()
+        inverse.data = 2.0 / numpy.where(inverse.data > 0, inverse.data, numpy.inf)
+        [positives, negatives] = fuse_evidence(belief.multiply(inverse), disbelief.multiply(inverse))
+        merged = evidence_to_opinions(numpy.asarray(positives).ravel(), numpy.asarray(negatives).ravel())
+        merged[:, 3] = single[:, 3] / numpy.maximum(count, 1)
+    else:
+        # weighted average, by the belief plus half the uncertainty about the recommender
+        weights = trust[:, 0] + trust[:, 2] / 2
+        total = pattern.T.dot(weights)
+        if numpy.any(total[several] == 0):
+            raise Exception("The recommenders of an agent must not all be fully distrusted")
+        total[~several] = 1
+        merged = numpy.column_stack([m.T.dot(weights) / total for m in [belief, disbelief, uncertainty]] + 
+                                    [0.5 * numpy.ones(len(count))])
+    single[several] = merged[several]
+    return single
+
+def propagate(matrices, source, discount_type=discount_type_josang, consensus_type=consensus_type_josang):
+    """
+    @param matrices: instance of TrustMatrices
+    @param source: name or index of the exploring agent
+    @return: [array (agents, 4) of the opinions the source has (first-hand) or derives about each agent, 
+              NaN for itself and the agents it cannot reach; 
+              array (agents,) of the layer of explore_network_general in which each agent is reached 
+              (0 for the neighbours), -1 if it is not]
+              
+    The opinions are the first ones explore_network_general computes with [[discount_type, consensus_type]]
+    when every agent tells the truth. The base of a Josang consensus is the average of the discounted ones.
+    """
+    if discount_type not in propagated_discounts:
+        raise Exception("Error: the discount operator cannot be propagated analytically")
+    if consensus_type not in propagated_consensus:
+        raise Exception("Error: the consensus operator cannot be propagated analytically")
+    
+    n = matrices.get_numagents()
+    source = matrices.get_index(source)
+    opinions = numpy.nan * numpy.ones((n, 4))
+    layers = -numpy.ones(n, dtype=int)
+    
+    [frontier, first_hand] = matrices.get_opinions(source)
+    opinions[frontier] = first_hand
+    layers[frontier] = 0
+    known = numpy.zeros(n, dtype=bool)
+    known[source] = True
+    known[frontier] = True
+    
+    layer = 0
+    while len(frontier) > 0:
+        layer += 1
+        new = scipy.sparse.diags((~known).astype(float))
+        trust = opinions[frontier]
+        discounted = matrices._discount(discount_type, frontier, trust, new)
+        count = _column_sums(discounted[0])
+        reached = numpy.nonzero(count)[0]
+        if len(reached) == 0:
+            break
+        derived = _consensus(consensus_type, trust, count, *discounted)
+        opinions[reached] = derived[reached]
+        layers[reached] = layer
+        known[reached] = True
+        frontier = reached
+    
+    return [opinions, layers]
+
+def network_matrices(network):
+    """
+    @param network: an instance of AgentNetwork which has been bootstrapped but not explored, so that 
+                    the trusts of its agents are all first-hand
+    @return: instance of TrustMatrices with the first-hand trust of the network
+    """
+    agents = network.get_agents()
+    names = [ag.name for ag in agents]
+    index = dict([(names[i], i) for i in range(len(names))])
+    starts = []
+    ends = []
+    opinions = []
+    for i in range(len(agents)):
+        for rel in agents[i].trusts:
+            starts.append(i)
+            ends.append(index[rel.get_trustee().name])
+            opinions.append(distances.to_array(rel.get_opinion()))
+    return TrustMatrices(names, starts, ends, numpy.array(opinions).reshape((len(starts), 4)))
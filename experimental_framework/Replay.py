@@ -0,0 +1,105 @@
+"""
+Replay package
+Copyright (c) 2013 Federico Cerutti <federico.cerutti@acm.org>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+DESCRIPTION:
+
+Package encompassing the replay of the evidence recorded by the explorations 
+of the networks (see ExplorationEvidence): any pair of discount and consensus 
+operators can be applied to the same recommendations the agents gave, without 
+simulating the network again.
+"""
+
+from Network import get_discount_operator, get_consensus_operator
+from subjective_logic.Opinion import Opinion
+import mpmath
+
+def decode_number(value):
+    """
+    @param value: a number saved in the database, as the repr of an mpf (e.g. "mpf('0.5')")
+    """
+    if value.startswith("mpf('") and value.endswith("')"):
+        return mpmath.mpf(value[5:-2])
+    return eval(value, {"mpf": mpmath.mpf})
+
+def decode_opinion(columns):
+    """
+    @param columns: belief, disbelief, uncertainty and base as saved in the database
+    """
+    return Opinion(*[decode_number(v) for v in columns])
+
+def _operator(operator, get_operator):
+    if callable(operator):
+        return operator
+    return get_operator(operator)
+
+def replay(evidence, discount_type, consensus_type):
+    """
+    @param evidence: list of [layer, recommender name, trustee name, opinion], in the order recorded 
+                     by explore_network_general
+    @param discount_type: one of the discount types of Network (or a function with the same arguments 
+                          of the discount operators)
+    @param consensus_type: one of the consensus types of Network (or a function with the same arguments 
+                           of the consensus operators)
+    @return: dictionary from the name of each agent to the opinion the exploring agent has of it,
+             computed as explore_network_general does with its first pair of operators. (The second 
+             opinion of explore_network_general discounts with the opinions derived by the first pair, 
+             hence it differs from the replay of the second pair alone.)
+    """
+    discount = _operator(discount_type, get_discount_operator)
+    
+    trusts = {}
+    layers = {}
+    for [layer, recommender, trustee, opinion] in evidence:
+        if layer == 0:
+            if trustee not in trusts:
+                trusts[trustee] = opinion
+        else:
+            layers.setdefault(layer, []).append([recommender, trustee, opinion])
+    
+    for layer in sorted(layers.keys()):
+        trustees = []
+        recommendations = {}
+        for [recommender, trustee, opinion] in layers[layer]:
+            if trustee not in recommendations:
+                trustees.append(trustee)
+                recommendations[trustee] = []
+            recommendations[trustee].append([trusts[recommender], opinion])
+        
+        # the recommenders have been all discovered in the previous layers
+        derived = {}
+        for trustee in trustees:
+            pairs = [[t, discount(t, w)] for [t, w] in recommendations[trustee]]
+            if len(pairs) >= 2:
+                consensus = _operator(consensus_type, get_consensus_operator)
+                derived[trustee] = consensus(pairs)
+            else:
+                derived[trustee] = pairs[0][1]
+        trusts.update(derived)
+    
+    return trusts
+
+def network_evidence(network):
+    """
+    @param network: an instance of AgentNetwork whose exploration has been recorded
+    @return: the evidence of the network, in the format required by replay
+    """
+    return [[e.layer, e.recommender, e.trustee, e.get_opinion()] for e in network.evidence]
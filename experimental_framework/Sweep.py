@@ -0,0 +1,429 @@
+"""
+Sweep package
+Copyright (c) 2013 Federico Cerutti <federico.cerutti@acm.org>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+DESCRIPTION:
+
+Package encompassing the elements for running (and resuming) a sweep of 
+experiments: its specification, a manifest recording which configurations have 
+been started and completed, and a summary file where each configuration is 
+written only once. When the sweep is split in shards run at the same time, each 
+shard writes its own manifest and summary (see shard_filename), which are merged 
+afterwards by merge_shards.
+
+A specification is a JSON object (see default_specification) such as
+
+    {"output": "/tmp/sweep", "repetitions": 2, "numagents": 50,
+     "perclink": {"start": 5, "stop": 26, "step": 5}, "bootstrap": [2, 5, 8],
+     "iterations": 25, "operators": ["aberdeen", "uai2013"], "seed": 1,
+     "adaptive": {"target": 0.02, "min_iterations": 5, "max_iterations": 50},
+     "interpolation": {"size": 17, "directory": "/tmp/tables", "max_jump": 0.2, "max_error": 0.05},
+     "operator_cache": {"maxsize": 100000, "quantum": null}, "precision": "mpmath"}
+
+where a grid is either a list, a single value, or a range. If adaptive is given, 
+each configuration runs until the confidence intervals of its results are narrow 
+enough (see AdaptiveStopping) instead of a fixed number of iterations. If 
+interpolation is given, the graphical operators are approximated with tables 
+(see subjective_logic.interpolation) saved in the directory (by default, the 
+"tables" subdirectory of the output): the cells steeper than max_jump are left to 
+the exact operators, and the sweep refuses tables whose error estimate (measured 
+on random pairs of opinions, see InterpolationTable.get_error_estimate) exceeds 
+max_error. If operator_cache is given, the operators are memoized (see 
+subjective_logic.OperatorCache). If precision is "adaptive", the operators are 
+computed in float64 and only the ill-conditioned cases in mpmath (see 
+subjective_logic.adaptive); it cannot be combined with interpolation.
+"""
+
+import csv
+import json
+import math
+import os
+import StringIO
+from Export import read_rows, append_line
+from subjective_logic.interpolation import default_size
+from subjective_logic.OperatorCache import OperatorCache
+
+## Status of a configuration whose database has been created
+status_started = "started"
+
+## Status of a configuration whose results have been written in the summary
+status_done = "done"
+
+## Default values of the specification of a sweep (the ones of the original experiment, saved in the
+## directory "sweep" of the current one)
+default_specification = {
+    "output": "sweep",
+    "repetitions": 10,
+    "numagents": [50],
+    "perclink": {"start": 5, "stop": 26, "step": 5},
+    "bootstrap": {"start": 2, "stop": 30, "step": 3},
+    "iterations": 25,
+    "operators": None,
+    "seed": None,
+    "frozen_answers": False,
+    "profile": False,
+    "shared_database": False,
+    "adaptive": None,
+    "interpolation": None,
+    "operator_cache": None,
+    "precision": "mpmath"
+}
+
+## Precisions of the operators: mpmath only, or float64 with mpmath for the ill-conditioned cases
+precisions = ["mpmath", "adaptive"]
+
+## Parameters of the specification which are grids
+grid_parameters = ["numagents", "perclink", "bootstrap"]
+
+def _to_grid(value):
+    if isinstance(value, dict):
+        return range(value.get("start", 0), value["stop"], value.get("step", 1))
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [value]
+
+class SweepSpecification(object):
+    """
+    Specification of a sweep: a grid of configurations, each one repeated (in a different 
+    directory) a number of times. The cells of the grid are enumerated always in the same order, 
+    so that they can be split in shards run by different processes or machines.
+    """
+    
+    def __init__(self, specification=None):
+        """
+        @param specification: dictionary overriding (some of) the values of default_specification
+        """
+        self._values = dict(default_specification)
+        if specification != None:
+            for k in specification:
+                if k not in default_specification:
+                    raise Exception("Unknown parameter in the sweep specification: " + k)
+            self._values.update(specification)
+        
+        for k in grid_parameters:
+            self._values[k] = _to_grid(self._values[k])
+            
+        if self._values["adaptive"] != None:
+            # checks the parameters
+            self.get_stopping()
+        self.get_interpolation()
+        self.get_operator_cache()
+        if self._values["precision"] not in precisions:
+            raise Exception("Unknown precision: %s" % self._values["precision"])
+        if self._values["precision"] == "adaptive" and self._values["interpolation"] != None:
+            # the adaptive operators would replace the interpolation tables
+            raise Exception("The interpolation tables cannot be used with the adaptive precision")
+    
+    def get(self, parameter):
+        return self._values[parameter]
+    
+    def get_stopping(self):
+        """
+        @return: a new instance of AdaptiveStopping for a configuration, None if the number of iterations is fixed
+        """
+        if self._values["adaptive"] == None:
+            return None
+        parameters = dict([(str(k), v) for (k, v) in self._values["adaptive"].items()])
+        parameters.setdefault("max_iterations", self._values["iterations"])
+        try:
+            return AdaptiveStopping(**parameters)
+        except TypeError:
+            raise Exception("Unknown parameter in the adaptive stopping: " + ", ".join(parameters.keys()))
+        
+    def get_interpolation(self):
+        """
+        @return: [directory, size, max_jump, max_error] of the interpolation tables of the graphical 
+                 operators, None if the exact operators are used
+        """
+        interpolation = self._values["interpolation"]
+        if interpolation == None:
+            return None
+        for k in interpolation:
+            if k not in ["directory", "size", "max_jump", "max_error"]:
+                raise Exception("Unknown parameter in the interpolation: " + k)
+        size = interpolation.get("size", default_size)
+        if not (isinstance(size, (int, long)) and size >= 2):
+            raise Exception("The size of the interpolation tables must be an integer of at least 2")
+        for k in ["max_jump", "max_error"]:
+            if interpolation.get(k) != None and not interpolation[k] > 0:
+                raise Exception("The %s of the interpolation tables must be positive" % k)
+        return [interpolation.get("directory", os.path.join(self._values["output"], "tables")), size, 
+                interpolation.get("max_jump"), interpolation.get("max_error")]
+        
+    def get_operator_cache(self):
+        """
+        @return: a new instance of OperatorCache, None if the operators are not memoized
+        """
+        if self._values["operator_cache"] == None:
+            return None
+        parameters = dict([(str(k), v) for (k, v) in self._values["operator_cache"].items()])
+        try:
+            return OperatorCache(**parameters)
+        except TypeError:
+            raise Exception("Unknown parameter in the operator cache: " + ", ".join(parameters.keys()))
+        
+    def get_path(self, repetition, numagents):
+        """
+        @return: the directory where the results of the given repetition are saved: if the sweep 
+                 has more than one number of agents, each of them has its own subdirectory, since 
+                 the summary identifies a configuration by percentage of links and bootstrap
+        """
+        path = os.path.join(self._values["output"], "test-" + repr(repetition))
+        if len(self._values["numagents"]) > 1:
+            path = os.path.join(path, "agents-" + repr(numagents))
+        return path
+    
+    def get_cells(self, shard=0, shards=1):
+        """
+        @param shard: index (from 0 to shards - 1) of the shard to be returned
+        @return: the list of [index, [repetition, numagents, perclink, num_b]] of the cells belonging to the shard, 
+                 where index identifies the cell within the whole sweep
+        """
+        if not (shards >= 1 and shard >= 0 and shard < shards):
+            raise Exception("Invalid shard")
+        
+        cells = []
+        for repetition in range(self._values["repetitions"]):
+            for numagents in self._values["numagents"]:
+                for perclink in self._values["perclink"]:
+                    for num_b in self._values["bootstrap"]:
+                        cells.append([repetition, numagents, perclink, num_b])
+        return [[i, cells[i]] for i in range(len(cells)) if i % shards == shard]
+    
+    def get_paths(self):
+        """
+        @return: the sorted list of the directories of all the cells
+        """
+        return sorted(set([self.get_path(repetition, numagents) for [i, [repetition, numagents, perclink, num_b]] 
+                           in self.get_cells()]))
+
+def load_specification(filename):
+    """
+    @return: the SweepSpecification described in the JSON file
+    """
+    with open(filename) as f:
+        return SweepSpecification(json.load(f))
+
+class RunningStatistics(object):
+    """
+    Mean and variance of a sequence of values, updated one value at a time (Welford's algorithm)
+    """
+    
+    def __init__(self):
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        
+    def add(self, value):
+        self._count += 1
+        delta = value - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (value - self._mean)
+        
+    def get_count(self):
+        return self._count
+    
+    def get_mean(self):
+        return self._mean
+    
+    def get_variance(self):
+        """
+        @return: the sample variance, None with less than two values
+        """
+        if self._count < 2:
+            return None
+        return self._m2 / (self._count - 1)
+    
+    def get_half_width(self, confidence):
+        """
+        @return: the half width of the (Student's t) confidence interval of the mean, None with less than two values
+        """
+        if self._count < 2:
+            return None
+        # imported here, so that running a sweep does not load scipy unless it stops adaptively
+        import scipy.stats
+        return scipy.stats.t.ppf((1 + confidence) / 2.0, self._count - 1) * math.sqrt(self.get_variance() / self._count)
+
+class AdaptiveStopping(object):
+    """
+    Decides when a configuration has run enough iterations: each iteration gives a value (e.g. the 
+    average log ratio of the distances) for each comparison, and the configuration stops once the 
+    confidence intervals of the means of all of them are narrower than the target, after at least 
+    min_iterations and at most max_iterations iterations
+    """
+    
+    def __init__(self, target, min_iterations=5, max_iterations=25, confidence=0.95):
+        """
+        @param target: the maximum half width of the confidence intervals
+        """
+        if not (target > 0 and 0 < confidence < 1):
+            raise Exception("The target must be positive and the confidence between 0 and 1")
+        if not (2 <= min_iterations <= max_iterations):
+            raise Exception("At least two iterations are required, and no more than the maximum")
+        self._target = target
+        self._min_iterations = min_iterations
+        self._max_iterations = max_iterations
+        self._confidence = confidence
+        self._iterations = 0
+        self._statistics = {}
+        
+    def get_max_iterations(self):
+        return self._max_iterations
+    
+    def get_iterations(self):
+        return self._iterations
+    
+    def get_statistics(self):
+        """
+        @return: the dictionary from each comparison to its RunningStatistics
+        """
+        return self._statistics
+        
+    def add(self, values):
+        """
+        @param values: dictionary from each comparison to its value in the last iteration (None if it has none)
+        """
+        self._iterations += 1
+        for k in values:
+            if values[k] != None:
+                self._statistics.setdefault(k, RunningStatistics()).add(values[k])
+                
+    def is_done(self):
+        if self._iterations >= self._max_iterations:
+            return True
+        if self._iterations < self._min_iterations or len(self._statistics) == 0:
+            return False
+        for stat in self._statistics.values():
+            width = stat.get_half_width(self._confidence)
+            if width == None or width > self._target:
+                return False
+        return True
+
+class Manifest(object):
+    """
+    Append-only file recording, for each configuration of a sweep, the name of its database
+    and its status. When the same configuration appears more than once, the last line wins. 
+    A line torn by a crash is ignored.
+    """
+    
+    def __init__(self, filename, merged=None):
+        """
+        @param merged: if not None, a manifest file which is read (before filename) but never written, 
+                       e.g. the one merging the shards of a previous run
+        """
+        self._filename = filename
+        self._entries = {}
+        for f in [merged, filename]:
+            if f != None and os.path.exists(f):
+                for row in read_rows(f):
+                    if len(row) == 3:
+                        self._entries[row[0]] = [row[1], row[2]]
+                        
+    def _append(self, key, dbname, status):
+        line = StringIO.StringIO()
+        csv.writer(line, quoting=csv.QUOTE_ALL).writerow([key, dbname, status])
+        append_line(self._filename, line.getvalue())
+        self._entries[key] = [dbname, status]
+        
+    def start(self, key, dbname):
+        self._append(key, dbname, status_started)
+        
+    def done(self, key):
+        self._append(key, self.get_dbname(key), status_done)
+    
+    def get_dbname(self, key):
+        """
+        @return: the name of the database of the configuration, or None if it has never been started
+        """
+        if key in self._entries:
+            return self._entries[key][0]
+        return None
+    
+    def is_done(self, key):
+        return key in self._entries and self._entries[key][1] == status_done
+    
+    def merge(self, other):
+        """
+        Appends the entries of the manifest other which differ from the ones of this manifest
+        """
+        for key in sorted(other._entries):
+            if self._entries.get(key) != other._entries[key]:
+                self._append(key, *other._entries[key])
+    
+class Summary(object):
+    """
+    CSV file where each line starts with the key_length fields identifying a configuration. 
+    Appending a line for a configuration already in the file does nothing, hence a 
+    configuration interrupted after having written its line can be safely run again, and one 
+    whose line has been torn by a crash is run again.
+    """
+    
+    def __init__(self, filename, key_length, merged=None):
+        """
+        @param merged: if not None, a summary file which is read (before filename) but never written
+        """
+        self._filename = filename
+        self._key_length = key_length
+        self._keys = set()
+        for f in [merged, filename]:
+            if f != None and os.path.exists(f):
+                for row in read_rows(f):
+                    if len(row) > key_length:
+                        self._keys.add(tuple(row[:key_length]))
+                    
+    def contains(self, values):
+        return tuple(['{0}'.format(v) for v in values[:self._key_length]]) in self._keys
+    
+    def append(self, values):
+        """
+        @param values: the values of the line (the first key_length identify the configuration) 
+        @return: True if the line has been written
+        """
+        if self.contains(values):
+            return False
+        append_line(self._filename, ','.join(['"{0}"'.format(v) for v in values]) + '\n')
+        self._keys.add(tuple(['{0}'.format(v) for v in values[:self._key_length]]))
+        return True
+
+def shard_filename(filename, shard, shards):
+    """
+    @return: the name of the file written by the given shard in place of filename (filename itself 
+             if the sweep is not split)
+    """
+    if shards == 1:
+        return filename
+    [root, extension] = os.path.splitext(filename)
+    return "%s-%dof%d%s" % (root, shard, shards, extension)
+
+def merge_shards(manifest_filename, summary_filename, key_length, shards):
+    """
+    Merges the manifests and the summaries written by the shards of a sweep (see shard_filename) 
+    into manifest_filename and summary_filename. To be called when no shard is running; merging 
+    again adds nothing.
+    """
+    manifest = Manifest(manifest_filename)
+    summary = Summary(summary_filename, key_length)
+    for shard in range(shards):
+        manifest.merge(Manifest(shard_filename(manifest_filename, shard, shards)))
+        filename = shard_filename(summary_filename, shard, shards)
+        if os.path.exists(filename):
+            for row in read_rows(filename):
+                summary.append(row)
@@ -27,4 +27,56 @@ to be saved in the database can inherit
 """
 
 from sqlalchemy.ext.declarative import declarative_base
-Base = declarative_base()
\ No newline at end of file
+from sqlalchemy import inspect, event
+Base = declarative_base()
+
+def upgrade_schema(engine):
+    """
+    Creates the missing tables, and the columns and the indexes that databases created by older versions lack
+    """
+    Base.metadata.create_all(engine)
+    inspector = inspect(engine)
+    quote = engine.dialect.identifier_preparer.quote
+    for table in Base.metadata.sorted_tables:
+        columns = [c["name"] for c in inspector.get_columns(table.name)]
+        for column in table.columns:
+            if column.name not in columns:
+                engine.execute("ALTER TABLE " + quote(table.name) + " ADD COLUMN " + quote(column.name) + " " + 
+                               column.type.compile(dialect=engine.dialect))
+        
+        existing = [i["name"] for i in inspector.get_indexes(table.name)]
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(engine)
+
+def read_older_schema(engine):
+    """
+    Makes a database created by an older version readable without modifying it: each connection of
+    the engine gets temporary views of the tables lacking some columns (NULL in place of them) and 
+    temporary empty tables in place of the missing ones, which shadow the ones of the database
+    """
+    inspector = inspect(engine)
+    quote = engine.dialect.identifier_preparer.quote
+    tables = inspector.get_table_names()
+    statements = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in tables:
+            statements.append("CREATE TEMP TABLE " + quote(table.name) + " (" + 
+                              ", ".join([quote(c.name) + " " + c.type.compile(dialect=engine.dialect) 
+                                         for c in table.columns]) + ")")
+            continue
+        columns = [c["name"] for c in inspector.get_columns(table.name)]
+        missing = [c.name for c in table.columns if c.name not in columns]
+        if len(missing) > 0:
+            statements.append("CREATE TEMP VIEW " + quote(table.name) + " AS SELECT *, " + 
+                              ", ".join(["NULL AS " + quote(c) for c in missing]) + 
+                              " FROM main." + quote(table.name))
+    if len(statements) == 0:
+        return
+    
+    def create_views(connection, record):
+        for statement in statements:
+            connection.execute(statement)
+    event.listen(engine, "connect", create_views)
+    # the connection used by the inspector has been opened without them
+    engine.dispose()
@@ -0,0 +1,91 @@
+"""
+LRUCache package
+Copyright (c) 2013 Federico Cerutti <federico.cerutti@acm.org>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+DESCRIPTION:
+
+Package providing a bounded cache that discards the least recently used
+elements first. Opinions are never modified once created, hence they can be
+safely shared through such a cache.
+"""
+
+import collections
+
+class LRUCache():
+    """
+    Bounded dictionary that forgets the least recently used key when full
+    """
+    
+    def get_maxsize(self):
+        return self._maxsize
+    
+    def get_hits(self):
+        return self._hits
+    
+    def get_misses(self):
+        return self._misses
+    
+    def __init__(self, maxsize):
+        """
+        @param maxsize: the maximum number of elements kept in the cache
+        """
+        if not (isinstance(maxsize, (int, long)) and maxsize > 0):
+            raise Exception("The size of the cache must be a positive integer")
+        self._maxsize = maxsize
+        self._data = collections.OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        
+    def get(self, key, default=None):
+        """
+        @return: the value associated to key (which becomes the most recently used), or default
+                 if there is no such a key
+        """
+        try:
+            value = self._data.pop(key)
+        except KeyError:
+            self._misses += 1
+            return default
+        
+        self._data[key] = value
+        self._hits += 1
+        return value
+    
+    def put(self, key, value):
+        if key in self._data:
+            del self._data[key]
+        elif len(self._data) >= self._maxsize:
+            self._data.popitem(last=False)
+        self._data[key] = value
+        
+    def clear(self):
+        self._data.clear()
+        self._hits = 0
+        self._misses = 0
+        
+    def __contains__(self, key):
+        return key in self._data
+    
+    def __len__(self):
+        return len(self._data)
+    
+    def __repr__(self):
+        return "LRUCache("+repr(self._maxsize)+", hits="+repr(self._hits)+", misses="+repr(self._misses)+")"
@@ -0,0 +1,154 @@
+"""
+OperatorCache package
+Copyright (c) 2013 Federico Cerutti <federico.cerutti@acm.org>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+
+DESCRIPTION:
+
+Package providing an opt-in memoization of the operators of subjective logic. 
+Bootstrapped networks share few distinct opinions (see History.to_Opinion), so 
+the explorations apply the same operator to the same pairs over and over: once 
+installed, an OperatorCache answers such calls from a bounded LRUCache per 
+operator, keyed on the components of the opinions (exactly, or rounded to a 
+quantum, which makes the cached results approximate).
+"""
+
+from LRUCache import LRUCache
+from Opinion import Opinion
+from Profiler import profiler
+import operators
+
+## Default number of results kept for each operator
+default_maxsize = 100000
+
+## Operators taking two opinions
+pair_operators = ["discount", "consensus", "graphical_combination", "graphical_combination2", 
+                  "graphical_combination3", "discount_UAI_referee"]
+
+## Operators taking a list of pairs of opinions
+list_operators = ["consensus_on_a_list", "graphical_discount_merge"]
+
+## List operators removing the first pair from their argument, which the callers may rely on
+_pop_first = ["consensus_on_a_list"]
+
+class OperatorCache():
+    """
+    Bounded memoization of the operators, with hit and miss counts for each of them
+    """
+    
+    def get_maxsize(self):
+        return self._maxsize
+    
+    def get_quantum(self):
+        return self._quantum
+    
+    def __init__(self, maxsize=default_maxsize, quantum=None):
+        """
+        @param maxsize: the maximum number of results kept for each operator
+        @param quantum: if not None, the opinions are rounded to multiples of quantum before looking up 
+                        the cache, so that a result computed for a nearby opinion can be reused
+        """
+        if quantum != None and not quantum > 0:
+            raise Exception("The quantum must be positive")
+        self._maxsize = maxsize
+        self._quantum = quantum
+        self._caches = dict([(name, LRUCache(maxsize)) for name in pair_operators + list_operators])
+        self._replaced = {}
+        
+    def key(self, opinion):
+        """
+        @return: the hashable key of the opinion in the cache
+        """
+        values = (opinion.getBelief(), opinion.getDisbelief(), opinion.getUncertainty(), opinion.getBase())
+        if self._quantum == None:
+            return values
+        return tuple([int(round(float(v) / self._quantum)) for v in values])
+    
+    def _lookup(self, name, key, compute):
+        cache = self._caches[name]
+        result = cache.get(key)
+        if result is None:
+            if profiler.enabled:
+                profiler.count("operator cache misses")
+            result = compute()
+            cache.put(key, result)
+        elif profiler.enabled:
+            profiler.count("operator cache hits")
+        return result
+    
+    def wrap(self, name, function):
+        """
+        @return: the memoized version of the operator function with the given name
+        """
+        if name in pair_operators:
+            def cached(a, b):
+                if not (isinstance(a, Opinion) and isinstance(b, Opinion)):
+                    return function(a, b)
+                return self._lookup(name, (self.key(a), self.key(b)), lambda: function(a, b))
+        elif name in list_operators:
+            def cached(list_couple_t_w):
+                if not (isinstance(list_couple_t_w, (list, tuple)) and 
+                        all([len(p) == 2 and isinstance(p[0], Opinion) and isinstance(p[1], Opinion) 
+                             for p in list_couple_t_w])):
+                    return function(list_couple_t_w)
+                key = tuple([(self.key(t), self.key(w)) for [t, w] in list_couple_t_w])
+                computed = []
+                result = self._lookup(name, key, lambda: computed.append(True) or function(list_couple_t_w))
+                if name in _pop_first and not computed and len(list_couple_t_w) > 0:
+                    list_couple_t_w.pop(0)
+                return result
+        else:
+            raise Exception("Unknown operator: %s" % name)
+        cached.__name__ = name
+        cached.__doc__ = function.__doc__
+        return cached
+    
+    def install(self):
+        """
+        Replaces every operator in the operators package with its memoized version
+        """
+        for name in pair_operators + list_operators:
+            if name not in self._replaced:
+                self._replaced[name] = getattr(operators, name)
+                setattr(operators, name, self.wrap(name, self._replaced[name]))
+                
+    def uninstall(self):
+        """
+        Restores the operators replaced by install
+        """
+        for name in self._replaced.keys():
+            setattr(operators, name, self._replaced.pop(name))
+            
+    def get_statistics(self):
+        """
+        @return: dictionary from the name of each operator to [hits, misses, number of results kept]
+        """
+        return dict([(name, [c.get_hits(), c.get_misses(), len(c)]) for (name, c) in self._caches.items()])
+    
+    def get_hits(self):
+        return sum([c.get_hits() for c in self._caches.values()])
+    
+    def get_misses(self):
+        return sum([c.get_misses() for c in self._caches.values()])
+    
+    def clear(self):
+        for c in self._caches.values():
+            c.clear()
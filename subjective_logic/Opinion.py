@@ -29,9 +29,8 @@ Package encompassing useful elements concerning the subjective logic opinions
 import math
 from NotAnOpinionException import *
 import mpmath
-import numpy
-import pylab
 from config import epsilon
+from Profiler import profiler
 import sys
 
 def get_random_opinion():
@@ -84,6 +83,8 @@ class Opinion():
         self._uncertainty = mpmath.mpf(u)
         self._base = mpmath.mpf(a)
         self.check()
+        if profiler.enabled:
+            profiler.count("opinions")
 
 
     def check(self):
@@ -132,28 +133,17 @@ class Opinion():
         return self._uncertainty
 
     def plot_basic(self):
-        x = numpy.arange(0.0, float(1/mpmath.sin(mpmath.pi/3)), 0.01)
-        t = []
-        for l in numpy.nditer(x):
-            if l < (1 / (2 * mpmath.sin(mpmath.pi/3))):
-                t.append(float(mpmath.tan(mpmath.pi/3) * l))
-            else:
-                t.append(float(1 - mpmath.tan(mpmath.pi/3) * (l - 1/(2*mpmath.sin(mpmath.pi/3)))))
-
-        pylab.plot(x, t)
-        pylab.hold(True)
-
+        # imported here, so that the opinions do not depend on matplotlib
+        import plotting
+        plotting.plot_basic()
 
     def plot_vector(self):
-        self.plot_basic()
-        X,Y,U,V = zip(numpy.array([0,0,float(self.get_x_cartesian()), float(self.get_y_cartesian())]))
-        pylab.quiver(X,Y,U,V,angles='xy',scale_units='xy',scale=1)
-        pylab.show()
+        import plotting
+        plotting.plot_vector(self)
         
     def plot_point(self):
-        self.plot_basic()
-        pylab.plot(float(self.get_x_cartesian()), float(self.get_y_cartesian()), marker='o')
-        pylab.show()
+        import plotting
+        plotting.plot_point(self)
         
     def get_angle_alpha(self):
         if (mpmath.almosteq(self.getBelief(), 1, epsilon)):
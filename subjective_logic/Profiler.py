@@ -0,0 +1,126 @@
+"""
+Profiler package
+Copyright (c) 2013 Federico Cerutti <federico.cerutti@acm.org>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+DESCRIPTION:
+
+Package providing a lightweight profiler: phase timers and counters (queries,
+lies, operator calls, opinions constructed, rows flushed...). It is disabled by
+default, in which case each hook costs a single test.
+"""
+
+import functools
+import timeit
+
+class _Phase(object):
+    """
+    Context manager measuring the time spent in a phase
+    """
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+        
+    def __enter__(self):
+        self._start = timeit.default_timer()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._profiler.add_time(self._name, timeit.default_timer() - self._start)
+        return False
+    
+class _NoPhase(object):
+    """
+    Context manager doing nothing, used when the profiler is disabled
+    """
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+_no_phase = _NoPhase()
+
+class Profiler():
+    """
+    Collects the time spent in named phases (the time of nested phases is included in the
+    enclosing ones) and named counters
+    """
+    
+    def __init__(self):
+        self.enabled = False
+        self.reset()
+        
+    def enable(self):
+        self.enabled = True
+        
+    def disable(self):
+        self.enabled = False
+        
+    def reset(self):
+        self._counters = {}
+        self._phases = {}
+        self._calls = {}
+        
+    def count(self, name, n=1):
+        if self.enabled:
+            self._counters[name] = self._counters.get(name, 0) + n
+            
+    def add_time(self, name, seconds):
+        self._phases[name] = self._phases.get(name, 0.0) + seconds
+        self._calls[name] = self._calls.get(name, 0) + 1
+        
+    def phase(self, name):
+        """
+        To be used as: with profiler.phase("name"): ...
+        """
+        if self.enabled:
+            return _Phase(self, name)
+        return _no_phase
+    
+    def get_counters(self):
+        return dict(self._counters)
+    
+    def get_phases(self):
+        """
+        @return: dictionary phase name -> [total seconds, number of times the phase has been entered]
+        """
+        return dict([(name, [self._phases[name], self._calls[name]]) for name in self._phases])
+    
+    def get_record(self):
+        """
+        @return: a dictionary (ready to be serialised as JSON) with phases and counters
+        """
+        return {"phases": self.get_phases(), "counters": self.get_counters()}
+
+## The profiler shared by all the packages
+profiler = Profiler()
+
+def profiled(function):
+    """
+    Decorator counting the calls of an operator (counter "operators.<name>") 
+    """
+    name = "operators." + function.__name__
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if profiler.enabled:
+            profiler.count(name)
+        return function(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,237 @@
+"""
+adaptive package
+Copyright (c) 2013 Federico Cerutti <federico.cerutti@acm.org>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+
+DESCRIPTION:
+
+Adaptive precision for the operators: they are evaluated in float64 on arrays 
+(n, 4) of opinions, and only the pairs whose inputs are ill-conditioned (the 
+Josang consensus of nearly dogmatic opinions, graphical operators next to their 
+special angles or to the almosteq thresholds) or whose results are not valid 
+opinions are recomputed by the mpmath operators. install replaces the operators 
+of the package with scalar versions of the same.
+"""
+
+from Opinion import Opinion
+from config import epsilon
+from Profiler import profiler
+import operators
+import numpy
+
+## Threshold on the denominator u_a + u_b - u_a * u_b of the Josang consensus (an absolute value, between 0 
+#  and 1): under it, the pair is recomputed in mpmath
+consensus_guard = 1e-6
+
+## Distance from the special angles, and from the thresholds of almosteq, under which the graphical 
+#  operators are recomputed in mpmath
+graphical_guard = 1e-8
+
+## Tolerance on the constraints of a float64 result (components in [0, 1], summing to 1)
+constraint_tolerance = 1e-9
+
+_third = numpy.pi / 3
+_sqrt3 = numpy.sqrt(3)
+
+def _almosteq(x, y):
+    # as mpmath.almosteq(x, y, epsilon)
+    difference = numpy.abs(x - y)
+    return (difference <= epsilon) | (difference <= epsilon * numpy.maximum(numpy.abs(x), numpy.abs(y)))
+
+def _near_threshold(x, y):
+    """
+    @return: where x is so close to the border of almosteq(x, y) that float64 may take the other decision
+    """
+    return numpy.abs(numpy.abs(x - y) - epsilon) < graphical_guard * epsilon + 1e-15
+
+def invalid(results):
+    """
+    @return: boolean array (n,) of the results which are not opinions
+    """
+    with numpy.errstate(invalid="ignore"):
+        outside = numpy.any((results < -constraint_tolerance) | (results > 1 + constraint_tolerance), axis=1)
+        total = numpy.abs(numpy.sum(results[:, :3], axis=1) - 1) > constraint_tolerance
+    return ~numpy.all(numpy.isfinite(results), axis=1) | outside | total
+
+def _discount(t, c):
+    results = numpy.column_stack((t[:, 0] * c[:, 0], t[:, 0] * c[:, 1], t[:, 1] + t[:, 2] + t[:, 0] * c[:, 2], c[:, 3]))
+    return [results, numpy.zeros(len(t), dtype=bool)]
+
+def _discount_UAI_referee(t, c):
+    results = numpy.column_stack((c[:, 0] * t[:, 0], c[:, 0] * t[:, 1] + c[:, 1], c[:, 0] * t[:, 2] + c[:, 2], 
+                                  0.5 * numpy.ones(len(t))))
+    return [results, numpy.zeros(len(t), dtype=bool)]
+
+def _consensus(a, b):
+    k = a[:, 2] + b[:, 2] - a[:, 2] * b[:, 2]
+    ill = k < consensus_guard
+    safe = numpy.where(ill, 1, k)
+    results = numpy.column_stack(((a[:, 0] * b[:, 2] + b[:, 0] * a[:, 2]) / safe, (a[:, 1] * b[:, 2] + b[:, 1] * a[:, 2]) / safe,
+                                  a[:, 2] * b[:, 2] / safe, a[:, 3]))
+    return [results, ill]
+
+def _angles(w):
+    """
+    @return: [alpha, beta, epsilon, magnitude ratio, ill-conditioned] of the opinions (see Opinion)
+    """
+    [b, d, u] = [w[:, 0], w[:, 1], w[:, 2]]
+    x = (d + u * numpy.cos(_third)) / numpy.sin(_third)
+    alpha = numpy.where(_almosteq(b, 1), 0, numpy.arctan2(u * numpy.sin(_third), d + u * numpy.cos(_third)))
+    beta = numpy.where(_almosteq(d, 1), _third, numpy.arctan2(u * numpy.sin(_third), 1 - (d + u * numpy.cos(_third))))
+    length = numpy.sqrt((1 + d - u) ** 2 / 3 + b ** 2)
+    ratio = numpy.where(length > 0, b / numpy.where(length > 0, length, 1), 0)
+    delta = numpy.where(_almosteq(u, 1), 0, numpy.arcsin(numpy.clip(ratio, -1, 1)))
+    eps = numpy.pi - (_third - beta) - delta
+    max_x = (2 - u + numpy.tan(alpha) * x) / (numpy.tan(alpha) + _sqrt3)
+    max_y = -_sqrt3 * x + 2
+    magnitude = numpy.sqrt(x ** 2 + u ** 2) / numpy.sqrt(max_x ** 2 + max_y ** 2)
+    ill = _near_threshold(b, 1) | _near_threshold(d, 1) | _near_threshold(u, 1) | \
+          (~_almosteq(u, 1) & (ratio > 1 - graphical_guard))
+    return [alpha, beta, eps, magnitude, ill]
+
+def _family(t, c, angle):
+    """
+    As family_graphical_combination, with angle the array of the angles alpha'
+    """
+    [tb, td, tu] = [t[:, 0], t[:, 1], t[:, 2]]
+    magnitude = _angles(c)[3]
+    tangent = numpy.tan(angle)
+    general = magnitude * 2 * numpy.sqrt(tangent ** 2 + 1) / numpy.abs(tangent + _sqrt3) * tb
+    m = numpy.where(_almosteq(angle, -_third), magnitude * 2 * tu / _sqrt3,
+                    numpy.where(_almosteq(angle, 2 * _third), magnitude * 2 * (1 - tu) / _sqrt3,
+                                numpy.where(_almosteq(angle, numpy.pi / 2), 2 * tb, general)))
+    new_u = tu + numpy.sin(angle) * m
+    new_d = td + (tu - new_u) * numpy.cos(_third) + numpy.cos(angle) * numpy.sin(_third) * m
+    ill = numpy.zeros(len(t), dtype=bool)
+    for special in [-_third, 2 * _third, numpy.pi / 2]:
+        ill |= numpy.abs(angle - special) < graphical_guard
+    for [value, target] in [[new_u, 1], [new_u, 0], [new_d, 1], [new_d, 0]]:
+        ill |= _near_threshold(value, target)
+    new_u = numpy.where(_almosteq(new_u, 1), 1, numpy.where(_almosteq(new_u, 0), 0, new_u))
+    new_d = numpy.where(_almosteq(new_d, 1), 1, numpy.where(_almosteq(new_d, 0), 0, new_d))
+    results = numpy.column_stack((1 - new_d - new_u, new_d, new_u, 0.5 * numpy.ones(len(t))))
+    return [results, ill]
+
+def _graphical(variant):
+    def evaluate(t, c):
+        [alpha_t, beta, eps, magnitude_t, ill_t] = _angles(t)
+        [alpha, beta_c, eps_c, magnitude, ill_c] = _angles(c)
+        if variant == 1:
+            angle = alpha * eps / _third - beta
+        elif variant == 2:
+            angle = alpha * (eps - beta) / _third
+        else:
+            angle = alpha / _third * eps / 2 + eps / 2 - beta
+        [results, ill] = _family(t, c, angle)
+        return [results, ill | ill_t | ill_c]
+    return evaluate
+
+## float64 implementations of the operators taking two opinions: each returns [results, ill-conditioned pairs]
+float_operators = {"discount": _discount, "consensus": _consensus, "discount_UAI_referee": _discount_UAI_referee,
+                   "graphical_combination": _graphical(1), "graphical_combination2": _graphical(2),
+                   "graphical_combination3": _graphical(3)}
+
+## For each operator, [pairs evaluated, pairs recomputed in mpmath]
+_statistics = dict([(name, [0, 0]) for name in float_operators])
+
+## The operators replaced by install, by name
+_replaced = {}
+
+def _exact(name):
+    return _replaced.get(name, getattr(operators, name))
+
+def _to_array(opinion):
+    return [float(opinion.getBelief()), float(opinion.getDisbelief()), float(opinion.getUncertainty()), float(opinion.getBase())]
+
+def evaluate_float(name, t, c):
+    """
+    @return: [array (n, 4) of the results of the operator in float64, boolean array (n,) of the pairs which 
+             should be recomputed in mpmath (ill-conditioned, or results which are not opinions)]
+    """
+    if name not in float_operators:
+        raise Exception("Unknown operator: %s" % name)
+    t = numpy.asarray(t, dtype=float)
+    c = numpy.asarray(c, dtype=float)
+    with numpy.errstate(all="ignore"):
+        [results, ill] = float_operators[name](t, c)
+        return [results, ill | invalid(results)]
+
+def evaluate(name, t, c):
+    """
+    @param t, c: arrays (n, 4) of opinions
+    @return: array (n, 4) of the results of the operator, recomputed in mpmath where float64 is not 
+             reliable (NaN where the mpmath operator raises an exception)
+    """
+    [results, ill] = evaluate_float(name, t, c)
+    _statistics[name][0] += len(results)
+    _statistics[name][1] += int(numpy.sum(ill))
+    if profiler.enabled and numpy.any(ill):
+        profiler.count("adaptive fallbacks", int(numpy.sum(ill)))
+    for i in numpy.nonzero(ill)[0]:
+        try:
+            results[i] = _to_array(_exact(name)(Opinion(*t[i]), Opinion(*c[i])))
+        except (Exception, ZeroDivisionError):
+            results[i] = numpy.nan
+    return results
+
+def get_statistics():
+    """
+    @return: dictionary from the name of each operator to [pairs evaluated, pairs recomputed in mpmath]
+    """
+    return dict([(name, list(s)) for (name, s) in _statistics.items()])
+
+def reset_statistics():
+    for s in _statistics.values():
+        s[0] = 0
+        s[1] = 0
+
+def _scalar(name):
+    exact = _exact(name)
+    def adaptive(a, b):
+        if not (isinstance(a, Opinion) and isinstance(b, Opinion)):
+            return exact(a, b)
+        [results, ill] = evaluate_float(name, [_to_array(a)], [_to_array(b)])
+        _statistics[name][0] += 1
+        if ill[0]:
+            _statistics[name][1] += 1
+            if profiler.enabled:
+                profiler.count("adaptive fallbacks")
+            return exact(a, b)
+        return Opinion(*results[0])
+    adaptive.__name__ = name
+    adaptive.__doc__ = exact.__doc__
+    return adaptive
+
+def install():
+    """
+    Replaces the operators of the operators package taking two opinions with their adaptive versions
+    """
+    for name in float_operators:
+        if name not in _replaced:
+            _replaced[name] = getattr(operators, name)
+            setattr(operators, name, _scalar(name))
+
+def uninstall():
+    """
+    Restores the operators replaced by install
+    """
+    for name in _replaced.keys():
+        setattr(operators, name, _replaced.pop(name))
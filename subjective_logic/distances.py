@@ -0,0 +1,131 @@
+"""
+distances package
+Copyright (c) 2013 Federico Cerutti <federico.cerutti@acm.org>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+
+DESCRIPTION:
+
+Batched distances between collections of subjective logic opinions. Opinions 
+are handled as float arrays whose last axis is (belief, disbelief, uncertainty, 
+base): every distance compares two such arrays elementwise, broadcasting as 
+numpy does, and one_to_many and pairwise build on top of it. Rows of NaN stand 
+for missing opinions and give NaN distances.
+"""
+
+from Opinion import Opinion
+import numpy
+
+def to_array(opinions):
+    """
+    @param opinions: an Opinion, a (possibly nested) list of Opinions and Nones, or an array
+    @return: the float array (..., 4) of the opinions, NaN where there is None
+    """
+    if isinstance(opinions, numpy.ndarray):
+        return opinions.astype(float)
+    if opinions is None:
+        return numpy.nan * numpy.ones(4)
+    if isinstance(opinions, Opinion):
+        return numpy.array([float(opinions.getBelief()), float(opinions.getDisbelief()),
+                            float(opinions.getUncertainty()), float(opinions.getBase())])
+    if len(opinions) == 0:
+        return numpy.zeros((0, 4))
+    return numpy.array([to_array(o) for o in opinions])
+
+def expected_values(opinions):
+    """
+    @return: the array of the expected values b + a * u of the opinions
+    """
+    opinions = to_array(opinions)
+    return opinions[..., 0] + opinions[..., 3] * opinions[..., 2]
+
+def euclidean(x, y):
+    """
+    Euclidean distance on belief, disbelief and uncertainty (as Opinion.distance)
+    """
+    x, y = to_array(x), to_array(y)
+    return numpy.sqrt(numpy.sum((x[..., :3] - y[..., :3]) ** 2, axis=-1))
+
+def expected_value(x, y):
+    """
+    Distance between the expected values (as Opinion.distance_expected_value)
+    """
+    return numpy.abs(expected_values(x) - expected_values(y))
+
+def manhattan(x, y):
+    """
+    Sum of the absolute differences of belief, disbelief and uncertainty
+    """
+    x, y = to_array(x), to_array(y)
+    return numpy.sum(numpy.abs(x[..., :3] - y[..., :3]), axis=-1)
+
+def chebyshev(x, y):
+    """
+    Largest absolute difference among belief, disbelief and uncertainty
+    """
+    x, y = to_array(x), to_array(y)
+    return numpy.max(numpy.abs(x[..., :3] - y[..., :3]), axis=-1)
+
+def log_ratios(first, second):
+    """
+    @param first, second: arrays of distances (NaN where missing)
+    @return: the array of log10(second / first), NaN where either distance is missing or zero (where the 
+             ratio would be infinite or undefined)
+    """
+    first = numpy.asarray(first, dtype=float)
+    second = numpy.asarray(second, dtype=float)
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        valid = (first > 0) & (second > 0)
+        return numpy.where(valid, numpy.log10(numpy.where(valid, second, 1) / numpy.where(valid, first, 1)), numpy.nan)
+
+## distances by name
+metrics = {"euclidean": euclidean, "expected_value": expected_value, "manhattan": manhattan,
+           "chebyshev": chebyshev}
+
+def _metric(distance):
+    if distance in metrics:
+        return metrics[distance]
+    if callable(distance):
+        return distance
+    raise Exception("Unknown distance: %s" % str(distance))
+
+def elementwise(distance, x, y):
+    """
+    @param distance: name (see metrics) or function of the distance
+    @return: the array (n,) of the distances between x[i] and y[i]
+    """
+    x, y = to_array(x), to_array(y)
+    if x.shape != y.shape:
+        raise Exception("Elementwise distances need two collections of the same shape")
+    return _metric(distance)(x, y)
+
+def one_to_many(distance, x, ys):
+    """
+    @return: the array (n,) of the distances between the opinion x and each ys[i]
+    """
+    return _metric(distance)(to_array(x)[numpy.newaxis, :], to_array(ys))
+
+def pairwise(distance, xs, ys=None):
+    """
+    @return: the matrix (n, m) of the distances between xs[i] and ys[j] (between xs and themselves if ys is None)
+    """
+    xs = to_array(xs)
+    ys = xs if ys is None else to_array(ys)
+    return _metric(distance)(xs[:, numpy.newaxis, :], ys[numpy.newaxis, :, :])
@@ -0,0 +1,322 @@
+"""
+interpolation package
+Copyright (c) 2013 Federico Cerutti <federico.cerutti@acm.org>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+
+DESCRIPTION:
+
+Approximate mode for the graphical operators. Each of them is a function of two 
+points of the opinion triangle; the triangle is mapped onto the unit square 
+(uncertainty, disbelief / (1 - uncertainty)), the operator is evaluated once on a 
+regular grid of the resulting 4-dimensional cube, and afterwards it is computed by 
+multilinear interpolation in that table. Tables are saved as .npy files (read 
+memory-mapped) together with their error estimates.
+
+The error estimate of a table is empirical: the largest difference from the exact 
+operator on a fixed sample of random pairs of opinions. It is not a bound, since 
+the error between the samples can be larger. It is measured once for each max_jump 
+and saved with the table.
+
+The operators are discontinuous near the disbelief-uncertainty edge, where no 
+grid is fine enough. The accuracy loss is controlled by max_jump: the cells of the 
+grid whose corners differ by more than max_jump are left to the exact operator.
+"""
+
+from Opinion import Opinion
+import operators
+import numpy
+import json
+import os
+
+## The operators that can be approximated, by name
+graphical_operators = {"graphical_combination": operators.graphical_combination,
+                       "graphical_combination2": operators.graphical_combination2,
+                       "graphical_combination3": operators.graphical_combination3}
+
+## Default number of grid points along each of the four axes of a table
+default_size = 17
+
+## Default number of random pairs of opinions on which the error of a table is estimated
+default_error_samples = 1000
+
+## The exact operators replaced by install, by name
+_exact = {}
+
+def to_square(opinions):
+    """
+    @param opinions: array (..., 4) of opinions
+    @return: array (..., 2) of their coordinates (uncertainty, disbelief / (1 - uncertainty)) in the unit square
+    """
+    u = numpy.clip(opinions[..., 2], 0, 1)
+    rest = 1 - u
+    s = numpy.where(rest > 0, opinions[..., 1] / numpy.where(rest > 0, rest, 1), 0)
+    return numpy.stack((u, numpy.clip(s, 0, 1)), axis=-1)
+
+def from_square(points):
+    """
+    @return: array (..., 4) of the opinions (with base 1/2) at the given coordinates of the unit square
+    """
+    u = points[..., 0]
+    d = points[..., 1] * (1 - u)
+    return numpy.stack((1 - u - d, d, u, 0.5 * numpy.ones(u.shape)), axis=-1)
+
+def _as_array(opinion):
+    return numpy.array([float(opinion.getBelief()), float(opinion.getDisbelief()), 
+                        float(opinion.getUncertainty()), float(opinion.getBase())])
+
+def _exact_values(operator, t, c):
+    """
+    @return: array (n, 2) of disbelief and uncertainty of the operator applied to the rows of t and c
+             (NaN where it cannot be computed)
+    """
+    values = numpy.nan * numpy.ones((len(t), 2))
+    for i in range(len(t)):
+        try:
+            w = operator(Opinion(*t[i]), Opinion(*c[i]))
+            values[i] = [float(w.getDisbelief()), float(w.getUncertainty())]
+        except (Exception, ZeroDivisionError):
+            pass
+    return values
+
+def steep_cells(values, max_jump):
+    """
+    @param values: array (size, size, size, size, 2) of the values of a table
+    @return: boolean array (size - 1, size - 1, size - 1, size - 1) of the cells of the grid whose corners 
+             differ by more than max_jump (in disbelief or uncertainty)
+    """
+    n = values.shape[0] - 1
+    low = None
+    for corner in range(16):
+        [i, j, k, l] = [(corner >> m) & 1 for m in range(4)]
+        corner_values = values[i:i + n, j:j + n, k:k + n, l:l + n]
+        if low is None:
+            low = high = numpy.array(corner_values)
+        else:
+            low = numpy.fmin(low, corner_values)
+            high = numpy.fmax(high, corner_values)
+    return numpy.any(high - low > max_jump, axis=-1)
+
+def _valid(values):
+    """
+    @return: array (..., 4) of the opinions with the given disbelief and uncertainty, moved into the triangle
+    """
+    d = numpy.clip(values[..., 0], 0, 1)
+    u = numpy.clip(values[..., 1], 0, 1)
+    total = numpy.maximum(d + u, 1)
+    d = d / total
+    u = u / total
+    return numpy.stack((1 - d - u, d, u, 0.5 * numpy.ones(d.shape)), axis=-1)
+
+class InterpolationTable(object):
+    """
+    Table of a graphical operator on a regular grid of the (t, c) pair of unit squares
+    """
+    
+    def get_operator_name(self):
+        return self._operator_name
+    
+    def get_size(self):
+        return self._values.shape[0]
+    
+    def get_error_estimate(self):
+        """
+        @return: the largest difference (on belief, disbelief or uncertainty) from the exact operator 
+                 observed on random pairs of opinions (an empirical estimate, not a bound), None if it 
+                 has not been estimated
+        """
+        return self._error_estimates.get(self._max_jump)
+    
+    def get_error_estimates(self):
+        """
+        @return: dictionary from max_jump to the error estimate of the table with that max_jump
+        """
+        return dict(self._error_estimates)
+    
+    def get_max_jump(self):
+        """
+        @return: the largest difference between the corners of an interpolated cell, None if every cell is
+        """
+        return self._max_jump
+    
+    def __init__(self, operator_name, values, error_estimates=None, max_jump=None):
+        """
+        @param values: array (size, size, size, size, 2) of disbelief and uncertainty of the operator at the 
+                       grid points, indexed by the coordinates of t and then those of c
+        @param error_estimates: dictionary from max_jump to the error estimate of the table with that max_jump
+                                (shared with the tables returned by with_max_jump)
+        @param max_jump: if given, the cells whose corners differ by more than max_jump are not interpolated
+        """
+        if operator_name not in graphical_operators:
+            raise Exception("Unknown graphical operator: %s" % operator_name)
+        if values.ndim != 5 or values.shape[4] != 2 or len(set(values.shape[:4])) != 1 or values.shape[0] < 2:
+            raise Exception("An array (size, size, size, size, 2) with size at least 2 is required")
+        self._operator_name = operator_name
+        self._values = values
+        self._error_estimates = error_estimates if error_estimates != None else {}
+        self._max_jump = max_jump
+        self._steep = None
+        if max_jump != None:
+            self._steep = steep_cells(values, max_jump)
+        
+    def with_max_jump(self, max_jump, samples=default_error_samples):
+        """
+        @return: a table sharing the values (and the error estimates) of this one, where the cells whose 
+                 corners differ by more than max_jump are left to the exact operator. Its error is estimated 
+                 unless it already was
+        """
+        table = InterpolationTable(self._operator_name, self._values, self._error_estimates, max_jump)
+        if table.get_error_estimate() == None:
+            table.estimate_error(samples)
+        return table
+        
+    def interpolate(self, t, c):
+        """
+        @param t, c: arrays (n, 4) of opinions
+        @return: array (n, 4) of the interpolated results of the operator, NaN where the table is undefined 
+                 or the cell is too steep
+        """
+        n = self.get_size() - 1
+        x = numpy.concatenate((to_square(numpy.asarray(t, dtype=float)), 
+                               to_square(numpy.asarray(c, dtype=float))), axis=-1) * n
+        low = numpy.clip(numpy.floor(x).astype(int), 0, n - 1)
+        fraction = x - low
+        result = numpy.zeros(x.shape[:-1] + (2,))
+        for corner in range(16):
+            offset = numpy.array([(corner >> k) & 1 for k in range(4)])
+            weight = numpy.prod(numpy.where(offset == 1, fraction, 1 - fraction), axis=-1)
+            index = low + offset
+            result += weight[..., numpy.newaxis] * self._values[index[..., 0], index[..., 1], index[..., 2], index[..., 3]]
+        values = _valid(result)
+        values[numpy.any(numpy.isnan(result), axis=-1)] = numpy.nan
+        if self._steep is not None:
+            values[self._steep[low[..., 0], low[..., 1], low[..., 2], low[..., 3]]] = numpy.nan
+        return values
+    
+    def __call__(self, t, c):
+        """
+        Drop-in replacement of the operator: the exact one is used where the table is undefined
+        """
+        values = self.interpolate(_as_array(t)[numpy.newaxis], _as_array(c)[numpy.newaxis])[0]
+        if numpy.any(numpy.isnan(values)):
+            return _exact.get(self._operator_name, graphical_operators[self._operator_name])(t, c)
+        return Opinion(*values)
+    
+    def estimate_error(self, samples=default_error_samples, seed=0):
+        """
+        Estimates (and keeps) the error as the largest difference from the exact operator on random pairs 
+        of opinions (the pairs left to the exact operator have no error)
+        """
+        random = numpy.random.RandomState(seed)
+        t = numpy.column_stack((random.dirichlet([1, 1, 1], samples), 0.5 * numpy.ones(samples)))
+        c = numpy.column_stack((random.dirichlet([1, 1, 1], samples), 0.5 * numpy.ones(samples)))
+        exact = _valid(_exact_values(graphical_operators[self._operator_name], t, c))
+        error = numpy.abs(self.interpolate(t, c)[:, :3] - exact[:, :3])
+        error[numpy.isnan(error)] = 0
+        self._error_estimates[self._max_jump] = float(numpy.max(error))
+        return self._error_estimates[self._max_jump]
+    
+    def save(self, path):
+        """
+        Saves the table in path.npy and its description in path.json
+        """
+        # written aside and renamed, since several processes may be building the same table
+        temporary = "%s.%d.partial" % (path, os.getpid())
+        numpy.save(temporary + ".npy", numpy.asarray(self._values))
+        os.rename(temporary + ".npy", path + ".npy")
+        self.save_description(path)
+        
+    def save_description(self, path):
+        """
+        Saves the description of the table (with all its error estimates) in path.json
+        """
+        temporary = "%s.%d.partial" % (path, os.getpid())
+        with open(temporary + ".json", "w") as f:
+            json.dump({"operator": self._operator_name, "size": self.get_size(), "max_jump": self._max_jump,
+                       "error_estimates": sorted(self._error_estimates.items())}, f)
+        os.rename(temporary + ".json", path + ".json")
+
+def build_table(operator_name, size=default_size, samples=default_error_samples, max_jump=None):
+    """
+    Evaluates the exact operator on the grid (size ** 4 calls) and estimates the error of the table
+    """
+    if operator_name not in graphical_operators:
+        raise Exception("Unknown graphical operator: %s" % operator_name)
+    axis = numpy.linspace(0, 1, size)
+    grid = numpy.stack(numpy.meshgrid(axis, axis, axis, axis, indexing="ij"), axis=-1).reshape((-1, 4))
+    values = _exact_values(graphical_operators[operator_name], from_square(grid[:, :2]), from_square(grid[:, 2:]))
+    table = InterpolationTable(operator_name, values.reshape((size,) * 4 + (2,)), max_jump=max_jump)
+    table.estimate_error(samples)
+    return table
+
+def load_table(path):
+    """
+    @param path: the path given to InterpolationTable.save
+    @return: the table, whose values are memory-mapped
+    """
+    with open(path + ".json") as f:
+        description = json.load(f)
+    if "error_estimates" in description:
+        error_estimates = dict([(max_jump, error) for [max_jump, error] in description["error_estimates"]])
+    else:
+        # saved by the earlier versions, with the estimate for the max_jump of the table only
+        error_estimates = {description.get("max_jump"): description["max_error"]}
+    return InterpolationTable(description["operator"], numpy.load(path + ".npy", mmap_mode="r"), 
+                              error_estimates, description.get("max_jump"))
+
+def load_or_build(directory, operator_name, size=default_size, max_jump=None):
+    """
+    @return: the table of the operator with the given size saved in the directory, built and saved if missing
+             (with the cells steeper than max_jump left to the exact operator, if given). The error estimate 
+             for max_jump is saved with the table the first time it is needed
+    """
+    path = os.path.join(directory, "%s-%d" % (operator_name, size))
+    if not os.path.exists(path + ".json"):
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        build_table(operator_name, size).save(path)
+    table = load_table(path)
+    if max_jump == None:
+        return table
+    estimated = max_jump in table.get_error_estimates()
+    limited = table.with_max_jump(max_jump)
+    if not estimated:
+        # the estimates are shared: the new one is saved with the description of the stored table
+        table.save_description(path)
+    return limited
+
+def install(tables):
+    """
+    Replaces, in the operators package, each graphical operator with its table (approximate mode)
+    
+    @param tables: list of instances of InterpolationTable
+    """
+    for table in tables:
+        name = table.get_operator_name()
+        if name not in _exact:
+            _exact[name] = getattr(operators, name)
+        setattr(operators, name, table)
+
+def uninstall():
+    """
+    Restores the exact graphical operators
+    """
+    for name in _exact.keys():
+        setattr(operators, name, _exact.pop(name))
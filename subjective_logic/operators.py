@@ -27,8 +27,11 @@ Package encompassing the operators for subjective logic opinions
 
 from Opinion import Opinion
 from config import epsilon
+from Profiler import profiled
 import mpmath
+import numpy
 
+@profiled
 def discount(a_recommends_b, b_opinion_x):
     """
     Josang discount operator
@@ -45,6 +48,7 @@ def discount(a_recommends_b, b_opinion_x):
             b_opinion_x.getBase()
             )
 
+@profiled
 def consensus(a_recommends_c, b_recommends_c):
     """
     Josang consensus operator (from Trust Network Analysis with Subjective Logic -- Josang, Hayward, Pope)
@@ -67,6 +71,7 @@ def consensus(a_recommends_c, b_recommends_c):
                    a_recommends_c.getBase()
                    )
     
+@profiled
 def consensus_on_a_list(list_couple_t_w):
     """
     Josang consensus operator working on a list of opinions of which we know the 
@@ -96,6 +101,7 @@ def consensus_on_a_list(list_couple_t_w):
         resw = t
     return resw
 
+@profiled
 def graphical_discount_merge(list_couple_t_w):
     """
     Aberdeen geometrical operator operating on a list of opinions of which we know the 
@@ -136,6 +142,7 @@ def graphical_discount_merge(list_couple_t_w):
 
     
 
+@profiled
 def graphical_combination(t, c):
     """
     Aberdeen graphical discount operator: original version described in http://arxiv.org/abs/1309.4994
@@ -143,6 +150,7 @@ def graphical_combination(t, c):
     return family_graphical_combination(t, c, ( (c.get_angle_alpha() * t.get_angle_epsilon() / (mpmath.pi / mpmath.mpf("3"))) - t.get_angle_beta()))
 
 
+@profiled
 def graphical_combination2(t, c):
     """
     Aberdeen graphical discount operator: second version
@@ -150,6 +158,7 @@ def graphical_combination2(t, c):
     return family_graphical_combination(t, c, (c.get_angle_alpha() * (t.get_angle_epsilon() - t.get_angle_beta()) / (mpmath.pi / mpmath.mpf("3"))))
 
 
+@profiled
 def graphical_combination3(t, c):
     """
     Aberdeen graphical discount operator: third version
@@ -202,6 +211,7 @@ def family_graphical_combination(t, c, angle_alpha_prime):
                    )
     
     
+@profiled
 def discount_UAI_referee(t, c):
     """
     Discount operator suggested by the UAI referee
@@ -210,4 +220,96 @@ def discount_UAI_referee(t, c):
                    c.getBelief() * t.getDisbelief() + c.getDisbelief(),
                    c.getBelief() * t.getUncertainty() + c.getUncertainty(),
                    "1/2"
-                   )
\ No newline at end of file
+                   )
+
+def _check_path(path_opinions):
+    if not (isinstance(path_opinions, (list, tuple)) and len(path_opinions) >= 1):
+        raise Exception("A non-empty list of opinions along the path is required")
+    for w in path_opinions:
+        if not (isinstance(w, Opinion) and w.check()):
+            raise Exception("Valid opinions are required")
+
+def _discount_chain_josang(path_opinions):
+    # the beliefs multiply along the path: only the last opinion keeps its disbelief and uncertainty
+    belief = mpmath.mpf("1")
+    for w in path_opinions[:-1]:
+        belief = belief * w.getBelief()
+    last = path_opinions[-1]
+    return Opinion(belief * last.getBelief(),
+                   belief * last.getDisbelief(),
+                   mpmath.mpf("1") - belief + belief * last.getUncertainty(),
+                   last.getBase())
+
+def _discount_chain_UAI_referee(path_opinions):
+    if len(path_opinions) == 1:
+        return path_opinions[0]
+    [b, d, u] = [path_opinions[0].getBelief(), path_opinions[0].getDisbelief(), path_opinions[0].getUncertainty()]
+    for c in path_opinions[1:]:
+        [b, d, u] = [c.getBelief() * b, c.getBelief() * d + c.getDisbelief(), c.getBelief() * u + c.getUncertainty()]
+    return Opinion(b, d, u, "1/2")
+
+## Chains computed in closed form, by discount operator. The keys are the functions of this package: 
+#  the versions installed by OperatorCache, adaptive or interpolation are applied hop by hop, so that they 
+#  are not bypassed. The graphical operators depend on the angles of the opinion about the recommender, 
+#  hence their chains apply them hop by hop too
+_fused_chains = {discount: _discount_chain_josang, discount_UAI_referee: _discount_chain_UAI_referee}
+
+## Name of the float64 version (see adaptive.float_operators) of each discount operator of this package
+_float_discounts = {discount: "discount", discount_UAI_referee: "discount_UAI_referee", 
+                    graphical_combination: "graphical_combination", graphical_combination2: "graphical_combination2",
+                    graphical_combination3: "graphical_combination3"}
+
+@profiled
+def discount_chain(path_opinions, discount_operator=discount):
+    """
+    End-to-end discount along a referral chain A -> B -> ... -> Y about x
+    
+    @param path_opinions: the list [w^A_B, w^B_C, ..., w^Y_x] of the opinions along the path
+    @param discount_operator: a discount operator taking two opinions
+    @return: the opinion of A about x, i.e. discount_operator applied from the left along the path
+             (the trust derived in a hop is the trust in the recommender of the next one)
+    """
+    _check_path(path_opinions)
+    if discount_operator in _fused_chains:
+        return _fused_chains[discount_operator](path_opinions)
+    result = path_opinions[0]
+    for w in path_opinions[1:]:
+        result = discount_operator(result, w)
+    return result
+
+def _to_float_paths(paths):
+    if isinstance(paths, numpy.ndarray):
+        return paths.astype(float)
+    return numpy.array([[[float(w.getBelief()), float(w.getDisbelief()), float(w.getUncertainty()), float(w.getBase())]
+                         for w in path] for path in paths])
+
+def discount_chains(paths, discount_operator=discount):
+    """
+    Batched discount_chain over many paths of the same length, in floating point. The Josang chains are 
+    computed in closed form; the other discount operators of this package are applied hop by hop to all 
+    the paths at once, through adaptive.evaluate (NaN where the operator raises an exception); any other 
+    function (e.g. an operator installed by OperatorCache) is applied path by path
+    
+    @param paths: array (paths, hops, 4) of the opinions along each path (or the corresponding nested lists of Opinions)
+    @return: array (paths, 4) of the end-to-end opinions
+    """
+    paths = _to_float_paths(paths)
+    if paths.ndim != 3 or paths.shape[1] < 1 or paths.shape[2] != 4:
+        raise Exception("An array (paths, hops, 4) of opinions is required")
+    if discount_operator is discount:
+        last = paths[:, -1]
+        belief = numpy.prod(paths[:, :-1, 0], axis=1)
+        return numpy.column_stack((belief * last[:, 0], belief * last[:, 1], 
+                                   1 - belief + belief * last[:, 2], last[:, 3]))
+    if discount_operator in _float_discounts:
+        # imported here, since adaptive imports this module
+        import adaptive
+        result = paths[:, 0].copy()
+        for hop in range(1, paths.shape[1]):
+            result = adaptive.evaluate(_float_discounts[discount_operator], result, paths[:, hop])
+        return result
+    result = numpy.zeros((paths.shape[0], 4))
+    for i in range(paths.shape[0]):
+        w = discount_chain([Opinion(*row) for row in paths[i]], discount_operator)
+        result[i] = [float(w.getBelief()), float(w.getDisbelief()), float(w.getUncertainty()), float(w.getBase())]
+    return result
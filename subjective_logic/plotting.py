@@ -0,0 +1,55 @@
+"""
+plotting package
+Copyright (c) 2013 Federico Cerutti <federico.cerutti@acm.org>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+
+
+DESCRIPTION:
+
+Plots of the subjective logic opinions on the opinion triangle. This package 
+(and hence matplotlib) is imported only when an Opinion is plotted.
+"""
+
+import mpmath
+import numpy
+import pylab
+
+def plot_basic():
+    x = numpy.arange(0.0, float(1/mpmath.sin(mpmath.pi/3)), 0.01)
+    t = []
+    for l in numpy.nditer(x):
+        if l < (1 / (2 * mpmath.sin(mpmath.pi/3))):
+            t.append(float(mpmath.tan(mpmath.pi/3) * l))
+        else:
+            t.append(float(1 - mpmath.tan(mpmath.pi/3) * (l - 1/(2*mpmath.sin(mpmath.pi/3)))))
+
+    pylab.plot(x, t)
+    pylab.hold(True)
+
+def plot_vector(opinion):
+    plot_basic()
+    X,Y,U,V = zip(numpy.array([0,0,float(opinion.get_x_cartesian()), float(opinion.get_y_cartesian())]))
+    pylab.quiver(X,Y,U,V,angles='xy',scale_units='xy',scale=1)
+    pylab.show()
+    
+def plot_point(opinion):
+    plot_basic()
+    pylab.plot(float(opinion.get_x_cartesian()), float(opinion.get_y_cartesian()), marker='o')
+    pylab.show()
@@ -23,8 +23,13 @@ THE SOFTWARE.
 
 import unittest
 
+import numpy
+
 from beta_distribution.BetaDistribution import *
+from beta_distribution.BetaDistributionBatch import *
 from beta_distribution.NotABetaDistributionException import *
+from subjective_logic.Opinion import Opinion
+import subjective_logic.operators as operators
 
 class  BetadistributionTestCase(unittest.TestCase):
 
@@ -57,6 +62,51 @@ class  BetadistributionTestCase(unittest.TestCase):
     def test_betadistribution_distribution4(self):
         self.assertEquals(self.betalessthan1.distribution(1), 0, "error limit case beta < 1")
 
+    def test_betadistribution_pdf(self):
+        d = BetaDistribution(3, 5)
+        p = numpy.linspace(0, 1, 11)
+        self.assertTrue(numpy.allclose(d.pdf(p), [d.distribution(x) for x in p]))
+
+    def test_betadistribution_pdf_limit_cases(self):
+        self.assertEquals(self.alphalessthan1.pdf(0), 0, "error limit case alpha < 1")
+        self.assertEquals(self.betalessthan1.pdf(1), 0, "error limit case beta < 1")
+
+    def test_betadistribution_pdf_raise(self):
+        self.assertRaisesRegexp(Exception, "Distributions are computed between 0 and 1...", self.b.pdf, [0.5, 1.2])
+
+    def test_betadistribution_quantile(self):
+        d = BetaDistribution(3, 5)
+        q = numpy.array([0.1, 0.5, 0.9])
+        self.assertTrue(numpy.allclose(d.cdf(d.quantile(q)), q))
+
+    def test_betadistribution_batch(self):
+        batch = from_histories([0, 4, 9], [9, 4, 0])
+        p = numpy.linspace(0, 1, 5)
+        res = batch.pdf(p)
+        self.assertEquals(res.shape, (3, 5))
+        for i in range(len(batch)):
+            self.assertTrue(numpy.allclose(res[i], batch[i].pdf(p)))
+
+    def test_betadistribution_opinion_round_trip(self):
+        o = Opinion("1/5", "1/2", "3/10", "1/2")
+        self.assertEqual(from_Opinion(o).to_Opinion(), o)
+        self.assertRaisesRegexp(Exception, "base 1/2", from_Opinion, Opinion("1/5", "1/2", "3/10", "1/3"))
+
+    def test_betadistribution_fuse(self):
+        a = Opinion("1/5", "1/2", "3/10", "1/2")
+        b = Opinion("1/3", "1/3", "1/3", "1/2")
+        self.assertEqual(from_Opinion(a).fuse(from_Opinion(b)).to_Opinion(), operators.consensus(a, b))
+
+    def test_betadistribution_integer_to_opinion(self):
+        self.assertEqual(BetaDistribution(3, 5).to_Opinion(), Opinion("1/4", "1/2", "1/4", "1/2"))
+
+    def test_betadistribution_discount(self):
+        d = BetaDistribution(5, 3).discount(0.5)
+        self.assertEquals([d.getAlpha(), d.getBeta()], [3, 2])
+
+    def test_betadistribution_batch_input(self):
+        self.assertRaises(NotABetaDistributionException, BetaDistributionBatch, [1, 0], [1, 1])
+
 if __name__ == '__main__':
     unittest.main()
 
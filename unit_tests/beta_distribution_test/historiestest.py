@@ -23,7 +23,10 @@ THE SOFTWARE.
 
 import unittest
 
+import numpy
+
 from beta_distribution.History import *
+import subjective_logic.operators as operators
 
 class  HistoriesTestCase(unittest.TestCase):
     #def setUp(self):
@@ -52,6 +55,55 @@ class  HistoriesTestCase(unittest.TestCase):
     def test_histories_negative3(self):
         self.assertRaisesRegexp(Exception, "History requires an history!", History, -1, -1)
 
+    def test_histories_to_opinion(self):
+        self.assertEqual(History(1, 1).to_Opinion(), Opinion("1/4", "1/4", "1/2", "1/2"))
+
+    def test_histories_to_opinion_pool(self):
+        self.assertTrue(History(7, 3).to_Opinion() is History(7, 3).to_Opinion())
+
+    def test_histories_history_pool(self):
+        clear_history_pool()
+        self.assertTrue(History(2, 3).to_BetaDistribution() is History(2, 3).to_BetaDistribution())
+        self.assertTrue(History(2, 3).to_Opinion() is History(2, 3).to_Opinion())
+        self.assertEqual(len(history_pool), 1)
+        clear_history_pool()
+        self.assertEqual(len(history_pool), 0)
+
+    def test_histories_to_opinions(self):
+        res = histories_to_opinions(numpy.array([0, 3, 10]), numpy.array([5, 3, 0]))
+        for i, [x, notx] in enumerate([[0, 5], [3, 3], [10, 0]]):
+            op = History(x, notx).to_Opinion()
+            self.assertTrue(numpy.allclose(res[i], [float(op.getBelief()), float(op.getDisbelief()), 
+                                                    float(op.getUncertainty()), float(op.getBase())]))
+
+    def test_histories_fuse(self):
+        self.assertEqual(History(3, 1).fuse(History(2, 5)).to_Opinion(), 
+                         operators.consensus(History(3, 1).to_Opinion(), History(2, 5).to_Opinion()))
+
+    def test_histories_beta_distribution_to_opinion(self):
+        self.assertEqual(History(2, 4).to_BetaDistribution().to_Opinion(), History(2, 4).to_Opinion())
+        self.assertEqual(History(3, 1).fuse(History(2, 5)).to_BetaDistribution().to_Opinion(), 
+                         History(5, 6).to_Opinion())
+
+    def test_histories_evidence_round_trip(self):
+        positives = numpy.array([0.0, 2.5, 7.0])
+        negatives = numpy.array([1.0, 0.0, 3.5])
+        [r, s] = opinions_to_evidence(evidence_to_opinions(positives, negatives))
+        self.assertTrue(numpy.allclose(r, positives))
+        self.assertTrue(numpy.allclose(s, negatives))
+
+    def test_histories_fuse_evidence(self):
+        [r, s] = fuse_evidence(numpy.array([[1, 2], [3, 4]]), numpy.array([[0, 1], [1, 0]]))
+        self.assertEqual(list(r), [4, 6])
+        self.assertEqual(list(s), [1, 1])
+        self.assertTrue(numpy.issubdtype(r.dtype, numpy.integer))
+
+    def test_histories_discount_evidence_raise(self):
+        self.assertRaisesRegexp(Exception, "The weight must be between 0 and 1", discount_evidence, [1], [1], [1.5])
+
+    def test_histories_to_opinions_not_integer(self):
+        self.assertRaisesRegexp(Exception, "History is made by integers/long only!", histories_to_opinions, [1.5], [1])
+
     
 
 if __name__ == '__main__':
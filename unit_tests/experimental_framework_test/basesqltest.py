@@ -0,0 +1,75 @@
+"""
+an unittest package
+Copyright (c) 2013 Federico Cerutti <federico.cerutti@acm.org>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import unittest
+
+from sqlalchemy import create_engine, inspect, event
+from sqlalchemy.orm import sessionmaker
+from experimental_framework.baseSQL import Base, upgrade_schema
+from experimental_framework.Network import Agent, AgentNetwork, with_relationships
+
+class  BaseSQLTestCase(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        
+    def tearDown(self):
+        self.engine.dispose()
+
+    def test_basesql_upgrade(self):
+        self.engine.execute("CREATE TABLE agents (id INTEGER PRIMARY KEY, network_id INTEGER, name VARCHAR(500), "
+                            "probability VARCHAR(500), omega BOOLEAN)")
+        self.assertEqual(inspect(self.engine).get_indexes("agents"), [])
+        
+        upgrade_schema(self.engine)
+        upgrade_schema(self.engine)
+        inspector = inspect(self.engine)
+        self.assertEqual(set([i["name"] for i in inspector.get_indexes("agents")]), 
+                         set(["ix_agents_network_id", "ix_agents_name"]))
+        self.assertEqual([i["column_names"] for i in inspector.get_indexes("trustsbetweentwo")], [["trustee_id"]])
+        self.assertEqual(len(inspector.get_indexes("ass_listnetworks_networks")), 2)
+        
+    def test_basesql_eager_loading(self):
+        upgrade_schema(self.engine)
+        session = sessionmaker(bind=self.engine)()
+        network = AgentNetwork()
+        agents = [Agent("Agent"+repr(i), "0.5") for i in range(20)]
+        for ag in agents:
+            ag.addNeighbour(agents[0])
+            network.add_agent(ag)
+        session.add(network)
+        session.commit()
+        session.close()
+        
+        statements = []
+        event.listen(self.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        session = sessionmaker(bind=self.engine)()
+        network = session.query(AgentNetwork).options(*with_relationships()).first()
+        self.assertEqual(sum([len(ag.neighbours) + len(ag.trusts) for ag in network.get_agents()]), 20)
+        # the network, its agents, their neighbours and their trust relationships: 
+        # the number of queries does not depend on the number of agents
+        self.assertEqual(len(statements), 4)
+        session.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
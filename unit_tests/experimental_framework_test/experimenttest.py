@@ -0,0 +1,233 @@
+"""
+an unittest package
+Copyright (c) 2013 Federico Cerutti <federico.cerutti@acm.org>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import unittest
+import random
+import tempfile
+import shutil
+import os
+import sqlite3
+import hashlib
+
+from experimental_framework.Experiment import BootstrapExperiment, ExperimentBetweenTwoSameExploration, \
+    DistancesBetweenTwo, dispose_shared_engines
+from experimental_framework.Network import AgentNetwork, ListNetworks, discount_type_josang, consensus_type_josang, \
+    discount_type_uai, consensus_type_aberdeen
+from experimental_framework.Generator import Generator, agent_name
+from experimental_framework import Loader
+from subjective_logic.Opinion import Opinion
+from mpmath import mpf
+
+class SameExploration(BootstrapExperiment, ExperimentBetweenTwoSameExploration):
+    def run_experiment(self):
+        self._start_iteration()
+        sets = self._experiment_sets()
+        for i in range(len(sets)):
+            if self.is_experiment_set_selected(i):
+                sets[i].add_network(self._network_exploration_general("explored", self._bootstrapped_network, 
+                                                                      [[discount_type_uai, consensus_type_aberdeen], 
+                                                                       [discount_type_josang, consensus_type_josang]]))
+
+class  ExperimentTestCase(unittest.TestCase):
+    def setUp(self):
+        random.seed(1)
+        self.directory = tempfile.mkdtemp()
+        self.name = os.path.join(self.directory, "exp")
+        
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        
+    def _new_experiment(self):
+        t = SameExploration(self.name, agent_name(0), resume=True)
+        if not t.is_loaded():
+            t.add_generated_network(Generator(1).erdos_renyi(8, 0.4))
+        t.select_experiment_sets([0, 1])
+        t.bootstrap(3)
+        t.save()
+        return t
+
+    def test_experiment_resume_incomplete_iteration(self):
+        t = self._new_experiment()
+        t.run_experiment()
+        t.save()
+        # interrupted while running the second iteration: only its first exploration has been saved
+        t._experiment_sets()[0].add_network(t._network_exploration_general("explored", t._bootstrapped_network, 
+                                                                           [[discount_type_josang, consensus_type_josang]]))
+        t.save()
+        t.close()
+        
+        t = self._new_experiment()
+        self.assertTrue(t.is_loaded())
+        self.assertEqual([len(l.get_networks()) for l in t._experiment_sets()], [2, 1, 0, 0])
+        self.assertEqual(t.discard_incomplete_iterations(), 1)
+        self.assertEqual([len(l.get_networks()) for l in t._experiment_sets()], [1, 1, 0, 0])
+        t.run_experiment()
+        t.save()
+        self.assertEqual([len(l.get_networks()) for l in t._experiment_sets()], [2, 2, 0, 0])
+        self.assertEqual(sorted(t.iteration_ratios(1).keys()), [0, 1])
+        t.close()
+        
+    def test_experiment_zero_distances(self):
+        # as in iteration_ratios, the ratios are not defined where a distance is zero
+        result = DistancesBetweenTwo(agent_name(1))
+        for [first, second] in [[0.5, 0.05], [0.0, 0.2], [0.2, 0.0], [None, 0.1]]:
+            result.add_first_distance(first)
+            result.add_second_distance(second)
+        self.assertEqual(len(result.get_ratios()), 1)
+        self.assertAlmostEqual(float(result.get_ratios()[0]), -1)
+        
+    def test_experiment_distances_mpmath(self):
+        # the float64 distances agree with Opinion.distance and Opinion.distance_expected_value
+        t = self._new_experiment()
+        t.run_experiment()
+        t.run_experiment()
+        t.save()
+        results = t.distance_ratio_results()
+        chosen = t.get_chosen_agent()
+        compared = 0
+        for [i, exact] in [[0, Opinion.distance], [4, Opinion.distance_expected_value]]:
+            for ag in t.get_original_network().get_agents():
+                if ag.name == chosen:
+                    continue
+                correct = Opinion(eval(ag.probability), mpf("1") - eval(ag.probability), "0", "1/2")
+                distances = results[i]._result_from_agent(ag)
+                for n in range(len(t._experiment_sets()[0].get_networks())):
+                    derived = t._experiment_sets()[0].get_networks()[n].get_agent_by_name(chosen).get_opinion_agent(ag)
+                    if derived == None:
+                        self.assertEqual(distances.get_first_distances()[n], None)
+                        continue
+                    [first, second] = derived
+                    self.assertAlmostEqual(distances.get_first_distances()[n], float(exact(correct, first)), places=12)
+                    self.assertAlmostEqual(distances.get_second_distances()[n], float(exact(correct, second)), places=12)
+                    compared += 1
+        self.assertTrue(compared > 0)
+        t.close()
+
+        
+    def test_experiment_discard(self):
+        database = os.path.join(self.directory, "shared")
+        other = SameExploration("exp-8-30-2-3", agent_name(3), resume=True, database=database)
+        other.add_generated_network(Generator(1).erdos_renyi(8, 0.4))
+        other.save()
+        other.close()
+        # interrupted before its network has been committed
+        SameExploration("exp-8-30-2-1", agent_name(1), resume=True, database=database).close()
+        
+        t = SameExploration("exp-8-30-2-1", None, resume=True, database=database)
+        self.assertTrue(t.is_loaded())
+        t.discard()
+        t = SameExploration("exp-8-30-2-1", agent_name(1), resume=True, database=database)
+        self.assertFalse(t.is_loaded())
+        self.assertEqual(t.get_chosen_agent(), agent_name(1))
+        self.assertEqual(len(t.get_original_network().get_agents()), 0)
+        # the record of the discarded experiment and its networks are gone (its id is reused)
+        t.save()
+        self.assertEqual(t._query(AgentNetwork).count(), 1)
+        self.assertEqual(t._query(ListNetworks).count(), 4)
+        t.close()
+        
+        other = SameExploration("exp-8-30-2-3", None, resume=True, database=database)
+        self.assertEqual(len(other.get_original_network().get_agents()), 8)
+        self.assertRaisesRegexp(Exception, "cannot be discarded", other.discard)
+        other.close()
+        dispose_shared_engines()
+
+        
+    def test_experiment_older_schema(self):
+        t = self._new_experiment()
+        t.set_copy_on_write(False)
+        t.set_record_evidence(False)
+        t.run_experiment()
+        t.save()
+        t.close()
+        # as saved by the versions without snapshots and evidence
+        connection = sqlite3.connect(self.name + ".db")
+        connection.executescript("CREATE TABLE old AS SELECT id, name FROM networks; DROP TABLE networks; "
+                                 "ALTER TABLE old RENAME TO networks; DROP TABLE explorationevidence;")
+        connection.close()
+        with open(self.name + ".db", "rb") as f:
+            digest = hashlib.md5(f.read()).hexdigest()
+        
+        t = SameExploration(self.name, None)
+        self.assertTrue(t.is_protected())
+        t.select_experiment_sets([0, 1])
+        self.assertEqual(t.completed_iterations(), 1)
+        explored = t._experiment_sets()[0].get_networks()[0]
+        self.assertEqual(explored.base, None)
+        self.assertEqual(len(explored.get_agents()), 8)
+        self.assertEqual(len(explored.evidence), 0)
+        t.close()
+        with open(self.name + ".db", "rb") as f:
+            self.assertEqual(hashlib.md5(f.read()).hexdigest(), digest)
+        
+        # resumed, it is upgraded
+        t = SameExploration(self.name, None, resume=True)
+        self.assertEqual(len(t._experiment_sets()[0].get_networks()[0].get_agents()), 8)
+        t.close()
+        connection = sqlite3.connect(self.name + ".db")
+        self.assertTrue("base_id" in [row[1] for row in connection.execute("PRAGMA table_info(networks)")])
+        connection.close()
+
+        
+    def test_experiment_shared_evidence(self):
+        database = os.path.join(self.directory, "shared")
+        for i in [1, 3]:
+            t = SameExploration("exp-8-40-3-%d" % i, agent_name(i), resume=True, database=database)
+            t.add_generated_network(Generator(i).erdos_renyi(8, 0.4))
+            t.select_experiment_sets([0, 1])
+            t.bootstrap(3)
+            t.run_experiment()
+            t.save()
+            t.close()
+        dispose_shared_engines()
+        connection = sqlite3.connect(database + ".db")
+        total = connection.execute("SELECT COUNT(*) FROM explorationevidence").fetchone()[0]
+        connection.close()
+        
+        # the evidence of the other experiment is not read
+        read = []
+        class Connection(object):
+            def __init__(self, connection):
+                self._connection = connection
+            def execute(self, query, *parameters):
+                cursor = self._connection.execute(query, *parameters)
+                if "FROM explorationevidence" not in query:
+                    return cursor
+                rows = cursor.fetchall()
+                read.append(len(rows))
+                return rows
+            def close(self):
+                self._connection.close()
+        connect_read_only = Loader.connect_read_only
+        Loader.connect_read_only = lambda filename: Connection(connect_read_only(filename))
+        try:
+            loaded = Loader.ExperimentDatabase("exp-8-40-3-1", database)
+        finally:
+            Loader.connect_read_only = connect_read_only
+        evidence = sum([len(e) for l in loaded.evidence.values() for e in l])
+        self.assertTrue(0 < evidence < total)
+        self.assertEqual(read, [evidence])
+
+
+if __name__ == '__main__':
+    unittest.main()
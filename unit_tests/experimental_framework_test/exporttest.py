@@ -0,0 +1,109 @@
+"""
+an unittest package
+Copyright (c) 2013 Federico Cerutti <federico.cerutti@acm.org>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import unittest
+import numpy
+import tempfile
+import shutil
+import os
+
+from experimental_framework.Network import Agent
+from experimental_framework.Export import results_to_columns, export_results, export_summary, merge_results, load
+
+class _Distances(object):
+    """
+    The same interface of DistancesBetweenTwo
+    """
+    def __init__(self, ag, first, second):
+        self._agent = ag
+        self._first = first
+        self._second = second
+        
+    def get_agent(self):
+        return self._agent
+    
+    def get_first_distances(self):
+        return self._first
+    
+    def get_second_distances(self):
+        return self._second
+
+class _Results(object):
+    def __init__(self, results):
+        self._results = results
+        
+    def get_results(self):
+        return self._results
+
+class  ExportTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        a = Agent("Agent0", "0.5")
+        b = Agent("Agent1", "0.5")
+        self.results = [_Results([_Distances(a, [0.1, None], [0.01, None]), _Distances(b, [0.2, 0.3], [0.2, 3])]),
+                        _Results([_Distances(a, [1, 2], [1, 2]), _Distances(b, [], [])])]
+        
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_export_columns(self):
+        columns = results_to_columns(self.results, ["josang"], {"perclink": 5})
+        self.assertEqual(len(columns["first"]), 6)
+        self.assertEqual(columns["agents"].tolist(), ["Agent0", "Agent1"])
+        self.assertEqual(columns["measure"].tolist(), [0, 0, 0, 0, 1, 1])
+        self.assertEqual(columns["iteration"].tolist(), [0, 1, 0, 1, 0, 1])
+        self.assertAlmostEqual(columns["ratio"][0], -1)
+        self.assertTrue(numpy.isnan(columns["second"][1]) and numpy.isnan(columns["ratio"][1]))
+        self.assertEqual(columns["perclink"].tolist(), [5] * 6)
+        self.assertRaisesRegexp(Exception, "Two results", results_to_columns, self.results, ["a", "b"])
+        
+    def test_export_merge(self):
+        first = os.path.join(self.directory, "first.npz")
+        second = os.path.join(self.directory, "second.npz")
+        merged = os.path.join(self.directory, "merged.npz")
+        export_results(first, self.results, ["josang"], {"perclink": 5})
+        export_results(second, self.results[::-1], ["uai"], {"perclink": 10})
+        merge_results([first, second], merged)
+        
+        columns = load(merged)
+        self.assertEqual(len(columns["first"]), 12)
+        self.assertEqual(columns["comparisons"].tolist(), ["josang", "uai"])
+        self.assertEqual(columns["comparison"].tolist(), [0] * 6 + [1] * 6)
+        self.assertEqual(columns["measure"].tolist(), [0, 0, 0, 0, 1, 1, 0, 0, 1, 1, 1, 1])
+        self.assertEqual(columns["perclink"].tolist(), [5] * 6 + [10] * 6)
+        
+    def test_export_summary(self):
+        summary = os.path.join(self.directory, "summary.csv")
+        with open(summary, "w") as f:
+            f.write('"5","2","0.1",""\n"5","3","0.2","0.3"\n')
+        export_summary(summary, os.path.join(self.directory, "summary.npz"), ["perclink", "bootstrap", "mean", "std"])
+        
+        columns = load(os.path.join(self.directory, "summary.npz"))
+        self.assertEqual(columns["bootstrap"].tolist(), [2, 3])
+        self.assertTrue(numpy.isnan(columns["std"][0]))
+        self.assertRaisesRegexp(Exception, "The number of columns", export_summary, summary, 
+                                os.path.join(self.directory, "summary.npz"), ["perclink"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+"""
+an unittest package
+Copyright (c) 2013 Federico Cerutti <federico.cerutti@acm.org>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import unittest
+import random
+import tempfile
+import shutil
+import os
+
+from experimental_framework.Experiment import BootstrapExperiment
+from experimental_framework.Network import Agent, AgentNetwork, discount_type_josang, consensus_type_josang, \
+    discount_type_uai, consensus_type_aberdeen, question_everything
+
+def make_agents():
+    """
+    @return: eight agents, each one linked to the next two (Agent1 tells the truth half of the times)
+    """
+    agents = [Agent("Agent" + repr(i), p) for [i, p] in enumerate(["0.9", "0.5", "0.8", "0.3", "0.7", "0.6", "0.4", "0.9"])]
+    for i in range(len(agents)):
+        for j in [1, 2]:
+            agents[i].addNeighbour(agents[(i + j) % len(agents)])
+    return agents
+
+class  FrozenAnswersTestCase(unittest.TestCase):
+    def setUp(self):
+        random.seed(1)
+        self.directory = tempfile.mkdtemp()
+        self.network = AgentNetwork("bootstrapped")
+        for ag in make_agents():
+            self.network.add_agent(ag)
+        for ag in self.network.get_agents():
+            ag.knowYourNeighbours(5)
+        self.operators = [[discount_type_uai, consensus_type_aberdeen], [discount_type_josang, consensus_type_josang]]
+        
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        
+    def _derived(self, network):
+        """
+        @return: dictionary from the name of each agent to the opinions Agent0 has derived about it
+        """
+        chosen = network.get_agent_by_name("Agent0")
+        return dict([(t.get_trustee().name, [t.get_first_opinion(), t.get_second_opinion()]) for t in chosen.trusts])
+
+    def test_frozen_answers_query(self):
+        chosen = self.network.get_agent_by_name("Agent0")
+        liar = self.network.get_agent_by_name("Agent1")
+        answers = [liar.answer(question_everything) for i in range(10)]
+        self.assertTrue(any([a != answers[0] for a in answers]))
+        
+        frozen = {}
+        first = chosen.query_frozen(liar, frozen)
+        for i in range(5):
+            self.assertEqual(chosen.query_frozen(liar, frozen), first)
+        self.assertEqual(frozen.keys(), ["Agent1"])
+        
+        # a clone of the network gets the same answers, about its own agents
+        cloned = AgentNetwork("cloned")
+        self.network.clone(cloned)
+        from_clone = cloned.get_agent_by_name("Agent0").query_frozen(cloned.get_agent_by_name("Agent1"), frozen)
+        self.assertEqual([[t.name, o] for [t, o] in from_clone], [[t.name, o] for [t, o] in first])
+        self.assertTrue(all([t is cloned.get_agent_by_name(t.name) for [t, o] in from_clone]))
+        
+    def test_frozen_answers_explorations(self):
+        frozen = {}
+        derived = []
+        for i in range(2):
+            cloned = AgentNetwork("cloned")
+            self.network.clone(cloned)
+            cloned.get_agent_by_name("Agent0").explore_network_general(self.operators, frozen)
+            derived.append(self._derived(cloned))
+        # every agent but the chosen one has been asked, once for both the explorations
+        self.assertEqual(sorted(frozen.keys()), ["Agent" + repr(i) for i in range(1, 8)])
+        self.assertEqual(sorted(derived[0].keys()), ["Agent" + repr(i) for i in range(1, 8)])
+        self.assertEqual(derived[0], derived[1])
+        
+    def test_frozen_answers_experiment(self):
+        t = BootstrapExperiment(os.path.join(self.directory, "exp"), "Agent0")
+        for ag in make_agents():
+            t.add_agent(ag)
+        t.bootstrap(5)
+        t.set_frozen_answers(True)
+        frozen = t._frozen_answers
+        
+        t._start_iteration()
+        first = t._network_exploration_general("first", t._bootstrapped_network, self.operators)
+        second = t._network_exploration_general("second", t._bootstrapped_network, self.operators)
+        self.assertTrue(len(frozen) > 0)
+        self.assertEqual(self._derived(first), self._derived(second))
+        
+        # the next iteration samples the answers again, in the same dictionary
+        t._start_iteration()
+        self.assertTrue(t._frozen_answers is frozen)
+        self.assertEqual(frozen, {})
+        t.set_frozen_answers(False)
+        self.assertEqual(t._frozen_answers, None)
+        t.save()
+        t._session.close()
+        t._engine.dispose()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+"""
+an unittest package
+Copyright (c) 2013 Federico Cerutti <federico.cerutti@acm.org>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import unittest
+import numpy
+import mpmath
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from experimental_framework.baseSQL import Base
+from experimental_framework.Network import AgentNetwork
+from experimental_framework.Generator import Generator, agent_name
+
+class  GeneratorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.generator = Generator(1)
+        
+    def _pairs(self, network):
+        [starts, ends] = network.get_links()
+        return set(zip(starts.tolist(), ends.tolist()))
+
+    def test_generator_erdos_renyi(self):
+        complete = self.generator.erdos_renyi(20, 1)
+        self.assertEqual(complete.get_numlinks(), 20 * 19)
+        self.assertEqual(len(self._pairs(complete)), 20 * 19)
+        self.assertEqual(self.generator.erdos_renyi(20, 0).get_numlinks(), 0)
+        
+        network = self.generator.erdos_renyi(200, 0.1)
+        [starts, ends] = network.get_links()
+        self.assertFalse(numpy.any(starts == ends))
+        self.assertEqual(len(self._pairs(network)), network.get_numlinks())
+        self.assertTrue(abs(network.get_numlinks() - 0.1 * 200 * 199) < 400)
+        self.assertTrue(numpy.all((network.get_probabilities() >= 0) & (network.get_probabilities() <= 1)))
+        
+    def test_generator_seed(self):
+        first = Generator(5).erdos_renyi(50, 0.2)
+        second = Generator(5).erdos_renyi(50, 0.2)
+        self.assertTrue(numpy.array_equal(first.get_probabilities(), second.get_probabilities()))
+        self.assertEqual(self._pairs(first), self._pairs(second))
+        
+    def test_generator_barabasi_albert(self):
+        network = self.generator.barabasi_albert(100, 3)
+        pairs = self._pairs(network)
+        self.assertEqual(network.get_numlinks(), 2 * 3 * 97)
+        self.assertEqual(len(pairs), network.get_numlinks())
+        self.assertTrue(all([(e, s) in pairs for (s, e) in pairs]))
+        self.assertRaisesRegexp(Exception, "The number of links of each new agent", self.generator.barabasi_albert, 3, 3)
+        
+    def test_generator_small_world(self):
+        ring = self.generator.small_world(10, 4, 0)
+        self.assertEqual(ring.get_numlinks(), 2 * 10 * 2)
+        self.assertTrue((0, 9) in self._pairs(ring) and (0, 2) in self._pairs(ring))
+        
+        network = self.generator.small_world(100, 4, 0.5)
+        [starts, ends] = network.get_links()
+        self.assertFalse(numpy.any(starts == ends))
+        self.assertTrue(network.get_numlinks() <= 2 * 100 * 2)
+        
+    def test_generator_stochastic_block(self):
+        network = self.generator.stochastic_block([5, 4], [[1, 0], [1, 0]])
+        self.assertEqual(network.get_numagents(), 9)
+        self.assertEqual(network.get_numlinks(), 5 * 4 + 4 * 5)
+        self.assertTrue(all([s < 5 or e < 5 for (s, e) in self._pairs(network)]))
+        
+    def test_generator_to_agents(self):
+        network = self.generator.erdos_renyi(10, 0.5)
+        agents = network.to_agents()
+        self.assertEqual(len(agents), 10)
+        self.assertEqual(sum([len(ag.neighbours) for ag in agents]), network.get_numlinks())
+        
+    def test_generator_insert(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        original = AgentNetwork()
+        session.add(original)
+        
+        network = self.generator.erdos_renyi(30, 0.2)
+        network.insert(session, original)
+        session.commit()
+        
+        self.assertEqual(len(original.get_agents()), 30)
+        self.assertEqual(sum([len(ag.neighbours) for ag in original.get_agents()]), network.get_numlinks())
+        [starts, ends] = network.get_links()
+        ag = original.get_agent_by_name(agent_name(starts[0]))
+        self.assertTrue(original.get_agent_by_name(agent_name(ends[0])) in ag.neighbours)
+        self.assertAlmostEqual(float(eval("mpmath." + ag.probability)), network.get_probabilities()[starts[0]])
+        self.assertRaisesRegexp(Exception, "Agents can be inserted only into an empty network", network.insert, session, original)
+
+
+if __name__ == '__main__':
+    unittest.main()
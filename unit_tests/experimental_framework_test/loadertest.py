@@ -0,0 +1,114 @@
+"""
+an unittest package
+Copyright (c) 2013 Federico Cerutti <federico.cerutti@acm.org>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import unittest
+import numpy
+import tempfile
+import shutil
+import os
+import sqlite3
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from experimental_framework.baseSQL import Base
+from experimental_framework.Network import Agent, AgentNetwork, ListNetworks, TrustworthinessBetweenTwo
+from experimental_framework.Loader import ExperimentDatabase, connect_read_only, parse_number
+from subjective_logic.Opinion import Opinion
+
+class  LoaderTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.name = os.path.join(self.directory, "exp")
+        engine = create_engine("sqlite:///" + self.name + ".db")
+        # experimentdata is created below (it is in the metadata only if Experiment has been imported)
+        Base.metadata.create_all(engine, tables=[t for t in Base.metadata.sorted_tables if t.name != "experimentdata"])
+        session = sessionmaker(bind=engine)()
+        
+        original = AgentNetwork("original")
+        for [name, p] in [["Agent0", "0.5"], ["Agent1", "0.75"], ["Agent2", "0.25"]]:
+            original.add_agent(Agent(name, p))
+        session.add(original)
+        
+        experiment_set = ListNetworks("Experiment2")
+        session.add(experiment_set)
+        for i in range(2):
+            explored = AgentNetwork("explored")
+            session.add(explored)
+            chosen = Agent("Agent0", "0.5")
+            trustee = Agent("Agent1", "0.75")
+            explored.add_agent(chosen)
+            explored.add_agent(trustee)
+            chosen.trusts.append(TrustworthinessBetweenTwo(trustee, Opinion("0.5", "0.25", "0.25", "0.5"), 
+                                                           Opinion("0.75", "0.25", "0", "0.5")))
+            experiment_set.add_network(explored)
+        session.commit()
+        session.close()
+        engine.dispose()
+        
+        connection = sqlite3.connect(self.name + ".db")
+        connection.execute("CREATE TABLE experimentdata (id INTEGER PRIMARY KEY, chosen_agent VARCHAR(500))")
+        connection.execute("INSERT INTO experimentdata (chosen_agent) VALUES ('Agent0')")
+        connection.commit()
+        connection.close()
+        
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        
+    def test_loader_read_only(self):
+        connection = connect_read_only(self.name + ".db")
+        self.assertRaises(sqlite3.OperationalError, connection.execute, "DELETE FROM agents")
+        connection.close()
+        self.assertRaisesRegexp(Exception, "does not exist", connect_read_only, self.name + "-missing.db")
+        
+    def test_loader_parse_number(self):
+        self.assertEqual(parse_number("mpf('0.25')"), 0.25)
+        self.assertEqual(parse_number("0.5"), 0.5)
+
+    def test_loader_opinions(self):
+        database = ExperimentDatabase(self.name)
+        self.assertEqual(database.chosen_agent, "Agent0")
+        self.assertEqual(database.agents, ["Agent1", "Agent2"])
+        self.assertEqual(database.probabilities.tolist(), [0.75, 0.25])
+        opinions = database.opinions["Experiment2"]
+        self.assertEqual(opinions.shape, (2, 2, 2, 4))
+        self.assertEqual(opinions[1, 0, 0].tolist(), [0.5, 0.25, 0.25, 0.5])
+        self.assertTrue(numpy.all(numpy.isnan(opinions[:, 1])))
+        self.assertEqual(database.opinions["Experiment2-2"].shape, (0, 2, 2, 4))
+        
+    def test_loader_results(self):
+        results = ExperimentDatabase(self.name).distance_ratio_results()
+        self.assertEqual(len(results), 8)
+        
+        # the second opinion is the correct one for Agent1: the ratios are not defined
+        first = numpy.sqrt(0.25 ** 2 + 0.25 ** 2)
+        self.assertAlmostEqual(results[0].get_first_distances()[0, 0], first)
+        self.assertEqual(results[0].get_second_distances()[0, 0], 0)
+        self.assertAlmostEqual(results[4].get_first_distances()[0, 1], 0.75 - 0.625)
+        self.assertEqual(results[1].get_mean_std(), None)
+        self.assertEqual(results[0].get_mean_std_ratio("Agent2"), None)
+        self.assertEqual(len(results[0].get_ratios("Agent1")), 0)
+        self.assertEqual(results[0].get_mean_std_ratio("Agent1"), None)
+
+
+if __name__ == '__main__':
+    unittest.main()
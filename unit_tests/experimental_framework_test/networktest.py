@@ -0,0 +1,103 @@
+"""
+an unittest package
+Copyright (c) 2013 Federico Cerutti <federico.cerutti@acm.org>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import unittest
+import random
+
+from experimental_framework.Network import AgentNetwork, discount_type_josang, consensus_type_josang, \
+    discount_type_uai, consensus_type_aberdeen
+from experimental_framework.Generator import Generator, agent_name
+from experimental_framework.Replay import replay
+from subjective_logic.OperatorCache import OperatorCache
+
+class  NetworkTestCase(unittest.TestCase):
+    def setUp(self):
+        random.seed(1)
+        self.network = AgentNetwork("bootstrapped")
+        for ag in Generator(1).erdos_renyi(12, 0.3).to_agents():
+            self.network.add_agent(ag)
+        for ag in self.network.get_agents():
+            ag.knowYourNeighbours(5)
+        self.operators = [[discount_type_uai, consensus_type_aberdeen], [discount_type_josang, consensus_type_josang]]
+            
+    def _explore(self, network):
+        chosen = network.get_agent_by_name(agent_name(0))
+        chosen.explore_network_general(self.operators)
+        return dict([(t.get_trustee().name, [t.get_first_opinion(), t.get_second_opinion()]) for t in chosen.trusts])
+
+    def test_network_snapshot(self):
+        snapshot = AgentNetwork("snapshot")
+        self.network.snapshot(snapshot, [agent_name(0)])
+        self.assertEqual(len(snapshot.agents), 1)
+        self.assertEqual(len(snapshot.get_agents()), 12)
+        self.assertTrue(snapshot.get_agent_by_name(agent_name(1)) is self.network.get_agent_by_name(agent_name(1)))
+        self.assertFalse(snapshot.get_agent_by_name(agent_name(0)) is self.network.get_agent_by_name(agent_name(0)))
+        # the copy of the chosen agent is equal to (and hashed as) the one of the base
+        self.assertEqual(snapshot.get_agent_by_name(agent_name(0)), self.network.get_agent_by_name(agent_name(0)))
+        self.assertEqual(len(set(snapshot.get_agents() + self.network.get_agents())), 12)
+        self.assertEqual(len(snapshot.get_agent_by_name(agent_name(0)).trusts), 
+                         len(self.network.get_agent_by_name(agent_name(0)).trusts))
+        
+    def test_network_snapshot_exploration(self):
+        before = len(self.network.get_agent_by_name(agent_name(0)).trusts)
+        
+        cloned = AgentNetwork("cloned")
+        self.network.clone(cloned)
+        random.seed(2)
+        from_clone = self._explore(cloned)
+        
+        snapshot = AgentNetwork("snapshot")
+        self.network.snapshot(snapshot, [agent_name(0)])
+        random.seed(2)
+        from_snapshot = self._explore(snapshot)
+        
+        self.assertTrue(len(from_clone) > before)
+        self.assertEqual(from_clone, from_snapshot)
+        self.assertEqual(len(self.network.get_agent_by_name(agent_name(0)).trusts), before)
+
+
+    def test_network_replay(self):
+        evidence = []
+        chosen = self.network.get_agent_by_name(agent_name(0))
+        first_hand = len(chosen.trusts)
+        chosen.explore_network_general(self.operators, None, evidence)
+        
+        self.assertEqual(len([e for e in evidence if e[0] == 0]), first_hand)
+        replayed = replay(evidence, self.operators[0][0], self.operators[0][1])
+        self.assertEqual(len(replayed), len(chosen.trusts))
+        for t in chosen.trusts:
+            self.assertEqual(replayed[t.get_trustee().name], t.get_first_opinion())
+        self.assertRaisesRegexp(Exception, "unknown discount operator", replay, evidence, "none", self.operators[0][1])
+        
+        # the operators installed in subjective_logic.operators are used
+        cache = OperatorCache()
+        cache.install()
+        try:
+            self.assertEqual(replay(evidence, self.operators[0][0], self.operators[0][1]), replayed)
+        finally:
+            cache.uninstall()
+        self.assertTrue(cache.get_misses() > 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+an unittest package
+Copyright (c) 2013 Federico Cerutti <federico.cerutti@acm.org>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import unittest
+import random
+import tempfile
+import shutil
+import os
+
+from experimental_framework.Experiment import BootstrapExperiment
+from experimental_framework.Network import Agent, AgentNetwork, discount_type_josang, consensus_type_josang
+from subjective_logic.Profiler import profiler
+
+class  ProfilingTestCase(unittest.TestCase):
+    def setUp(self):
+        random.seed(1)
+        self.directory = tempfile.mkdtemp()
+        profiler.reset()
+        profiler.enable()
+        
+    def tearDown(self):
+        profiler.disable()
+        profiler.reset()
+        shutil.rmtree(self.directory)
+        
+    def _agents(self, probabilities=["0.9", "0.5", "0.2", "0.7", "0.6"]):
+        agents = [Agent("Agent" + repr(i), p) for [i, p] in enumerate(probabilities)]
+        for i in range(len(agents)):
+            agents[i].addNeighbour(agents[(i + 1) % len(agents)])
+            agents[i].addNeighbour(agents[(i + 2) % len(agents)])
+        return agents
+
+    def test_profiling_network(self):
+        agents = self._agents()
+        for ag in agents:
+            ag.knowYourNeighbours(5)
+        counters = profiler.get_counters()
+        # each agent queries each of its two neighbours 4 times
+        self.assertEqual(counters["queries"], 5 * 2 * 4)
+        self.assertTrue(counters["lies"] > 0)
+        
+        # honest agents answer every query
+        agents = self._agents(["1"] * 5)
+        for ag in agents:
+            ag.knowYourNeighbours(5)
+        profiler.reset()
+        agents[0].explore_network_general([[discount_type_josang, consensus_type_josang]])
+        counters = profiler.get_counters()
+        self.assertEqual(counters["queries"], 4)
+        self.assertFalse("lies" in counters or "omissions" in counters)
+        self.assertTrue(counters["operators.discount"] > 0)
+        self.assertTrue(counters["opinions"] >= counters["operators.discount"])
+        
+    def test_profiling_experiment(self):
+        t = BootstrapExperiment(os.path.join(self.directory, "exp"), "Agent0")
+        for ag in self._agents():
+            t.add_agent(ag)
+        t.bootstrap(5)
+        t._network_exploration_general("explored", t._bootstrapped_network, [[discount_type_josang, consensus_type_josang]])
+        t.save()
+        phases = profiler.get_phases()
+        for name in ["bootstrap", "clone", "exploration", "save"]:
+            self.assertTrue(phases[name][1] >= 1, name)
+        self.assertTrue(profiler.get_counters()["rows flushed"] > 0)
+        t._session.close()
+        t._engine.dispose()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+an unittest package
+Copyright (c) 2013 Federico Cerutti <federico.cerutti@acm.org>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import unittest
+import random
+import numpy
+
+from experimental_framework.Network import AgentNetwork, discount_type_josang, consensus_type_josang, \
+    discount_type_uai, consensus_type_aberdeen, discount_type_aberdeen
+from experimental_framework.Generator import Generator, agent_name
+from experimental_framework.Propagation import TrustMatrices, propagate, network_matrices
+from subjective_logic import distances
+
+class  PropagationTestCase(unittest.TestCase):
+    def setUp(self):
+        random.seed(1)
+        self.network = AgentNetwork("bootstrapped")
+        for ag in Generator(1).erdos_renyi(20, 0.15).to_agents():
+            self.network.add_agent(ag)
+        for ag in self.network.get_agents():
+            ag.knowYourNeighbours(5)
+        self.matrices = network_matrices(self.network)
+        # honest agents: the exploration receives exactly the first-hand trust
+        for ag in self.network.get_agents():
+            ag.probability = "mpf('1')"
+            
+    def _check_exploration(self, operators):
+        [opinions, layers] = propagate(self.matrices, agent_name(0), operators[0], operators[1])
+        chosen = self.network.get_agent_by_name(agent_name(0))
+        chosen.explore_network_general([operators])
+        names = self.matrices.get_names()
+        self.assertEqual(len(chosen.trusts), numpy.sum(layers >= 0))
+        for t in chosen.trusts:
+            i = names.index(t.get_trustee().name)
+            self.assertTrue(numpy.allclose(opinions[i], distances.to_array(t.get_first_opinion()), atol=1e-12))
+        
+    def test_propagation_josang(self):
+        self._check_exploration([discount_type_josang, consensus_type_josang])
+        
+    def test_propagation_uai(self):
+        self._check_exploration([discount_type_uai, consensus_type_aberdeen])
+        
+    def test_propagation_layers(self):
+        opinions = [[0.5, 0.25, 0.25, 0.5]] * 3
+        matrices = TrustMatrices(["a", "b", "c", "d"], [0, 1, 2], [1, 2, 0], opinions)
+        [derived, layers] = propagate(matrices, "a")
+        self.assertEqual(list(layers), [-1, 0, 1, -1])
+        self.assertTrue(numpy.allclose(derived[2], [0.25, 0.125, 0.625, 0.5]))
+        self.assertTrue(numpy.all(numpy.isnan(derived[[0, 3]])))
+        self.assertRaisesRegexp(Exception, "once", TrustMatrices, ["a", "b"], [0, 0], [1, 1], opinions[:2])
+        self.assertRaisesRegexp(Exception, "cannot be propagated", propagate, matrices, "a", discount_type_aberdeen)
+
+
+if __name__ == '__main__':
+    unittest.main()
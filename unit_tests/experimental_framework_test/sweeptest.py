@@ -0,0 +1,172 @@
+"""
+an unittest package
+Copyright (c) 2013 Federico Cerutti <federico.cerutti@acm.org>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import unittest
+import numpy
+import tempfile
+import shutil
+import os
+
+from experimental_framework.Sweep import RunningStatistics, AdaptiveStopping, SweepSpecification, Manifest, Summary, \
+    shard_filename, merge_shards
+from experimental_framework.Export import export_summary, load
+
+class  SweepTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        
+    def test_sweep_running_statistics(self):
+        values = [0.5, 1.5, -2, 3.25, 0]
+        stat = RunningStatistics()
+        self.assertEqual(stat.get_variance(), None)
+        for v in values:
+            stat.add(v)
+        self.assertEqual(stat.get_count(), 5)
+        self.assertAlmostEqual(stat.get_mean(), numpy.mean(values))
+        self.assertAlmostEqual(stat.get_variance(), numpy.var(values, ddof=1))
+        self.assertAlmostEqual(stat.get_half_width(0.95), 2.776445 * numpy.std(values, ddof=1) / numpy.sqrt(5), 5)
+        
+    def test_sweep_adaptive_stopping(self):
+        stopping = AdaptiveStopping(0.1, min_iterations=3, max_iterations=10)
+        stopping.add({0: 1.0, 1: None})
+        stopping.add({0: 1.0, 1: None})
+        self.assertFalse(stopping.is_done())
+        stopping.add({0: 1.01, 1: None})
+        self.assertTrue(stopping.is_done())
+        
+        stopping = AdaptiveStopping(0.1, min_iterations=3, max_iterations=4)
+        for v in [1, -1, 1]:
+            stopping.add({0: v})
+        self.assertFalse(stopping.is_done())
+        stopping.add({0: -1})
+        self.assertTrue(stopping.is_done())
+        self.assertRaisesRegexp(Exception, "At least two iterations", AdaptiveStopping, 0.1, 1)
+        
+    def test_sweep_specification(self):
+        specification = SweepSpecification({"repetitions": 2, "numagents": 10, "perclink": [5, 10], 
+                                            "bootstrap": {"start": 2, "stop": 8, "step": 3}})
+        cells = specification.get_cells()
+        self.assertEqual(len(cells), 8)
+        self.assertEqual(cells[1], [1, [0, 10, 5, 5]])
+        shards = [specification.get_cells(i, 3) for i in range(3)]
+        self.assertEqual(sorted(sum([[c[0] for c in s] for s in shards], [])), range(8))
+        self.assertEqual(specification.get_stopping(), None)
+        self.assertEqual(SweepSpecification().get("output"), "sweep")
+        self.assertEqual(specification.get_paths(), ["sweep/test-0", "sweep/test-1"])
+        self.assertRaisesRegexp(Exception, "Unknown parameter in the sweep specification", SweepSpecification, {"agents": 3})
+        
+        specification = SweepSpecification({"iterations": 40, "adaptive": {"target": 0.05}})
+        self.assertEqual(specification.get_stopping().get_max_iterations(), 40)
+        self.assertRaisesRegexp(Exception, "Unknown parameter in the adaptive stopping", SweepSpecification, 
+                                {"adaptive": {"target": 0.05, "width": 1}})
+        
+        self.assertEqual(specification.get_interpolation(), None)
+        specification = SweepSpecification({"output": "/tmp/sweep", "interpolation": {"size": 5}})
+        self.assertEqual(specification.get_interpolation(), ["/tmp/sweep/tables", 5, None, None])
+        specification = SweepSpecification({"interpolation": {"max_jump": 0.2, "max_error": 0.05}})
+        self.assertEqual(specification.get_interpolation()[1:], [17, 0.2, 0.05])
+        self.assertRaisesRegexp(Exception, "at least 2", SweepSpecification, {"interpolation": {"size": 1}})
+        self.assertRaisesRegexp(Exception, "must be positive", SweepSpecification, {"interpolation": {"max_error": 0}})
+        
+        self.assertEqual(specification.get_operator_cache(), None)
+        specification = SweepSpecification({"operator_cache": {"quantum": 0.001}})
+        self.assertEqual(specification.get_operator_cache().get_quantum(), 0.001)
+        self.assertRaisesRegexp(Exception, "Unknown parameter in the operator cache", SweepSpecification, 
+                                {"operator_cache": {"size": 5}})
+        self.assertRaisesRegexp(Exception, "Unknown precision", SweepSpecification, {"precision": "float32"})
+        self.assertRaisesRegexp(Exception, "cannot be used with the adaptive precision", SweepSpecification, 
+                                {"precision": "adaptive", "interpolation": {"size": 5}})
+
+    def test_sweep_manifest(self):
+        filename = os.path.join(self.directory, "manifest.csv")
+        manifest = Manifest(filename)
+        manifest.start("8-30-2", "exp-8-30-2-1")
+        manifest.start("8-30-3", "exp-8-30-3-4")
+        manifest.done("8-30-2")
+        manifest.start("8-30-3", "exp-8-30-3-5")
+        
+        manifest = Manifest(filename)
+        self.assertTrue(manifest.is_done("8-30-2"))
+        self.assertFalse(manifest.is_done("8-30-3"))
+        self.assertEqual(manifest.get_dbname("8-30-3"), "exp-8-30-3-5")
+        self.assertEqual(manifest.get_dbname("8-30-4"), None)
+        
+    def test_sweep_summary(self):
+        filename = os.path.join(self.directory, "summary.csv")
+        summary = Summary(filename, 2)
+        self.assertTrue(summary.append([30, 2, 0.25]))
+        self.assertFalse(summary.append([30, 2, 0.5]))
+        summary = Summary(filename, 2)
+        self.assertFalse(summary.append([30, 2, 0.5]))
+        self.assertTrue(summary.append([30, 3, 0.5]))
+        with open(filename) as f:
+            self.assertEqual(f.read(), '"30","2","0.25"\n"30","3","0.5"\n')
+            
+    def test_sweep_torn_line(self):
+        filename = os.path.join(self.directory, "summary.csv")
+        with open(filename, "w") as f:
+            f.write('"30","2","0.25"\n"30","3","0.')
+        summary = Summary(filename, 2)
+        self.assertFalse(summary.contains([30, 3]))
+        self.assertTrue(summary.append([30, 3, 0.5]))
+        self.assertTrue(Summary(filename, 2).contains([30, 3]))
+        export_summary(filename, os.path.join(self.directory, "summary.npz"), ["perclink", "bootstrap", "mean"])
+        self.assertEqual(load(os.path.join(self.directory, "summary.npz"))["mean"].tolist(), [0.25, 0.5])
+        
+        filename = os.path.join(self.directory, "manifest.csv")
+        with open(filename, "w") as f:
+            f.write('"8-30-2","exp-8-30-2-1","started"\n"8-30-2","exp-8-30-2-1","do')
+        manifest = Manifest(filename)
+        self.assertFalse(manifest.is_done("8-30-2"))
+        manifest.done("8-30-2")
+        self.assertTrue(Manifest(filename).is_done("8-30-2"))
+
+        
+    def test_sweep_shards(self):
+        manifest_filename = os.path.join(self.directory, "manifest.csv")
+        summary_filename = os.path.join(self.directory, "summary.csv")
+        self.assertEqual(shard_filename(manifest_filename, 0, 1), manifest_filename)
+        self.assertEqual(shard_filename(manifest_filename, 1, 2), os.path.join(self.directory, "manifest-1of2.csv"))
+        
+        for shard in range(2):
+            manifest = Manifest(shard_filename(manifest_filename, shard, 2), manifest_filename)
+            summary = Summary(shard_filename(summary_filename, shard, 2), 2, summary_filename)
+            manifest.start("8-30-%d" % shard, "exp-8-30-%d-1" % shard)
+            manifest.done("8-30-%d" % shard)
+            summary.append([30, shard, 0.25])
+        merge_shards(manifest_filename, summary_filename, 2, 2)
+        merge_shards(manifest_filename, summary_filename, 2, 2)
+        
+        self.assertTrue(Manifest(manifest_filename).is_done("8-30-1"))
+        with open(summary_filename) as f:
+            self.assertEqual(f.read(), '"30","0","0.25"\n"30","1","0.25"\n')
+        # a later run (with any number of shards) knows what has been merged
+        self.assertTrue(Manifest(shard_filename(manifest_filename, 0, 3), manifest_filename).is_done("8-30-1"))
+        self.assertFalse(Summary(shard_filename(summary_filename, 0, 3), 2, summary_filename).append([30, 1, 0.5]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+an unittest package
+Copyright (c) 2013 Federico Cerutti <federico.cerutti@acm.org>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import unittest
+import numpy
+
+import subjective_logic.operators as operators
+from subjective_logic import adaptive
+from subjective_logic.Opinion import Opinion, get_random_opinion
+
+class  AdaptiveTestCase(unittest.TestCase):
+    def setUp(self):
+        adaptive.reset_statistics()
+        self.t = [get_random_opinion() for i in range(20)]
+        self.c = [get_random_opinion() for i in range(20)]
+        self.t_array = numpy.array([adaptive._to_array(w) for w in self.t])
+        self.c_array = numpy.array([adaptive._to_array(w) for w in self.c])
+        
+    def tearDown(self):
+        adaptive.uninstall()
+
+    def test_adaptive_float(self):
+        for name in sorted(adaptive.float_operators):
+            results = adaptive.evaluate(name, self.t_array, self.c_array)
+            for i in range(len(self.t)):
+                self.assertEqual(Opinion(*results[i]), getattr(operators, name)(self.t[i], self.c[i]), name)
+        self.assertRaisesRegexp(Exception, "Unknown operator", adaptive.evaluate, "consensus_on_a_list", 
+                                self.t_array, self.c_array)
+
+    def test_adaptive_fallback(self):
+        dogmatic = numpy.array([[1, 0, 0, 0.5], [0.5, 0.5, 0, 0.5]])
+        [results, ill] = adaptive.evaluate_float("consensus", dogmatic, dogmatic[::-1])
+        self.assertTrue(numpy.all(ill))
+        # both opinions are dogmatic: the mpmath consensus raises an exception
+        self.assertTrue(numpy.all(numpy.isnan(adaptive.evaluate("consensus", dogmatic, dogmatic[::-1]))))
+        self.assertEqual(adaptive.get_statistics()["consensus"], [2, 2])
+        
+        t = Opinion("1/3", "1/3", "1/3", "1/2")
+        uncertainty = numpy.array([[0, 0, 1, 0.5]])
+        # alpha' is pi/2, handled as a special case
+        [results, ill] = adaptive.evaluate_float("graphical_combination", [adaptive._to_array(t)], uncertainty)
+        self.assertTrue(ill[0])
+        self.assertEqual(Opinion(*adaptive.evaluate("graphical_combination", [adaptive._to_array(t)], uncertainty)[0]), 
+                         operators.graphical_combination(t, Opinion(*uncertainty[0])))
+
+    def test_adaptive_install(self):
+        exact = operators.graphical_combination3
+        adaptive.install()
+        self.assertEqual(operators.graphical_combination3(self.t[0], self.c[0]), exact(self.t[0], self.c[0]))
+        self.assertRaisesRegexp(Exception, "Two valid Opinions are required!", operators.discount, 3, 2)
+        adaptive.uninstall()
+        self.assertTrue(operators.graphical_combination3 is exact)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+"""
+an unittest package
+Copyright (c) 2013 Federico Cerutti <federico.cerutti@acm.org>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import unittest
+import numpy
+
+from subjective_logic.Opinion import Opinion, get_random_opinion
+from subjective_logic import distances
+
+class  DistancesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.xs = [get_random_opinion() for i in range(5)]
+        self.ys = [get_random_opinion() for i in range(3)]
+
+    def test_distances_to_array(self):
+        array = distances.to_array([Opinion("1/2", "1/4", "1/4", "1/2"), None])
+        self.assertEqual(array.shape, (2, 4))
+        self.assertTrue(numpy.allclose(array[0], [0.5, 0.25, 0.25, 0.5]))
+        self.assertTrue(numpy.all(numpy.isnan(array[1])))
+
+    def test_distances_elementwise(self):
+        euclidean = distances.elementwise("euclidean", self.xs[:3], self.ys)
+        expected = distances.elementwise("expected_value", self.xs[:3], self.ys)
+        for i in range(3):
+            self.assertAlmostEqual(euclidean[i], float(self.xs[i].distance(self.ys[i])))
+            self.assertAlmostEqual(expected[i], float(self.xs[i].distance_expected_value(self.ys[i])))
+        self.assertRaisesRegexp(Exception, "same shape", distances.elementwise, "euclidean", self.xs, self.ys)
+
+    def test_distances_one_to_many(self):
+        values = distances.one_to_many("manhattan", self.xs[0], self.xs)
+        self.assertEqual(values.shape, (5,))
+        self.assertEqual(values[0], 0)
+        self.assertTrue(numpy.all(values >= distances.one_to_many("euclidean", self.xs[0], self.xs)))
+
+    def test_distances_pairwise(self):
+        matrix = distances.pairwise("euclidean", self.xs, self.ys)
+        self.assertEqual(matrix.shape, (5, 3))
+        for i in range(5):
+            for j in range(3):
+                self.assertAlmostEqual(matrix[i, j], float(self.xs[i].distance(self.ys[j])))
+        square = distances.pairwise(distances.chebyshev, self.xs)
+        self.assertTrue(numpy.allclose(square, square.T))
+        self.assertTrue(numpy.allclose(numpy.diag(square), 0))
+        self.assertRaisesRegexp(Exception, "Unknown distance", distances.pairwise, "cosine", self.xs)
+        
+    def test_distances_log_ratios(self):
+        ratios = distances.log_ratios([0.5, 0, 0.2, numpy.nan, 0], [0.05, 0.1, 0, 0.1, 0])
+        self.assertAlmostEqual(ratios[0], -1)
+        self.assertTrue(numpy.all(numpy.isnan(ratios[1:])))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+an unittest package
+Copyright (c) 2013 Federico Cerutti <federico.cerutti@acm.org>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import unittest
+import numpy
+import tempfile
+import shutil
+import os
+
+import subjective_logic.operators as operators
+from subjective_logic import interpolation
+from subjective_logic.Opinion import Opinion
+
+class  InterpolationTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.table = interpolation.build_table("graphical_combination2", 3, 20)
+        
+    def tearDown(self):
+        interpolation.uninstall()
+        shutil.rmtree(self.directory)
+
+    def test_interpolation_square(self):
+        opinions = numpy.array([[0.2, 0.3, 0.5, 0.5], [0, 0, 1, 0.5], [1, 0, 0, 0.5]])
+        self.assertTrue(numpy.allclose(interpolation.from_square(interpolation.to_square(opinions)), opinions))
+
+    def test_interpolation_grid(self):
+        t = Opinion("0", "1/2", "1/2", "1/2")
+        c = Opinion("1/2", "1/2", "0", "1/2")
+        self.assertEqual(self.table(t, c), operators.graphical_combination2(t, c))
+        self.assertTrue(self.table.get_error_estimate() >= 0)
+        self.assertRaisesRegexp(Exception, "Unknown graphical operator", interpolation.build_table, "discount", 2)
+
+    def test_interpolation_max_jump(self):
+        values = numpy.zeros((3, 3, 3, 3, 2))
+        values[2, 2, 2, 2] = [1, 0]
+        steep = interpolation.steep_cells(values, 0.5)
+        self.assertEqual(steep.shape, (2, 2, 2, 2))
+        self.assertEqual(numpy.argwhere(steep).tolist(), [[1, 1, 1, 1]])
+        
+        # every cell of this coarse table is steeper than 0.01: the exact operator is always used
+        limited = self.table.with_max_jump(0.01, 20)
+        self.assertEqual(limited.get_max_jump(), 0.01)
+        self.assertEqual(limited.get_error_estimate(), 0)
+        t = Opinion("1/10", "2/10", "7/10", "1/2")
+        c = Opinion("6/10", "3/10", "1/10", "1/2")
+        self.assertEqual(limited(t, c), operators.graphical_combination2(t, c))
+        self.assertEqual(self.table.with_max_jump(2, 20).get_error_estimate(), self.table.get_error_estimate())
+
+    def test_interpolation_save(self):
+        path = os.path.join(self.directory, "table")
+        self.table.save(path)
+        loaded = interpolation.load_table(path)
+        self.assertEqual(loaded.get_operator_name(), "graphical_combination2")
+        self.assertEqual(loaded.get_size(), 3)
+        self.assertEqual(loaded.get_error_estimate(), self.table.get_error_estimate())
+        self.assertEqual(loaded.get_max_jump(), None)
+        t = numpy.array([[0.1, 0.2, 0.7, 0.5]])
+        c = numpy.array([[0.6, 0.3, 0.1, 0.5]])
+        self.assertTrue(numpy.allclose(loaded.interpolate(t, c), self.table.interpolate(t, c)))
+        
+    def test_interpolation_saved_estimates(self):
+        table = interpolation.load_or_build(self.directory, "graphical_combination2", 3, 0.01)
+        self.assertEqual(table.get_error_estimate(), 0)
+        path = os.path.join(self.directory, "graphical_combination2-3")
+        self.assertEqual(sorted(interpolation.load_table(path).get_error_estimates().keys()), [None, 0.01])
+        
+        # once saved, the estimate is not measured again
+        def fail(*args):
+            raise Exception("Estimated again")
+        estimate_error = interpolation.InterpolationTable.estimate_error
+        interpolation.InterpolationTable.estimate_error = fail
+        try:
+            self.assertEqual(interpolation.load_or_build(self.directory, "graphical_combination2", 3, 0.01).get_error_estimate(), 0)
+        finally:
+            interpolation.InterpolationTable.estimate_error = estimate_error
+
+    def test_interpolation_install(self):
+        exact = operators.graphical_combination2
+        interpolation.install([self.table])
+        self.assertTrue(operators.graphical_combination2 is self.table)
+        interpolation.uninstall()
+        self.assertTrue(operators.graphical_combination2 is exact)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+"""
+an unittest package
+Copyright (c) 2013 Federico Cerutti <federico.cerutti@acm.org>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import unittest
+
+from subjective_logic.LRUCache import LRUCache
+
+class  LRUCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.cache = LRUCache(2)
+
+    def test_lrucache_size(self):
+        self.assertRaisesRegexp(Exception, "The size of the cache must be a positive integer", LRUCache, 0)
+
+    def test_lrucache_get(self):
+        self.cache.put("a", 1)
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertEqual(self.cache.get("b"), None)
+        self.assertEqual(self.cache.get_hits(), 1)
+        self.assertEqual(self.cache.get_misses(), 1)
+
+    def test_lrucache_eviction(self):
+        self.cache.put("a", 1)
+        self.cache.put("b", 2)
+        self.cache.get("a")
+        self.cache.put("c", 3)
+        self.assertTrue("a" in self.cache)
+        self.assertFalse("b" in self.cache)
+        self.assertTrue("c" in self.cache)
+        self.assertEqual(len(self.cache), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+"""
+an unittest package
+Copyright (c) 2013 Federico Cerutti <federico.cerutti@acm.org>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import unittest
+
+import subjective_logic.operators as operators
+from subjective_logic.OperatorCache import OperatorCache
+from subjective_logic.Opinion import Opinion
+
+class  OperatorCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.exact = operators.discount
+        self.cache = OperatorCache(10)
+        self.cache.install()
+        self.t = Opinion("1/2", "1/4", "1/4", "1/2")
+        self.w = Opinion("1/3", "1/3", "1/3", "1/2")
+        
+    def tearDown(self):
+        self.cache.uninstall()
+
+    def test_operatorcache_hits(self):
+        first = operators.discount(self.t, self.w)
+        second = operators.discount(Opinion("1/2", "1/4", "1/4", "1/2"), self.w)
+        self.assertTrue(first is second)
+        self.assertEqual(first, self.exact(self.t, self.w))
+        self.assertEqual(self.cache.get_statistics()["discount"], [1, 1, 1])
+        self.assertRaisesRegexp(Exception, "Two valid Opinions are required!", operators.discount, 3, 2)
+        
+    def test_operatorcache_list(self):
+        pairs = [[self.t, self.w], [self.t, self.t], [self.w, self.w]]
+        first = list(pairs)
+        second = list(pairs)
+        self.assertTrue(operators.consensus_on_a_list(first) is operators.consensus_on_a_list(second))
+        # the hit removes the first pair as the operator does
+        self.assertEqual(len(first), len(second))
+        self.assertEqual(self.cache.get_hits(), 1)
+        
+    def test_operatorcache_quantum(self):
+        self.cache.uninstall()
+        self.cache = OperatorCache(10, 0.01)
+        self.cache.install()
+        near = Opinion("0.501", "0.249", "0.25", "0.5")
+        self.assertTrue(operators.discount(self.t, self.w) is operators.discount(near, self.w))
+        self.assertRaisesRegexp(Exception, "quantum must be positive", OperatorCache, 10, 0)
+        
+    def test_operatorcache_uninstall(self):
+        self.cache.uninstall()
+        self.assertTrue(operators.discount is self.exact)
+
+
+if __name__ == '__main__':
+    unittest.main()
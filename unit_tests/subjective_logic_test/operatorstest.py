@@ -24,9 +24,10 @@ THE SOFTWARE.
 
 import unittest
 import mpmath
+import numpy
 
 import subjective_logic.operators as operators
-from subjective_logic.Opinion import Opinion
+from subjective_logic.Opinion import Opinion, get_random_opinion
 
 class  OperatorsTestCase(unittest.TestCase):
     def setUp(self):
@@ -175,6 +176,43 @@ class  OperatorsTestCase(unittest.TestCase):
         c = self.uncertainty
         r = c
         self.assertEqual(operators.graphical_combination(t, c), r, repr(t) + " \\ cdot " + repr(c) +" = "+  repr(operators.graphical_combination(t, c)) +" != "+ repr(r))
+
+    def _fold(self, operator, path):
+        result = path[0]
+        for w in path[1:]:
+            result = operator(result, w)
+        return result
+
+    def test_operators_discount_chain(self):
+        path = [self.random, self.third, get_random_opinion(), self.nobelief, get_random_opinion()]
+        for operator in [operators.discount, operators.discount_UAI_referee, operators.graphical_combination2]:
+            self.assertEqual(operators.discount_chain(path, operator), self._fold(operator, path))
+        self.assertEqual(operators.discount_chain([self.third]), self.third)
+        self.assertRaisesRegexp(Exception, "non-empty list", operators.discount_chain, [])
+
+    def test_operators_discount_chains(self):
+        paths = [[get_random_opinion() for hop in range(4)] for path in range(3)]
+        for operator in [operators.discount, operators.discount_UAI_referee, operators.graphical_combination,
+                         operators.graphical_combination2, operators.graphical_combination3]:
+            batched = operators.discount_chains(paths, operator)
+            self.assertEqual(batched.shape, (3, 4))
+            for i in range(3):
+                self.assertEqual(Opinion(*batched[i]), self._fold(operator, paths[i]))
+        self.assertRaisesRegexp(Exception, "paths, hops, 4", operators.discount_chains, numpy.zeros((2, 4)))
+        
+    def test_operators_discount_chain_wrapped(self):
+        # a wrapper with the name of an operator is applied hop by hop, not replaced by the closed form
+        calls = []
+        def wrapped(t, c):
+            calls.append(True)
+            return operators.discount(t, c)
+        wrapped.__name__ = "discount"
+        path = [self.random, self.third, self.nobelief]
+        self.assertEqual(operators.discount_chain(path, wrapped), self._fold(operators.discount, path))
+        self.assertEqual(len(calls), 2)
+        batched = operators.discount_chains([path], wrapped)
+        self.assertEqual(Opinion(*batched[0]), self._fold(operators.discount, path))
+        self.assertEqual(len(calls), 4)
         
 
 if __name__ == '__main__':
@@ -24,6 +24,8 @@ THE SOFTWARE.
 
 
 import unittest
+import os
+import subprocess
 from subjective_logic.NotAnOpinionException import *
 from subjective_logic.Opinion import *
 
@@ -90,6 +92,13 @@ class  OpinionTestCase(unittest.TestCase):
     
     def test_expected_value(self):
         self.assertTrue(mpmath.almosteq(self.third.expected_value(), mpmath.mpf("1/3")+mpmath.mpf("1/9")), "Expected value of " + repr(self.third) + " not correctly computed: it is: " + repr(self.third.expected_value()))
+        
+    def test_headless_import(self):
+        # the core packages do not load the plotting (nor the scipy) packages
+        code = "import sys, subjective_logic.operators, beta_distribution.History; " + \
+               "sys.exit(int('matplotlib' in sys.modules or 'scipy' in sys.modules))"
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.assertEqual(subprocess.call([sys.executable, "-c", code], cwd=root), 0)
 
 if __name__ == '__main__':
     unittest.main()
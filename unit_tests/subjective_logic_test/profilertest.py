@@ -0,0 +1,98 @@
+"""
+an unittest package
+Copyright (c) 2013 Federico Cerutti <federico.cerutti@acm.org>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import unittest
+import json
+import time
+
+from subjective_logic.Profiler import Profiler, profiler, profiled
+
+@profiled
+def scaled(x, factor=1):
+    return x * factor
+
+class  ProfilerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.profiler = Profiler()
+        self.profiler.enable()
+        
+    def tearDown(self):
+        profiler.disable()
+        profiler.reset()
+
+    def test_profiler_phases(self):
+        with self.profiler.phase("iteration"):
+            with self.profiler.phase("exploration"):
+                time.sleep(0.01)
+            with self.profiler.phase("exploration"):
+                pass
+        phases = self.profiler.get_phases()
+        self.assertEqual(sorted(phases.keys()), ["exploration", "iteration"])
+        self.assertEqual(phases["exploration"][1], 2)
+        self.assertEqual(phases["iteration"][1], 1)
+        self.assertTrue(phases["exploration"][0] >= 0.01)
+        self.assertTrue(phases["iteration"][0] >= phases["exploration"][0])
+        
+    def test_profiler_counters(self):
+        self.profiler.count("queries")
+        self.profiler.count("queries")
+        self.profiler.count("rows flushed", 5)
+        self.assertEqual(self.profiler.get_counters(), {"queries": 2, "rows flushed": 5})
+        self.profiler.reset()
+        self.assertEqual(self.profiler.get_counters(), {})
+        self.assertEqual(self.profiler.get_phases(), {})
+        
+    def test_profiler_disabled(self):
+        self.profiler.disable()
+        self.profiler.count("queries")
+        with self.profiler.phase("iteration"):
+            pass
+        self.assertEqual(self.profiler.get_record(), {"phases": {}, "counters": {}})
+        
+    def test_profiler_record(self):
+        with self.profiler.phase("bootstrap"):
+            self.profiler.count("lies", 3)
+        # as written in profile.json
+        record = json.loads(json.dumps(self.profiler.get_record(), sort_keys=True))
+        self.assertEqual(record["counters"], {"lies": 3})
+        self.assertEqual(record["phases"]["bootstrap"][1], 1)
+        
+    def test_profiler_profiled(self):
+        self.assertEqual(scaled.__name__, "scaled")
+        self.assertEqual(scaled(2), 2)
+        profiler.reset()
+        profiler.enable()
+        self.assertEqual(scaled(2, 4), 8)
+        self.assertEqual(scaled(3), 3)
+        self.assertEqual(profiler.get_counters(), {"operators.scaled": 2})
+        
+    def test_profiler_profiled_keywords(self):
+        # e.g. discount_chain(path, discount_operator=...)
+        profiler.reset()
+        profiler.enable()
+        self.assertEqual(scaled(2, factor=3), 6)
+        self.assertEqual(profiler.get_counters(), {"operators.scaled": 1})
+
+
+if __name__ == '__main__':
+    unittest.main()